@@ -1,10 +1,10 @@
 import redis
 from django.core.management.base import BaseCommand
-from django.db.models import Q
 
 from bot.models import TgUser
 from bot.tg.client import TgClient
 from bot.tg.dc import GetUpdatesResponse, Message, MessageFrom
+from goals.membership import get_board_roles
 from goals.models import Goal, GoalCategory
 from todolist.settings import TOKEN_TELEGRAM_BOT
 
@@ -80,11 +80,7 @@ class Command(BaseCommand):
         self.tg_client.send_message(chat_id=message.chat.id, text='неизвестная команда')
 
     def _get_goals(self, message: Message, tg_user: TgUser) -> str:
-        user_goals: list[Goal] = Goal.objects.prefetch_related('category').filter(
-            Q(category__board__participants__user_id=tg_user.user_id) &
-            ~Q(status=Goal.Status.archived) &
-            Q(category__is_deleted=False)
-        )
+        user_goals: list[Goal] = Goal.live.filter(board_id__in=list(get_board_roles(tg_user.user_id)))
         goals_list = "\n".join(f"#{goal.id} {goal.title}" for goal in user_goals)
         redis_instance.delete(tg_user.tg_id)
         return goals_list if goals_list else 'Активные цели не найдены'
@@ -93,22 +89,17 @@ class Command(BaseCommand):
         self.tg_client.send_message(chat_id=message.chat.id,
                                     text='Введите название категории для создания или /cancel для отмены'
                                     )
-        user_categories = GoalCategory.objects.prefetch_related('board__participants__user').filter(
-            board__participants__user_id=tg_user.user_id,
-            is_deleted=False
-        )
+        user_categories = GoalCategory.live.filter(board_id__in=list(get_board_roles(tg_user.user_id)))
         categories_list = "\n".join(f"#{category.id} {category.title}" for category in user_categories)
         self.tg_client.send_message(chat_id=message.chat.id, text=categories_list)
         redis_instance.set(tg_user.tg_id, 'set_name_category')
 
     def _set_name_category(self, message: Message, tg_user: TgUser):
-        goal_category: list[GoalCategory] = GoalCategory.objects.prefetch_related('board__participants__user').filter(
-            Q(board__participants__user_id=tg_user.user_id) &
-            Q(is_deleted=False) &
-            Q(title__iexact=message.text)
-        )
+        goal_category: GoalCategory | None = GoalCategory.live.filter(
+            board_id__in=list(get_board_roles(tg_user.user_id))
+        ).search_title(message.text).first()
         if goal_category:
-            redis_instance.append(f'{tg_user.tg_id}cat_name', goal_category[0].id)
+            redis_instance.append(f'{tg_user.tg_id}cat_name', goal_category.id)
             redis_instance.set(tg_user.tg_id, 'set_name_goal')
             self.tg_client.send_message(chat_id=message.chat.id,
                                         text='Введите название цели для создания или /cancel для отмены')
@@ -11,6 +11,7 @@ from todolist.settings import TOKEN_TELEGRAM_BOT
 class VerificationCodeView(UpdateAPIView):
     queryset = TgUser.objects.all()
     serializer_class = PatchVerificationSerializer
+    query_budget = 5
 
     def update(self, request, *args, **kwargs) -> Response:
         """
@@ -11,11 +11,13 @@ from core.serializers import UserCreateSerializer, UserLoginSerializer, UserProf
 
 class CreateUserView(CreateAPIView):
     serializer_class = UserCreateSerializer
+    query_budget = 2
     permission_classes = (AllowAny,)
 
 
 class UserLoginView(CreateAPIView):
     serializer_class = UserLoginSerializer
+    query_budget = 4
     permission_classes = (AllowAny,)
 
     def create(self, request, *args, **kwargs) -> Response:
@@ -42,6 +44,7 @@ class UserLoginView(CreateAPIView):
 
 class UserProfileView(RetrieveUpdateDestroyAPIView):
     serializer_class = UserProfileSerializer
+    query_budget = 5
 
     def get_object(self) -> User:
         """
@@ -61,6 +64,7 @@ class UserProfileView(RetrieveUpdateDestroyAPIView):
 
 class UserUpdatePasswordView(UpdateAPIView):
     serializer_class = UserUpdatePasswordSerializer
+    query_budget = 4
 
     def get_object(self) -> User:
         """
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from goals.models import GoalCategory, Goal, GoalComment, Board
+from goals.models import ArchivedGoal, ArchiveTask, GoalCategory, Goal, GoalComment, Board
 
 
 class GoalCategoryAdmin(admin.ModelAdmin):
@@ -29,7 +29,22 @@ class BoardAdmin(admin.ModelAdmin):
     readonly_fields = ('created', 'updated')
 
 
+class ArchiveTaskAdmin(admin.ModelAdmin):
+    list_display = ('board', 'category', 'status', 'archived', 'created', 'finished')
+    list_filter = ('status',)
+    readonly_fields = ('created', 'updated', 'last_id', 'archived', 'finished')
+
+
+class ArchivedGoalAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'board', 'category', 'updated', 'moved')
+    search_fields = ('title',)
+    list_filter = ('moved',)
+    readonly_fields = ('created', 'updated', 'moved')
+
+
 admin.site.register(GoalCategory, GoalCategoryAdmin)
 admin.site.register(Goal, GoalAdmin)
 admin.site.register(GoalComment, GoalCommentAdmin)
 admin.site.register(Board, BoardAdmin)
+admin.site.register(ArchiveTask, ArchiveTaskAdmin)
+admin.site.register(ArchivedGoal, ArchivedGoalAdmin)
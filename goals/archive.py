@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from goals.models import ArchivedGoal, ArchivedGoalComment, ArchiveTask, Goal, GoalComment
+from goals.versions import bump_board_versions
+
+
+def schedule_archive(board_id: int, category_id: int | None = None) -> ArchiveTask:
+    """
+    Ставит в очередь архивацию целей доски (или одной ее категории).
+    Удаленные доска и категория скрыты сразу, цели архивирует archive_worker порциями
+    :param board_id:
+    :param category_id:
+    :return:
+    """
+    return ArchiveTask.objects.create(board_id=board_id, category_id=category_id)
+
+
+def archive_batch(batch_size: int | None = None) -> ArchiveTask | None:
+    """
+    Архивирует очередную порцию целей первой задачи из очереди в короткой транзакции:
+    блокируются только строки порции. Задачу, занятую другим процессом, пропускает
+    :param batch_size:
+    :return: обработанная задача или None, если очередь пуста
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    with transaction.atomic():
+        task: ArchiveTask | None = ArchiveTask.objects.select_for_update(skip_locked=True).filter(
+            status=ArchiveTask.Status.pending
+        ).order_by('id').first()
+        if task is None:
+            return None
+
+        goals = Goal.objects.filter(board_id=task.board_id, id__gt=task.last_id).exclude(
+            status=Goal.Status.archived
+        )
+        if task.category_id is not None:
+            goals = goals.filter(category_id=task.category_id)
+        ids = list(goals.order_by('id').values_list('id', flat=True)[:batch_size])
+        now = timezone.now()
+        if ids:
+            Goal.objects.filter(id__in=ids).update(status=Goal.Status.archived, updated=now)
+            bump_board_versions([task.board_id])
+            task.last_id = ids[-1]
+            task.archived += len(ids)
+        if len(ids) < batch_size:
+            task.status = ArchiveTask.Status.done
+            task.finished = now
+        task.save()
+    return task
+
+
+GOAL_COLUMNS = ('id', 'created', 'updated', 'user_id', 'title', 'description', 'due_date', 'status', 'priority',
+                'position', 'category_id', 'board_id')
+COMMENT_COLUMNS = ('id', 'created', 'updated', 'user_id', 'text', 'goal_id', 'board_id')
+
+
+def move_cold_goals(batch_size: int | None = None) -> int:
+    """
+    Переносит порцию целей, архивированных раньше GOAL_COLD_AFTER_DAYS, вместе с комментариями
+    в холодные таблицы ArchivedGoal и ArchivedGoalComment. Срок не меньше хранения ленты изменений:
+    клиенты синхронизации уже получили архивацию как удаление, поэтому перенос не пишет записей об удалении
+    и не меняет версии досок. Строки, занятые другими транзакциями, пропускаются
+    :param batch_size:
+    :return: число перенесенных целей
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cold_before = timezone.now() - timedelta(days=settings.GOAL_COLD_AFTER_DAYS)
+    goal_columns, comment_columns = ', '.join(GOAL_COLUMNS), ', '.join(COMMENT_COLUMNS)
+    with transaction.atomic():
+        ids = list(Goal.objects.select_for_update(skip_locked=True).filter(
+            status=Goal.Status.archived, updated__lt=cold_before
+        ).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {ArchivedGoal._meta.db_table} ({goal_columns}, moved)
+                SELECT {goal_columns}, %s FROM {Goal._meta.db_table} WHERE id = ANY(%s)
+            """, [timezone.now(), ids])
+            cursor.execute(f"""
+                WITH moved AS (
+                    DELETE FROM {GoalComment._meta.db_table} WHERE goal_id = ANY(%s) RETURNING {comment_columns}
+                )
+                INSERT INTO {ArchivedGoalComment._meta.db_table} ({comment_columns})
+                SELECT {comment_columns} FROM moved
+            """, [ids])
+            cursor.execute(f'DELETE FROM {Goal._meta.db_table} WHERE id = ANY(%s)', [ids])
+    return len(ids)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from goals.async_views import AsyncBoardView, AsyncGoalCategoryView, AsyncGoalCommentView, AsyncGoalView
+
+urlpatterns = [
+    path('goal_category/list', AsyncGoalCategoryView.as_view(), name='async_goal_category_list'),
+    path('goal_category/<int:pk>', AsyncGoalCategoryView.as_view(), name='async_goal_category'),
+    path('goal/list', AsyncGoalView.as_view(), name='async_goals_list'),
+    path('goal/<int:pk>', AsyncGoalView.as_view(), name='async_goal'),
+    path('goal_comment/list', AsyncGoalCommentView.as_view(), name='async_goal_comment_list'),
+    path('goal_comment/<int:pk>', AsyncGoalCommentView.as_view(), name='async_goal_comment'),
+    path('board/list', AsyncBoardView.as_view(), name='async_board_list'),
+    path('board/<int:pk>', AsyncBoardView.as_view(), name='async_board'),
+]
@@ -0,0 +1,184 @@
+from asgiref.sync import sync_to_async
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from django_filters.rest_framework import FilterSet
+from rest_framework import status
+from rest_framework.exceptions import NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from goals.fast_serializers import BoardValuesSerializer, GoalCategoryValuesSerializer, GoalCommentValuesSerializer, \
+    GoalValuesSerializer, ValuesSerializer
+from goals.filters import CommentGoalFilter, GoalCategoryFilter, GoalFilter
+from goals.membership import get_board_roles
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+from goals.positions import POSITION_ORDERING
+from todolist.async_handler import load_session_user
+
+
+def json_response(data, status_code: int = status.HTTP_200_OK) -> HttpResponse:
+    """
+    Тот же JSON, что отдает DRF
+    :param data:
+    :param status_code:
+    :return:
+    """
+    return HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+
+
+def get_limit_offset(request: HttpRequest) -> tuple[int | None, int]:
+    """
+    Параметры limit/offset по правилам LimitOffsetPagination: без корректного limit список не разбивается
+    :param request:
+    :return:
+    """
+    def positive_int(value: str | None, strict: bool) -> int | None:
+        try:
+            number = int(value)
+        except (TypeError, ValueError):
+            return None
+        return number if number > 0 or (number == 0 and not strict) else None
+
+    limit = positive_int(request.GET.get('limit'), strict=True)
+    return limit, positive_int(request.GET.get('offset'), strict=False) or 0
+
+
+class AsyncReadView(View):
+    """
+    Асинхронные списки и объекты только для чтения, ответы совпадают с синхронными представлениями.
+    Синхронная часть (сессия, пользователь, роли из кеша и проверка фильтров) выполняется
+    одним переходом в поток, основные запросы идут через асинхронный интерфейс ORM.
+    Поиск, выбор сортировки и пагинация по курсору есть только у синхронных списков, эти параметры
+    отклоняются с ошибкой 400, а не игнорируются
+    """
+    http_method_names = ['get']
+    values_serializer_class: type[ValuesSerializer]
+    filterset_class: type[FilterSet] | None = None
+    ordering: tuple[str, ...] = ('id',)
+    unsupported_params = ('search', 'ordering', 'cursor')
+
+    def get_queryset(self, board_ids: list[int]) -> QuerySet:
+        raise NotImplementedError
+
+    def prepare(self, request: HttpRequest) -> QuerySet | dict | None:
+        """
+        :param request:
+        :return: отфильтрованный queryset, ошибки параметров или None для анонимного пользователя
+        """
+        if not load_session_user(request).is_authenticated:
+            return None
+        if 'pk' not in self.kwargs:
+            errors = {
+                param: ['Параметр не поддерживается асинхронным списком, используйте синхронный список /goals/']
+                for param in self.unsupported_params if param in request.GET
+            }
+            if errors:
+                return errors
+        queryset = self.get_queryset(list(get_board_roles(request.user.id)))
+        if self.filterset_class is not None and 'pk' not in self.kwargs:
+            filterset = self.filterset_class(data=request.GET, queryset=queryset, request=request)
+            if not filterset.is_valid():
+                return filterset.errors
+            queryset = filterset.qs
+        return queryset.order_by(*self.ordering)
+
+    async def get(self, request: HttpRequest, pk: int | None = None) -> HttpResponse:
+        queryset = await sync_to_async(self.prepare)(request)
+        if queryset is None:
+            return json_response({'detail': NotAuthenticated.default_detail}, status.HTTP_403_FORBIDDEN)
+        if isinstance(queryset, dict):
+            return json_response(queryset, status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.values_serializer_class()
+        rows = serializer.get_values(queryset)
+        if pk is not None:
+            row = await rows.filter(pk=pk).afirst()
+            if row is None:
+                return json_response({'detail': NotFound.default_detail}, status.HTTP_404_NOT_FOUND)
+            return json_response((await self.represent([row]))[0])
+
+        limit, offset = get_limit_offset(request)
+        if limit is None:
+            return json_response(await self.represent([row async for row in rows]))
+        count = await queryset.acount()
+        url = request.build_absolute_uri()
+        if offset + limit >= count:
+            next_url = None
+        else:
+            next_url = replace_query_param(replace_query_param(url, 'limit', limit), 'offset', offset + limit)
+        if offset <= 0:
+            previous_url = None
+        elif offset - limit <= 0:
+            previous_url = remove_query_param(replace_query_param(url, 'limit', limit), 'offset')
+        else:
+            previous_url = replace_query_param(replace_query_param(url, 'limit', limit), 'offset', offset - limit)
+        return json_response({
+            'count': count,
+            'next': next_url,
+            'previous': previous_url,
+            'results': await self.represent([row async for row in rows[offset:offset + limit]]),
+        })
+
+    async def represent(self, rows: list[dict]) -> list[dict]:
+        return self.values_serializer_class().many(rows)
+
+
+class AsyncGoalCategoryView(AsyncReadView):
+    values_serializer_class = GoalCategoryValuesSerializer
+    filterset_class = GoalCategoryFilter
+    ordering = ('title',)
+
+    def get_queryset(self, board_ids: list[int]) -> QuerySet:
+        return GoalCategory.live.filter(board_id__in=board_ids)
+
+
+class AsyncGoalView(AsyncReadView):
+    values_serializer_class = GoalValuesSerializer
+    filterset_class = GoalFilter
+    ordering = ('category_id', 'status', *POSITION_ORDERING)
+
+    def get_queryset(self, board_ids: list[int]) -> QuerySet:
+        return Goal.live.filter(board_id__in=board_ids)
+
+
+class AsyncGoalCommentView(AsyncReadView):
+    values_serializer_class = GoalCommentValuesSerializer
+    filterset_class = CommentGoalFilter
+    ordering = ('-created',)
+
+    def get_queryset(self, board_ids: list[int]) -> QuerySet:
+        return GoalComment.live.filter(board_id__in=board_ids)
+
+
+class AsyncBoardView(AsyncReadView):
+    values_serializer_class = BoardValuesSerializer
+    ordering = ('title',)
+
+    def get_queryset(self, board_ids: list[int]) -> QuerySet:
+        return Board.live.filter(id__in=board_ids)
+
+    async def represent(self, rows: list[dict]) -> list[dict]:
+        """
+        Участники всех досок страницы одним запросом
+        :param rows:
+        :return:
+        """
+        serializer = BoardValuesSerializer()
+        participants: dict[int, list[dict]] = {row['id']: [] for row in rows}
+        async for participant in BoardParticipant.objects.filter(
+                board_id__in=list(participants)
+        ).order_by('id').values(*serializer.participant_fields):
+            participants[participant['board']].append({
+                'id': participant['id'],
+                'role': participant['role'],
+                'user': participant['user__username'],
+                'created': serializer.to_json_value(participant['created']),
+                'updated': serializer.to_json_value(participant['updated']),
+                'board': participant['board'],
+            })
+        boards = []
+        for row in rows:
+            board = serializer.to_representation(row)
+            boards.append({'id': board.pop('id'), 'participants': participants[row['id']], **board})
+        return boards
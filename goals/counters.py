@@ -0,0 +1,24 @@
+from django.db import connection, transaction
+
+from goals.models import Goal, GoalCounter
+
+
+def reconcile_goal_counters(board_id: int | None = None) -> int:
+    """
+    Пересчитывает счетчики целей (всех или одной доски) одним INSERT ... SELECT GROUP BY.
+    На время пересчета изменения целей ждут блокировку таблицы счетчиков, поэтому
+    триггеры не смешивают свои приращения с пересчитанными значениями
+    :param board_id:
+    :return: число строк счетчиков после пересчета
+    """
+    condition, params = ('WHERE board_id = %s', [board_id]) if board_id is not None else ('', [])
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {GoalCounter._meta.db_table} IN SHARE ROW EXCLUSIVE MODE')
+        cursor.execute(f'DELETE FROM {GoalCounter._meta.db_table} {condition}', params)
+        cursor.execute(f"""
+            INSERT INTO {GoalCounter._meta.db_table} (category_id, status, priority, due_date, board_id, count)
+            SELECT category_id, status, priority, due_date, max(board_id), count(*)
+            FROM {Goal._meta.db_table} {condition}
+            GROUP BY category_id, status, priority, due_date
+        """, params)
+        return cursor.rowcount
@@ -0,0 +1,135 @@
+import asyncio
+import io
+import json
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.signals import request_finished, request_started
+from django.http import HttpRequest
+from redis import RedisError
+from rest_framework import status
+from rest_framework.exceptions import NotFound, PermissionDenied
+
+from goals.events import BoardEventHub, hub
+from goals.membership import get_board_roles
+from goals.models import Board
+from goals.versions import get_board_versions
+from todolist.async_handler import load_session_user
+
+
+class BoardEventsApplication:
+    """
+    ASGI приложение потока Server-Sent Events доски: GET /events/board/<id>.
+    Событие board_changed несет новую версию доски, изменения клиент забирает лентой /goals/sync.
+    Ожидающее соединение - одна корутина и очередь, без потока на клиента.
+    Раз в BOARD_EVENTS_HEARTBEAT секунд участие в доске проверяется заново (роли из кеша),
+    исключенному из участников поток закрывается
+    """
+    path_regex = re.compile(r'^/events/board/(?P<board_id>\d+)$')
+
+    def __init__(self, event_hub: BoardEventHub = hub):
+        self.hub = event_hub
+
+    async def __call__(self, scope: dict, receive, send) -> None:
+        match = self.path_regex.match(scope['path'])
+        if scope['method'] != 'GET' or match is None:
+            return await self.send_error(send, status.HTTP_404_NOT_FOUND, NotFound.default_detail)
+        board_id = int(match['board_id'])
+        request = ASGIRequest(scope, io.BytesIO())
+        status_code, version = await sync_to_async(self.authorize)(request, board_id)
+        if status_code == status.HTTP_403_FORBIDDEN:
+            return await self.send_error(send, status_code, PermissionDenied.default_detail)
+        if status_code == status.HTTP_404_NOT_FOUND:
+            return await self.send_error(send, status_code, NotFound.default_detail)
+
+        try:
+            queue = await self.hub.subscribe(board_id)
+        except (RedisError, OSError):
+            return await self.send_error(send, status.HTTP_503_SERVICE_UNAVAILABLE, 'События временно недоступны')
+
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        loop = asyncio.get_running_loop()
+        checked = loop.time()
+        try:
+            await send({'type': 'http.response.start', 'status': status.HTTP_200_OK, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                # nginx не буферизует поток
+                (b'x-accel-buffering', b'no'),
+            ]})
+            await self.send_event(send, {'board': board_id, 'version': version})
+            while not disconnected.done():
+                event = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({event, disconnected}, timeout=settings.BOARD_EVENTS_HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if event in done:
+                    await self.send_event(send, event.result())
+                else:
+                    event.cancel()
+                    if disconnected.done():
+                        break
+                    await send({'type': 'http.response.body', 'body': b': ping\n\n', 'more_body': True})
+                if loop.time() - checked >= settings.BOARD_EVENTS_HEARTBEAT:
+                    if not await sync_to_async(self.has_access)(request.user.id, board_id):
+                        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+                        break
+                    checked = loop.time()
+        except OSError:
+            # клиент закрыл соединение во время отправки
+            pass
+        finally:
+            disconnected.cancel()
+            await self.hub.unsubscribe(board_id, queue)
+
+    def authorize(self, request: HttpRequest, board_id: int) -> tuple[int, int | None]:
+        """
+        Доступ к доске по сессии (синхронно). Как и обработчик Django, отправляет сигналы начала и конца запроса:
+        соединение с базой освобождается сразу, а не держится все время жизни потока
+        :param request:
+        :param board_id:
+        :return: код ответа и текущая версия доски
+        """
+        request_started.send(sender=self.__class__, scope=request.scope)
+        try:
+            user = load_session_user(request)
+            if not user.is_authenticated:
+                return status.HTTP_403_FORBIDDEN, None
+            if board_id not in get_board_roles(user.id):
+                return status.HTTP_403_FORBIDDEN, None
+            if not Board.live.filter(id=board_id).exists():
+                return status.HTTP_404_NOT_FOUND, None
+            return status.HTTP_200_OK, get_board_versions([board_id])[board_id]
+        finally:
+            request_finished.send(sender=self.__class__)
+
+    def has_access(self, user_id: int, board_id: int) -> bool:
+        """
+        Повторная проверка участия в доске для открытого потока (синхронно)
+        :param user_id:
+        :param board_id:
+        :return:
+        """
+        request_started.send(sender=self.__class__)
+        try:
+            return board_id in get_board_roles(user_id)
+        finally:
+            request_finished.send(sender=self.__class__)
+
+    @staticmethod
+    async def wait_disconnect(receive) -> None:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    @staticmethod
+    async def send_event(send, event: dict) -> None:
+        body = f"event: board_changed\nid: {event['version']}\ndata: {json.dumps(event)}\n\n"
+        await send({'type': 'http.response.body', 'body': body.encode(), 'more_body': True})
+
+    @staticmethod
+    async def send_error(send, status_code: int, detail: str) -> None:
+        await send({'type': 'http.response.start', 'status': status_code,
+                    'headers': [(b'content-type', b'application/json')]})
+        body = json.dumps({'detail': str(detail)}, ensure_ascii=False).encode()
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import logging
+
+import redis
+from django.conf import settings
+from redis import asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+BOARD_CHANNEL = 'board_events:{board_id}'
+
+_publisher: redis.Redis | None = None
+
+
+def get_publisher() -> redis.Redis:
+    global _publisher
+    if _publisher is None:
+        _publisher = redis.Redis.from_url(
+            settings.BOARD_EVENTS_REDIS_URL,
+            socket_timeout=settings.BOARD_EVENTS_PUBLISH_TIMEOUT,
+            socket_connect_timeout=settings.BOARD_EVENTS_PUBLISH_TIMEOUT,
+        )
+    return _publisher
+
+
+def publish_board_events(versions: dict[int, int]) -> None:
+    """
+    Публикует новые версии досок одним конвейером, вызывается после фиксации транзакции.
+    Публикация без гарантий: короткий таймаут BOARD_EVENTS_PUBLISH_TIMEOUT ограничивает задержку запроса,
+    недоступность Redis его не ломает, клиенты получат изменения при следующей синхронизации
+    :param versions: {board_id: версия}
+    :return:
+    """
+    if not settings.BOARD_EVENTS_ENABLED or not versions:
+        return
+    try:
+        pipeline = get_publisher().pipeline(transaction=False)
+        for board_id, version in versions.items():
+            pipeline.publish(BOARD_CHANNEL.format(board_id=board_id),
+                             json.dumps({'board': board_id, 'version': version}))
+        pipeline.execute()
+    except redis.RedisError as error:
+        logger.warning('Board events were not published: %s', error)
+
+
+class BoardEventHub:
+    """
+    Раздача событий досок подключенным клиентам процесса: одно соединение Redis pub/sub на процесс,
+    канал доски подписан, пока у нее есть хотя бы один слушатель. У каждого клиента своя очередь
+    """
+
+    def __init__(self):
+        self.queues: dict[int, set[asyncio.Queue]] = {}
+        self.pubsub: aioredis.client.PubSub | None = None
+        self.reader: asyncio.Task | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def get_pubsub(self) -> aioredis.client.PubSub:
+        return aioredis.Redis.from_url(settings.BOARD_EVENTS_REDIS_URL).pubsub(ignore_subscribe_messages=True)
+
+    async def subscribe(self, board_id: int) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            # соединение и задачи привязаны к циклу событий
+            self.queues, self.pubsub, self.reader, self.loop = {}, self.get_pubsub(), None, loop
+        queue = asyncio.Queue(maxsize=settings.BOARD_EVENTS_QUEUE_SIZE)
+        if board_id not in self.queues:
+            await self.pubsub.subscribe(BOARD_CHANNEL.format(board_id=board_id))
+        self.queues.setdefault(board_id, set()).add(queue)
+        if self.reader is None or self.reader.done():
+            self.reader = asyncio.create_task(self.read())
+        return queue
+
+    async def unsubscribe(self, board_id: int, queue: asyncio.Queue) -> None:
+        queues = self.queues.get(board_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.queues[board_id]
+            try:
+                await self.pubsub.unsubscribe(BOARD_CHANNEL.format(board_id=board_id))
+            except redis.RedisError as error:
+                logger.warning('Board events unsubscribe failed: %s', error)
+
+    async def read(self) -> None:
+        """
+        Читает сообщения, пока есть слушатели. При обрыве соединения redis-py
+        переподключается и заново подписывает все каналы
+        :return:
+        """
+        while self.queues:
+            try:
+                message = await self.pubsub.get_message(timeout=1.0)
+            except (redis.RedisError, OSError) as error:
+                logger.warning('Board events connection lost: %s', error)
+                await asyncio.sleep(1)
+                continue
+            if message is not None and message['type'] == 'message':
+                self.dispatch(json.loads(message['data']))
+
+    def dispatch(self, event: dict) -> None:
+        for queue in self.queues.get(event['board'], ()):
+            if queue.full():
+                # клиенту достаточно последней версии доски
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+
+hub = BoardEventHub()
+
@@ -0,0 +1,88 @@
+import csv
+import json
+import zlib
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from goals.fast_serializers import GoalCommentValuesSerializer, GoalValuesSerializer, ValuesSerializer
+from goals.models import ArchivedGoal, ArchivedGoalComment, Goal, GoalComment
+
+CSV_COLUMNS = ('type', 'id', 'created', 'updated', 'user', 'category', 'goal', 'title', 'description', 'due_date',
+               'status', 'priority', 'text')
+# размер порции, отдаваемой серверу за раз: строки склеиваются, чтобы не писать в сокет по одной
+BUFFER_SIZE = 64 * 1024
+
+
+def iter_board_rows(board_id: int) -> Iterator[tuple[str, dict]]:
+    """
+    Цели, затем комментарии доски (включая перенесенные в холодные таблицы)
+    в виде (тип, словарь как в ответах API).
+    Строки читаются серверным курсором порциями EXPORT_CHUNK_SIZE, в памяти одна порция
+    :param board_id:
+    :return:
+    """
+    sources: tuple[tuple[str, ValuesSerializer, QuerySet], ...] = (
+        ('goal', GoalValuesSerializer(), Goal.objects.filter(board_id=board_id).order_by('id')),
+        ('goal', GoalValuesSerializer(), ArchivedGoal.objects.filter(board_id=board_id).order_by('id')),
+        ('comment', GoalCommentValuesSerializer(), GoalComment.objects.filter(board_id=board_id).order_by('id')),
+        ('comment', GoalCommentValuesSerializer(),
+         ArchivedGoalComment.objects.filter(board_id=board_id).order_by('id')),
+    )
+    for row_type, serializer, queryset in sources:
+        for row in serializer.get_values(queryset).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE):
+            yield row_type, serializer.to_representation(row)
+
+
+def iter_ndjson(rows: Iterable[tuple[str, dict]]) -> Iterator[str]:
+    for row_type, data in rows:
+        yield json.dumps({'type': row_type, **data}, ensure_ascii=False) + '\n'
+
+
+class _Line:
+    """
+    Файлоподобный объект для csv.writer: возвращает записанную строку вместо буферизации
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def iter_csv(rows: Iterable[tuple[str, dict]]) -> Iterator[str]:
+    writer = csv.writer(_Line())
+    yield writer.writerow(CSV_COLUMNS)
+    for row_type, data in rows:
+        data = {**data, 'type': row_type, 'user': data['user']['username'] if data['user'] else ''}
+        yield writer.writerow([data.get(column, '') for column in CSV_COLUMNS])
+
+
+def iter_chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    """
+    Склеивает строки в порции около BUFFER_SIZE байт
+    :param lines:
+    :return:
+    """
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode()
+        buffer.append(data)
+        size += len(data)
+        if size >= BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Сжимает поток на лету в формате gzip
+    :param chunks:
+    :return:
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
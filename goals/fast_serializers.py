@@ -0,0 +1,98 @@
+from datetime import date, datetime
+from typing import Any, Iterable
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+
+class ValuesSerializer:
+    """
+    Быстрое представление списков только для чтения: колонки читаются через values()
+    (автор присоединяется JOIN-ом), словари ответа собираются напрямую, без экземпляров
+    моделей и полей DRF. Порядок ключей и форматы значений совпадают с ModelSerializer,
+    указанным в docstring наследника, поэтому JSON ответа не меняется.
+    """
+    fields: tuple[str, ...] = ()
+    user_field = 'user'
+    user_fields = ('id', 'username', 'first_name', 'last_name', 'email')
+
+    def get_columns(self) -> list[str]:
+        columns = []
+        for field in self.fields:
+            if field == self.user_field:
+                columns.extend(f'{field}__{user_field}' for user_field in self.user_fields)
+            else:
+                columns.append(field)
+        return columns
+
+    def get_values(self, queryset: QuerySet) -> QuerySet:
+        return queryset.values(*self.get_columns())
+
+    def to_representation(self, row: dict) -> dict:
+        data = {}
+        for field in self.fields:
+            if field == self.user_field:
+                data[field] = {
+                    user_field: row[f'{field}__{user_field}'] for user_field in self.user_fields
+                } if row[f'{field}__id'] is not None else None
+            else:
+                data[field] = self.to_json_value(row[field])
+        return data
+
+    def many(self, rows: Iterable[dict]) -> list[dict]:
+        return [self.to_representation(row) for row in rows]
+
+    @staticmethod
+    def to_json_value(value: Any) -> Any:
+        """
+        Те же преобразования, что у DateTimeField и DateField в DRF с настройками по умолчанию
+        :param value:
+        :return:
+        """
+        if isinstance(value, datetime):
+            if timezone.is_aware(value):
+                value = timezone.localtime(value)
+            value = value.isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
+
+
+class GoalValuesSerializer(ValuesSerializer):
+    """
+    Аналог GoalSerializer
+    """
+    fields = ('id', 'user', 'created', 'updated', 'title', 'description', 'due_date', 'status', 'priority',
+              'position', 'category', 'board')
+
+
+class ArchivedGoalValuesSerializer(ValuesSerializer):
+    """
+    Аналог ArchivedGoalSerializer
+    """
+    fields = ('id', 'user', 'created', 'updated', 'title', 'description', 'due_date', 'status', 'priority',
+              'position', 'moved', 'category', 'board')
+
+
+class GoalCommentValuesSerializer(ValuesSerializer):
+    """
+    Аналог GoalCommentSerializer
+    """
+    fields = ('id', 'user', 'created', 'updated', 'text', 'goal', 'board')
+
+
+class GoalCategoryValuesSerializer(ValuesSerializer):
+    """
+    Аналог GoalCategorySerializer
+    """
+    fields = ('id', 'user', 'board', 'created', 'updated', 'title', 'is_deleted')
+
+
+class BoardValuesSerializer(ValuesSerializer):
+    """
+    Аналог BoardSerializer без участников (их добавляет AsyncBoardView.represent)
+    """
+    fields = ('id', 'created', 'updated', 'is_deleted', 'title')
+    user_field = None
+    participant_fields = ('id', 'role', 'user__username', 'created', 'updated', 'board')
@@ -1,8 +1,10 @@
 import django_filters
-from django.db.models import DateField
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import DateField, F, QuerySet
 from django_filters.rest_framework import FilterSet
+from rest_framework.filters import SearchFilter
 
-from goals.models import Goal, GoalComment, GoalCategory
+from goals.models import ArchivedGoal, Goal, GoalComment, GoalCategory
 
 
 class GoalFilter(FilterSet):
@@ -19,6 +21,15 @@ class GoalFilter(FilterSet):
         }
 
 
+class ArchivedGoalFilter(FilterSet):
+    class Meta:
+        model = ArchivedGoal
+        fields = {
+            'board': ('exact',),
+            'category': ('exact', 'in'),
+        }
+
+
 class CommentGoalFilter(FilterSet):
     class Meta:
         model = GoalComment
@@ -33,3 +44,32 @@ class GoalCategoryFilter(FilterSet):
         fields = {
             "board": ('exact',)
         }
+
+
+class GoalSearchFilter(SearchFilter):
+    """
+    Полнотекстовый поиск целей по параметру ?search= через search_vector (GIN индекс),
+    результаты сортируются по ts_rank
+    """
+    search_config = 'russian'
+
+    def filter_queryset(self, request, queryset: QuerySet, view) -> QuerySet:
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        query = SearchQuery(' '.join(search_terms), config=self.search_config, search_type='websearch')
+        return queryset.annotate(
+            rank=SearchRank(F('search_vector'), query)
+        ).filter(search_vector=query).order_by('-rank', '-id')
+
+
+class TrigramSearchFilter(SearchFilter):
+    """
+    Поиск категорий по параметру ?search= с учетом опечаток, сначала самые похожие
+    """
+
+    def filter_queryset(self, request, queryset: QuerySet, view) -> QuerySet:
+        search_terms = self.get_search_terms(request)
+        if not search_terms:
+            return queryset
+        return queryset.search_title(' '.join(search_terms))
@@ -0,0 +1,241 @@
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from time import perf_counter
+from typing import Iterable, Iterator
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from core.models import User
+from goals.models import Board, Goal, GoalCategory, GoalComment
+from goals.serializers import GoalImportRowSerializer
+from goals.versions import bump_board_versions
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+MAX_ERRORS = 100
+GOAL_COLUMNS = ('ref', 'category_id', 'title', 'description', 'due_date', 'status', 'priority')
+COMMENT_COLUMNS = ('goal_ref', 'text')
+
+
+class ImportDataError(Exception):
+    def __init__(self, errors: list[dict]):
+        super().__init__(f'{len(errors)} invalid rows')
+        self.errors = errors
+
+
+@dataclass
+class ImportResult:
+    goals: int = 0
+    comments: int = 0
+    categories: int = 0
+    seconds: float = 0
+    errors: list[dict] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> int:
+        return int((self.goals + self.comments) / self.seconds) if self.seconds else 0
+
+    def to_representation(self) -> dict:
+        return {
+            'goals': self.goals,
+            'comments': self.comments,
+            'categories': self.categories,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': self.rows_per_second,
+        }
+
+
+def parse_rows(lines: Iterable[str], import_format: str) -> Iterator[tuple[int, dict | None]]:
+    """
+    Разбирает поток строк в словари (номер строки, данные), пустые значения отбрасываются.
+    Для нераспознанной строки JSON вместо данных None
+    :param lines:
+    :param import_format:
+    :return:
+    """
+    if import_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ('', None)}
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            yield line_number, None
+            continue
+        yield line_number, {key: value for key, value in row.items() if value not in ('', None)} \
+            if isinstance(row, dict) else None
+
+
+class GoalImporter:
+    """
+    Потоковый импорт целей и комментариев в доску: строки читаются и проверяются порциями
+    IMPORT_CHUNK_SIZE, категории ищутся по названию один раз (недостающие создаются).
+    В PostgreSQL порция грузится COPY во временные таблицы, затем переносится в цели
+    и комментарии двумя INSERT ... SELECT, на других базах - bulk_create порциями.
+    Весь импорт - одна транзакция: при ошибках в данных ничего не сохраняется
+    """
+
+    def __init__(self, board: Board, user: User):
+        self.board = board
+        self.user = user
+        self.use_copy = connection.vendor == 'postgresql'
+        self.categories: dict[str, int] = {}
+        self.goal_refs: dict[str, int | None] = {}
+        self.result = ImportResult()
+        # один экземпляр на весь импорт: поля сериализатора не копируются заново для каждой строки
+        self.row_serializer = GoalImportRowSerializer()
+
+    def run(self, lines: Iterable[str], import_format: str) -> ImportResult:
+        started = perf_counter()
+        rows = parse_rows(lines, import_format)
+        with transaction.atomic():
+            self._load_categories()
+            if self.use_copy:
+                self._create_staging_tables()
+            while chunk := list(islice(rows, settings.IMPORT_CHUNK_SIZE)):
+                goals, comments = self._validate(chunk)
+                if self.result.errors:
+                    # дальше только проверка, чтобы вернуть все ошибки сразу
+                    continue
+                self._resolve_categories(goals)
+                if self.use_copy:
+                    self._copy_chunk(goals, comments)
+                else:
+                    self._bulk_create_chunk(goals, comments)
+            if self.result.errors:
+                raise ImportDataError(self.result.errors)
+            if self.use_copy:
+                self._merge_staging()
+            bump_board_versions([self.board.id])
+        self.result.seconds = perf_counter() - started
+        return self.result
+
+    def _add_error(self, line: int, errors: dict | list) -> None:
+        if len(self.result.errors) < MAX_ERRORS:
+            self.result.errors.append({'line': line, 'errors': errors})
+
+    def _validate(self, chunk: list[tuple[int, dict | None]]) -> tuple[list[dict], list[dict]]:
+        goals, comments = [], []
+        for line, row in chunk:
+            if row is None:
+                self._add_error(line, ['Строка не является объектом JSON'])
+                continue
+            try:
+                data: dict = self.row_serializer.run_validation(row)
+            except ValidationError as error:
+                self._add_error(line, error.detail)
+                continue
+            if data['type'] == 'comment':
+                if data['goal'] not in self.goal_refs:
+                    self._add_error(line, {'goal': ['Цель с таким id не найдена выше в файле']})
+                    continue
+                comments.append(data)
+            else:
+                if 'id' in data:
+                    if data['id'] in self.goal_refs:
+                        self._add_error(line, {'id': ['Повторяющийся id цели']})
+                        continue
+                    self.goal_refs[data['id']] = None
+                goals.append(data)
+        return goals, comments
+
+    def _load_categories(self) -> None:
+        for category_id, title in GoalCategory.live.filter(board=self.board).order_by('-id').values_list('id', 'title'):
+            self.categories[title] = category_id
+
+    def _resolve_categories(self, goals: list[dict]) -> None:
+        titles = {goal['category'] for goal in goals} - self.categories.keys()
+        if titles:
+            created = GoalCategory.objects.bulk_create(
+                GoalCategory(title=title, user=self.user, board=self.board) for title in sorted(titles)
+            )
+            self.categories.update((category.title, category.id) for category in created)
+            self.result.categories += len(created)
+        for goal in goals:
+            goal['category_id'] = self.categories[goal['category']]
+
+    def _create_staging_tables(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [Goal._meta.db_table])
+            sequence = cursor.fetchone()[0]
+            cursor.execute(f"""
+                CREATE TEMPORARY TABLE import_goal (
+                    id bigint NOT NULL DEFAULT nextval('{sequence}'),
+                    ref text,
+                    category_id bigint NOT NULL,
+                    title varchar(255) NOT NULL,
+                    description text,
+                    due_date date,
+                    status smallint NOT NULL,
+                    priority smallint NOT NULL
+                ) ON COMMIT DROP
+            """)
+            cursor.execute("""
+                CREATE TEMPORARY TABLE import_comment (goal_ref text NOT NULL, text text NOT NULL) ON COMMIT DROP
+            """)
+
+    def _copy_chunk(self, goals: list[dict], comments: list[dict]) -> None:
+        with connection.cursor() as cursor:
+            for table, columns, rows in (
+                    ('import_goal', GOAL_COLUMNS, [{**goal, 'ref': goal.get('id')} for goal in goals]),
+                    ('import_comment', COMMENT_COLUMNS, [{**comment, 'goal_ref': comment['goal']}
+                                                         for comment in comments]),
+            ):
+                if not rows:
+                    continue
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([row.get(column) for column in columns] for row in rows)
+                buffer.seek(0)
+                cursor.copy_expert(f'COPY {table} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)', buffer)
+        self.result.goals += len(goals)
+        self.result.comments += len(comments)
+
+    def _merge_staging(self) -> None:
+        """
+        Переносит загруженные строки в цели и комментарии, id целей выделены из их последовательности
+        при COPY, поэтому комментарии связываются с целями соединением по внешнему id
+        :return:
+        """
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT INTO {Goal._meta.db_table}
+                    (id, user_id, board_id, category_id, title, description, due_date, status, priority,
+                     created, updated)
+                SELECT id, %s, %s, category_id, title, description, due_date, status, priority, %s, %s
+                FROM import_goal
+            """, [self.user.id, self.board.id, now, now])
+            cursor.execute(f"""
+                INSERT INTO {GoalComment._meta.db_table} (user_id, board_id, goal_id, text, created, updated)
+                SELECT %s, %s, import_goal.id, import_comment.text, %s, %s
+                FROM import_comment JOIN import_goal ON import_goal.ref = import_comment.goal_ref
+            """, [self.user.id, self.board.id, now, now])
+            cursor.execute('DROP TABLE import_goal, import_comment')
+
+    def _bulk_create_chunk(self, goals: list[dict], comments: list[dict]) -> None:
+        created = Goal.objects.bulk_create(
+            Goal(user=self.user, board=self.board, category_id=goal['category_id'], title=goal['title'],
+                 description=goal.get('description'), due_date=goal.get('due_date'), status=goal['status'],
+                 priority=goal['priority'])
+            for goal in goals
+        )
+        for goal, instance in zip(goals, created):
+            if 'id' in goal:
+                self.goal_refs[goal['id']] = instance.id
+        GoalComment.objects.bulk_create(
+            GoalComment(user=self.user, board=self.board, goal_id=self.goal_refs[comment['goal']],
+                        text=comment['text'])
+            for comment in comments
+        )
+        self.result.goals += len(goals)
+        self.result.comments += len(comments)
@@ -0,0 +1,100 @@
+import base64
+import binascii
+from dataclasses import dataclass
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from goals.fast_serializers import GoalValuesSerializer
+from goals.models import Goal
+
+# колонки доски в порядке вывода, архивные цели на доске не показываются
+KANBAN_STATUSES = tuple(value for value in Goal.Status.values if value != Goal.Status.archived)
+
+
+@dataclass(frozen=True)
+class ColumnCursor:
+    """
+    Продолжение одной колонки: статус и ключ (priority, id) последней отданной цели.
+    Клиенту передается непрозрачной строкой
+    """
+    status: int
+    priority: int
+    id: int
+
+    def encode(self) -> str:
+        raw = f'{self.status}|{self.priority}|{self.id}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, value: str) -> 'ColumnCursor':
+        """
+        :param value:
+        :return:
+        :raises ValueError: строка не является курсором
+        """
+        try:
+            raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+            status, priority, goal_id = raw.split('|')
+            cursor = cls(int(status), int(priority), int(goal_id))
+        except (binascii.Error, UnicodeDecodeError) as error:
+            raise ValueError(value) from error
+        if cursor.status not in KANBAN_STATUSES:
+            raise ValueError(value)
+        return cursor
+
+    def get_filter(self) -> Q:
+        """
+        Цели колонки после курсора при сортировке (-priority, -id)
+        :return:
+        """
+        return Q(status=self.status) & (
+            Q(priority__lt=self.priority) | Q(priority=self.priority, id__lt=self.id)
+        )
+
+
+def get_columns(queryset: QuerySet, limit: int, cursor: ColumnCursor | None = None) -> list[dict]:
+    """
+    Первые limit целей каждой колонки (или одной колонки после курсора) одним запросом:
+    для каждого статуса подзапрос LATERAL (... ORDER BY priority DESC, id DESC LIMIT limit + 1) читает
+    по индексу goals_goal_kanban_idx (обратным просмотром) не больше limit + 1 строк колонки, сколько бы целей
+    ни было на доске. Лишняя строка колонки означает, что у нее есть продолжение.
+    Статус колонки подставляется в запрос ORM ссылкой на внешний unnest, колонки результата
+    сопоставляются по порядку values()
+    :param queryset: цели доски
+    :param limit:
+    :param cursor:
+    :return: колонки {'status', 'goals', 'next'}, next - курсор продолжения или None
+    """
+    serializer = GoalValuesSerializer()
+    if cursor is not None:
+        queryset = queryset.filter(cursor.get_filter())
+    column = serializer.get_values(
+        queryset.filter(status=RawSQL('kanban_columns.status', ()))
+    ).order_by('-priority', '-id')[:limit + 1]
+    sql, params = column.query.sql_with_params()
+    names = serializer.get_columns()
+
+    statuses = (cursor.status,) if cursor is not None else KANBAN_STATUSES
+    rows: dict[int, list[dict]] = {status: [] for status in statuses}
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(
+            f'SELECT kanban_goals.* FROM unnest(%s::smallint[]) AS kanban_columns(status) '
+            f'CROSS JOIN LATERAL ({sql}) AS kanban_goals',
+            [list(statuses), *params],
+        )
+        for values in db_cursor.fetchall():
+            row = dict(zip(names, values))
+            rows[row['status']].append(row)
+
+    columns = []
+    for status, column_rows in rows.items():
+        column_rows.sort(key=lambda row: (-row['priority'], -row['id']))
+        goals = column_rows[:limit]
+        columns.append({
+            'status': status,
+            'goals': serializer.many(goals),
+            'next': ColumnCursor(status, goals[-1]['priority'], goals[-1]['id']) if len(column_rows) > limit else None,
+        })
+    return columns
@@ -0,0 +1,32 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from goals.archive import archive_batch, move_cold_goals
+from goals.models import ArchiveTask
+
+
+class Command(BaseCommand):
+    help = "Archive goals of deleted boards and categories in batches, resuming interrupted tasks, " \
+           "and move long-archived goals to cold storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Обработать очередь и завершиться')
+        parser.add_argument('--batch-size', type=int, help='По умолчанию ARCHIVE_BATCH_SIZE')
+        parser.add_argument('--sleep', type=float, default=5, help='Пауза при пустой очереди, сек')
+
+    def handle(self, *args, **options):
+        while True:
+            task = archive_batch(options['batch_size'])
+            if task is None:
+                # очередь пуста - переносим в холодные таблицы давно архивированные цели
+                if moved := move_cold_goals(options['batch_size']):
+                    self.stdout.write(f'moved to cold storage: {moved}')
+                    continue
+                if options['once']:
+                    return
+                sleep(options['sleep'])
+                continue
+            if task.status == ArchiveTask.Status.done:
+                self.stdout.write(f'task {task.id}: board={task.board_id} category={task.category_id} '
+                                  f'archived={task.archived}')
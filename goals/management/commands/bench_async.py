@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from time import perf_counter
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from requests.adapters import HTTPAdapter
+
+
+class Command(BaseCommand):
+    help = "Load test a read endpoint on the WSGI and ASGI deployments: requests/s and p50/p95 latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', default='http://localhost:8000', help='Адрес WSGI сервера')
+        parser.add_argument('--async-url', default='http://localhost:8001', help='Адрес ASGI сервера')
+        parser.add_argument('--path', default='goals/goal/list?limit=20', help='Путь без ведущего /')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--concurrency', type=int, default=50, help='Одновременных запросов')
+        parser.add_argument('--requests', type=int, default=1000, help='Всего запросов на сервер')
+
+    def handle(self, *args, **options):
+        targets = {
+            'sync': (options['sync_url'].rstrip('/'), options['path']),
+            'async': (options['async_url'].rstrip('/'), f"async/{options['path']}"),
+        }
+        for name, (base_url, path) in targets.items():
+            session = self._login(base_url, options['username'], options['password'])
+            url = f'{base_url}/{path}'
+            seconds, latencies = self._measure(session, url, options['concurrency'], options['requests'])
+            p50, p95 = (quantiles(latencies, n=100)[index] * 1000 for index in (49, 94))
+            self.stdout.write(
+                f'{name:<6} {len(latencies) / seconds:8.1f} req/s  p50={p50:.1f}ms  p95={p95:.1f}ms  {url}'
+            )
+
+    @staticmethod
+    def _login(base_url: str, username: str, password: str) -> requests.Session:
+        session = requests.Session()
+        response = session.post(f'{base_url}/core/login', json={'username': username, 'password': password})
+        if not response.ok:
+            raise CommandError(f'Не удалось войти на {base_url}: {response.status_code}')
+        # пул соединений по числу потоков, иначе часть запросов ждет свободное соединение
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=256)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    @staticmethod
+    def _measure(session: requests.Session, url: str, concurrency: int, total: int) -> tuple[float, list[float]]:
+        def fetch(_) -> float:
+            started = perf_counter()
+            response = session.get(url)
+            response.raise_for_status()
+            return perf_counter() - started
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(fetch, range(total)))
+        return perf_counter() - started, latencies
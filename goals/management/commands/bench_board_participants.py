@@ -0,0 +1,54 @@
+from time import perf_counter
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.models import User
+from goals.models import Board, BoardParticipant
+from goals.serializers import BoardSerializer
+
+
+class Command(BaseCommand):
+    help = "Benchmark BoardSerializer.update: 10% removed, 10% role changes and 10% added participants"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000],
+                            help='Число участников доски')
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with transaction.atomic():
+                board, owner, data = self._prepare(size)
+                serializer = BoardSerializer(board, data=data, context={'request': SimpleNamespace(user=owner)})
+                with CaptureQueriesContext(connection) as context:
+                    started = perf_counter()
+                    serializer.is_valid(raise_exception=True)
+                    serializer.save()
+                    seconds = perf_counter() - started
+                # тестовые данные не сохраняются
+                transaction.set_rollback(True)
+            self.stdout.write(
+                f'{size:>6} participants {seconds * 1000:9.1f} ms {len(context.captured_queries):>4} queries'
+            )
+
+    @staticmethod
+    def _prepare(size: int) -> tuple[Board, User, dict]:
+        users = User.objects.bulk_create(
+            User(username=f'bench_participant_{number}') for number in range(size * 11 // 10 + 1)
+        )
+        owner, users = users[0], users[1:]
+        board = Board.objects.create(title='bench')
+        BoardParticipant.objects.create(board=board, user=owner, role=BoardParticipant.Role.owner)
+        BoardParticipant.objects.bulk_create(
+            BoardParticipant(board=board, user=user, role=BoardParticipant.Role.reader) for user in users[:size]
+        )
+        step = max(size // 10, 1)
+        kept = [(user, BoardParticipant.Role.reader) for user in users[step * 2:size]]
+        changed = [(user, BoardParticipant.Role.writer) for user in users[step:step * 2]]
+        added = [(user, BoardParticipant.Role.writer) for user in users[size:]]
+        return board, owner, {
+            'title': 'bench',
+            'participants': [{'user': user.username, 'role': role} for user, role in kept + changed + added],
+        }
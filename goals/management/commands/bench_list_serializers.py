@@ -0,0 +1,55 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import User
+from goals.fast_serializers import GoalValuesSerializer
+from goals.models import Board, BoardParticipant, Goal, GoalCategory
+from goals.serializers import GoalSerializer
+
+
+class Command(BaseCommand):
+    help = "Benchmark goal list serialization: GoalSerializer vs values() fast path"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Целей на странице')
+        parser.add_argument('--repeat', type=int, default=50, help='Количество повторов')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        with transaction.atomic():
+            queryset = self._create_goals(rows)
+            values_serializer = GoalValuesSerializer()
+            results = {
+                'GoalSerializer': self._measure(lambda: GoalSerializer(queryset.all(), many=True).data, repeat),
+                'GoalValuesSerializer': self._measure(
+                    lambda: values_serializer.many(values_serializer.get_values(queryset.all())), repeat
+                ),
+            }
+            # тестовые данные не сохраняются
+            transaction.set_rollback(True)
+
+        for name, seconds in results.items():
+            self.stdout.write(f'{name:<22} {seconds / (rows * repeat) * 1e6:8.1f} µs/row')
+        self.stdout.write(f"speedup x{results['GoalSerializer'] / results['GoalValuesSerializer']:.1f}")
+
+    @staticmethod
+    def _create_goals(rows: int):
+        user = User.objects.create(username='bench_list_serializers')
+        board = Board.objects.create(title='bench')
+        BoardParticipant.objects.create(board=board, user=user, role=BoardParticipant.Role.owner)
+        category = GoalCategory.objects.create(title='bench', user=user, board=board)
+        Goal.objects.bulk_create(
+            Goal(title=f'goal {number}', description='bench', user=user, category=category, board=board)
+            for number in range(rows)
+        )
+        return Goal.objects.select_related('user').filter(board=board).order_by('id')
+
+    @staticmethod
+    def _measure(func, repeat: int) -> float:
+        func()
+        started = perf_counter()
+        for _ in range(repeat):
+            func()
+        return perf_counter() - started
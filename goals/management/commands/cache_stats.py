@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from goals.membership import get_board_roles_stats, reset_board_roles_stats
+from goals.response_cache import get_cache_memory, get_list_cache_stats, reset_list_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show cache hit/miss counters and cache memory usage"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Сбросить счетчики после вывода')
+
+    def handle(self, *args, **options):
+        self._write_ratio('board roles', get_board_roles_stats())
+        self._write_ratio('list responses', get_list_cache_stats())
+        if memory := get_cache_memory():
+            self.stdout.write('memory: ' + ' '.join(f'{name}={value}' for name, value in memory.items()))
+        if options['reset']:
+            reset_board_roles_stats()
+            reset_list_cache_stats()
+
+    def _write_ratio(self, name: str, stats: dict[str, int]) -> None:
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(f"{name}: hits={stats['hits']} misses={stats['misses']} hit_ratio={ratio:.2%}")
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import User
+from goals.importer import IMPORT_FORMATS, GoalImporter, ImportDataError
+from goals.models import Board
+
+
+class Command(BaseCommand):
+    help = "Import goals and comments into a board from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('board', type=int, help='id доски')
+        parser.add_argument('path', type=Path, help='Файл CSV или NDJSON')
+        parser.add_argument('--user', required=True, help='Автор импортируемых записей (username)')
+        parser.add_argument('--format', dest='import_format', choices=IMPORT_FORMATS,
+                            help='По умолчанию по расширению файла')
+
+    def handle(self, *args, **options):
+        path: Path = options['path']
+        import_format: str = options['import_format'] or ('csv' if path.suffix == '.csv' else 'ndjson')
+        try:
+            board = Board.live.get(pk=options['board'])
+            user = User.objects.get(username=options['user'])
+        except (Board.DoesNotExist, User.DoesNotExist) as error:
+            raise CommandError(error)
+
+        with path.open(encoding='utf-8', newline='') as file:
+            try:
+                result = GoalImporter(board, user).run(file, import_format)
+            except ImportDataError as error:
+                for item in error.errors:
+                    self.stderr.write(f"line {item['line']}: {item['errors']}")
+                raise CommandError('Импорт отменен, данные не сохранены')
+
+        self.stdout.write(
+            f'goals={result.goals} comments={result.comments} categories={result.categories} '
+            f'in {result.seconds:.2f}s ({result.rows_per_second} rows/s)'
+        )
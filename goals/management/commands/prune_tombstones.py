@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from goals.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete sync feed tombstones older than SYNC_RETENTION_DAYS"
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.filter(
+            deleted__lt=timezone.now() - timedelta(days=settings.SYNC_RETENTION_DAYS)
+        ).delete()
+        self.stdout.write(f'deleted={deleted}')
@@ -0,0 +1,22 @@
+from time import sleep
+
+from django.core.management.base import BaseCommand
+
+from goals.positions import rebalance_positions
+
+
+class Command(BaseCommand):
+    help = "Rewrite goal position keys in columns where keys have grown longer than GOAL_POSITION_MAX_LENGTH"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-length', type=int, help='По умолчанию GOAL_POSITION_MAX_LENGTH')
+        parser.add_argument('--interval', type=float, help='Повторять каждые N секунд, без него - один раз')
+
+    def handle(self, *args, **options):
+        while True:
+            rewritten = rebalance_positions(options['max_length'])
+            if rewritten:
+                self.stdout.write(f'rewritten={rewritten}')
+            if options['interval'] is None:
+                return
+            sleep(options['interval'])
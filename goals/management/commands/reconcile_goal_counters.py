@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from goals.counters import reconcile_goal_counters
+
+
+class Command(BaseCommand):
+    help = "Recalculate trigger-maintained goal counters from the goals table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, help='Пересчитать только одну доску')
+
+    def handle(self, *args, **options):
+        rows = reconcile_goal_counters(options['board'])
+        self.stdout.write(f'counters={rows}')
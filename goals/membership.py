@@ -0,0 +1,187 @@
+from functools import cached_property
+from threading import Lock
+from time import monotonic, time_ns
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.request import Request
+
+from goals.models import BoardParticipant
+
+ROLES_CACHE_KEY = 'board_roles:{user_id}:{generation}'
+ROLES_GENERATION_KEY = 'board_roles:generation:{user_id}'
+ROLES_STATS_KEY = 'board_roles:stats:{name}'
+
+# попадания и промахи кеша ролей копятся в процессе и переносятся в кеш не чаще
+# раза в BOARD_ROLES_STATS_FLUSH_INTERVAL секунд: проверка доступа не платит лишним обращением к Redis
+_roles_stats = {'hits': 0, 'misses': 0}
+_roles_stats_lock = Lock()
+_roles_stats_flushed = monotonic()
+
+
+def incr_counter(key: str, delta: int = 1) -> None:
+    """
+    Увеличивает бессрочный счетчик в кеше, создавая его при отсутствии
+    :param key:
+    :param delta:
+    :return:
+    """
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, delta)
+
+
+def _count(name: str) -> None:
+    """
+    Увеличивает счетчик попаданий/промахов кеша ролей процесса
+    :param name:
+    :return:
+    """
+    with _roles_stats_lock:
+        _roles_stats[name] += 1
+        due = monotonic() - _roles_stats_flushed >= settings.BOARD_ROLES_STATS_FLUSH_INTERVAL
+    if due:
+        flush_board_roles_stats()
+
+
+def flush_board_roles_stats() -> None:
+    """
+    Переносит накопленные в процессе счетчики кеша ролей в общий кеш
+    :return:
+    """
+    global _roles_stats_flushed
+    with _roles_stats_lock:
+        pending = dict(_roles_stats)
+        _roles_stats.update(hits=0, misses=0)
+        _roles_stats_flushed = monotonic()
+    for name, value in pending.items():
+        if value:
+            incr_counter(ROLES_STATS_KEY.format(name=name), value)
+
+
+def _new_generation() -> int:
+    # поколение после вытеснения ключа не совпадает ни с одним прежним, старые роли не оживают
+    return time_ns()
+
+
+def get_roles_cache_key(user_id: int) -> str:
+    """
+    Ключ ролей пользователя текущего поколения
+    :param user_id:
+    :return:
+    """
+    generation = cache.get_or_set(ROLES_GENERATION_KEY.format(user_id=user_id), _new_generation, timeout=None)
+    return ROLES_CACHE_KEY.format(user_id=user_id, generation=generation)
+
+
+def get_board_roles(user_id: int) -> dict[int, int]:
+    """
+    Роли пользователя во всех его досках {board_id: role}, из кеша или из базы.
+    Ключ включает поколение ролей пользователя: если роли прочитаны из базы до фиксации
+    изменения участников, а записаны в кеш после сброса, запись уходит под уже мертвый ключ
+    :param user_id:
+    :return:
+    """
+    key = get_roles_cache_key(user_id)
+    roles: dict[int, int] | None = cache.get(key)
+    if roles is not None:
+        _count('hits')
+        return roles
+    _count('misses')
+    roles = dict(BoardParticipant.objects.filter(user_id=user_id).values_list('board_id', 'role'))
+    cache.set(key, roles, settings.BOARD_ROLES_CACHE_TIMEOUT)
+    return roles
+
+
+def _next_generation(user_ids: set[int]) -> None:
+    for user_id in user_ids:
+        key = ROLES_GENERATION_KEY.format(user_id=user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), timeout=None)
+
+
+def invalidate_board_roles(user_ids: Iterable[int]) -> None:
+    """
+    Сбрасывает закешированные роли пользователей после фиксации транзакции,
+    в которой изменился состав участников досок: поколение ролей увеличивается
+    :param user_ids:
+    :return:
+    """
+    user_ids = set(user_ids)
+    if user_ids:
+        transaction.on_commit(lambda: _next_generation(user_ids))
+
+
+def get_board_roles_stats() -> dict[str, int]:
+    """
+    Счетчики попаданий и промахов кеша ролей всех процессов. Счетчики текущего процесса переносятся
+    в кеш перед чтением, других процессов - отстают не больше чем на BOARD_ROLES_STATS_FLUSH_INTERVAL
+    :return:
+    """
+    flush_board_roles_stats()
+    names = ('hits', 'misses')
+    values = cache.get_many([ROLES_STATS_KEY.format(name=name) for name in names])
+    return {name: int(values.get(ROLES_STATS_KEY.format(name=name)) or 0) for name in names}
+
+
+def reset_board_roles_stats() -> None:
+    with _roles_stats_lock:
+        _roles_stats.update(hits=0, misses=0)
+    cache.delete_many([ROLES_STATS_KEY.format(name=name) for name in ('hits', 'misses')])
+
+
+class BoardMembership:
+    """
+    Роли пользователя в досках в виде {board_id: role}.
+    Читаются из общего кеша (при промахе одним запросом из базы) при первом обращении
+    и переиспользуются всеми проверками доступа в рамках запроса.
+    """
+    write_roles = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+    def __init__(self, user_id: int | None):
+        self.user_id = user_id
+
+    @cached_property
+    def roles(self) -> dict[int, int]:
+        """
+        Роли пользователя во всех его досках
+        :return:
+        """
+        if self.user_id is None:
+            return {}
+        return get_board_roles(self.user_id)
+
+    @property
+    def board_ids(self) -> list[int]:
+        return list(self.roles)
+
+    def role(self, board_id: int) -> int | None:
+        return self.roles.get(board_id)
+
+    def is_participant(self, board_id: int) -> bool:
+        return board_id in self.roles
+
+    def can_write(self, board_id: int) -> bool:
+        return self.role(board_id) in self.write_roles
+
+    def is_owner(self, board_id: int) -> bool:
+        return self.role(board_id) == BoardParticipant.Role.owner
+
+
+def get_membership(request: Request) -> BoardMembership:
+    """
+    Возвращает роли текущего пользователя, закешированные на объекте запроса
+    :param request:
+    :return:
+    """
+    membership: BoardMembership | None = getattr(request, '_board_membership', None)
+    if membership is None or membership.user_id != request.user.id:
+        membership = BoardMembership(request.user.id)
+        request._board_membership = membership
+    return membership
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.13 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0007_alter_boardparticipant_board_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['created', 'id'], name='goals_goal_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', 'created', 'id'], name='goals_comment_goal_created_idx'),
+        ),
+    ]
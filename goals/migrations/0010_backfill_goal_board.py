@@ -0,0 +1,42 @@
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 1000
+
+
+def backfill(model, source_model, source_field: str) -> None:
+    """
+    Заполняет board_id пачками по первичному ключу, каждая пачка в отдельной транзакции
+    """
+    last_id = 0
+    board_id = Subquery(source_model.objects.filter(pk=OuterRef(source_field)).values('board_id')[:1])
+    while True:
+        ids = list(
+            model.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            return
+        with transaction.atomic():
+            model.objects.filter(pk__in=ids).update(board_id=board_id)
+        last_id = ids[-1]
+
+
+def backfill_board(apps, schema_editor):
+    goal_model = apps.get_model('goals', 'Goal')
+    goal_comment_model = apps.get_model('goals', 'GoalComment')
+    goal_category_model = apps.get_model('goals', 'GoalCategory')
+
+    backfill(goal_model, goal_category_model, 'category_id')
+    backfill(goal_comment_model, goal_model, 'goal_id')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0009_goal_board_goalcomment_board'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_board, migrations.RunPython.noop)
+    ]
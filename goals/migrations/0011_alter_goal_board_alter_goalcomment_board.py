@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_backfill_goal_board'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goal',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goal', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AlterField(
+            model_name='goalcomment',
+            name='board',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.PROTECT, related_name='goal_comment', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'status'], name='goals_goal_board_status_idx'),
+        ),
+    ]
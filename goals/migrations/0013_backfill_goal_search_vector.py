@@ -0,0 +1,37 @@
+import django.contrib.postgres.indexes
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def backfill_search_vector(apps, schema_editor):
+    """
+    Пересчитывает search_vector пачками по первичному ключу, вектор считает триггер goals_goal_search_vector_trigger
+    """
+    goal_model = apps.get_model('goals', 'Goal')
+    last_id = 0
+    while True:
+        ids = list(
+            goal_model.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not ids:
+            return
+        with transaction.atomic():
+            goal_model.objects.filter(pk__in=ids).update(search_vector=None)
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('goals', '0012_goal_search_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='goal',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='goals_goal_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.1.13 on 2026-10-18 20:30
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0013_backfill_goal_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['title'], name='goals_category_title_trgm_idx', opclasses=('gin_trgm_ops',)),
+        ),
+    ]
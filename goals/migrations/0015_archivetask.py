@@ -0,0 +1,36 @@
+# Generated by Django 4.1.13 on 2026-10-18 20:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_goalcategory_title_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('status', models.SmallIntegerField(choices=[(1, 'В очереди'), (2, 'Завершена')], default=1, verbose_name='Статус')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Последняя обработанная цель')),
+                ('archived', models.PositiveIntegerField(default=0, verbose_name='Архивировано целей')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Завершена')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archive_tasks', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archive_tasks', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Архивация',
+                'verbose_name_plural': 'Архивации',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivetask',
+            index=models.Index(condition=models.Q(('status', 1)), fields=['id'], name='goals_archivetask_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0015_archivetask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('board', 'Доска'), ('category', 'Категория'), ('goal', 'Цель'), ('comment', 'Комментарий')], max_length=16, verbose_name='Тип')),
+                ('object_id', models.BigIntegerField(verbose_name='id объекта')),
+                ('deleted', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Удален')),
+            ],
+            options={
+                'verbose_name': 'Удаление',
+                'verbose_name_plural': 'Удаления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='board',
+            index=models.Index(fields=['updated', 'id'], name='goals_board_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goals_goal_board_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcategory',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goals_category_board_upd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['board', 'updated', 'id'], name='goals_comment_board_upd_idx'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='board',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['board', 'deleted', 'id'], name='goals_tombstone_board_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'deleted', 'id'], name='goals_tombstone_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted'], name='goals_tombstone_deleted_idx'),
+        ),
+    ]
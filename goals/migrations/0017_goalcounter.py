@@ -0,0 +1,104 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:10
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+COUNTER_UPSERT = """
+    INSERT INTO goals_goalcounter AS counter (category_id, status, priority, due_date, board_id, count)
+    SELECT category_id, status, priority, due_date, max(board_id), sum(delta)
+    FROM ({changes}) AS changes
+    GROUP BY category_id, status, priority, due_date
+    HAVING sum(delta) <> 0
+    ON CONFLICT (category_id, status, priority, COALESCE(due_date, '0001-01-01'::date))
+    DO UPDATE SET count = counter.count + EXCLUDED.count;
+"""
+NEW_ROWS = 'SELECT category_id, status, priority, due_date, board_id, 1 AS delta FROM new_goals'
+OLD_ROWS = 'SELECT category_id, status, priority, due_date, board_id, -1 AS delta FROM old_goals'
+
+# триггеры уровня оператора с таблицами переходов: пакетный INSERT/UPDATE/DELETE целей
+# (bulk_create, update(), импорт INSERT ... SELECT) меняет счетчики одним сгруппированным upsert
+COUNTER_TRIGGERS = f"""
+CREATE FUNCTION goals_goalcounter_insert() RETURNS trigger AS $$
+BEGIN
+    {COUNTER_UPSERT.format(changes=NEW_ROWS)}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_goalcounter_update() RETURNS trigger AS $$
+BEGIN
+    {COUNTER_UPSERT.format(changes=f'{NEW_ROWS} UNION ALL {OLD_ROWS}')}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION goals_goalcounter_delete() RETURNS trigger AS $$
+BEGIN
+    {COUNTER_UPSERT.format(changes=OLD_ROWS)}
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER goals_goalcounter_insert_trigger
+    AFTER INSERT ON goals_goal REFERENCING NEW TABLE AS new_goals
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_goalcounter_insert();
+
+CREATE TRIGGER goals_goalcounter_update_trigger
+    AFTER UPDATE ON goals_goal REFERENCING OLD TABLE AS old_goals NEW TABLE AS new_goals
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_goalcounter_update();
+
+CREATE TRIGGER goals_goalcounter_delete_trigger
+    AFTER DELETE ON goals_goal REFERENCING OLD TABLE AS old_goals
+    FOR EACH STATEMENT EXECUTE FUNCTION goals_goalcounter_delete();
+"""
+
+DROP_COUNTER_TRIGGERS = """
+DROP TRIGGER IF EXISTS goals_goalcounter_insert_trigger ON goals_goal;
+DROP TRIGGER IF EXISTS goals_goalcounter_update_trigger ON goals_goal;
+DROP TRIGGER IF EXISTS goals_goalcounter_delete_trigger ON goals_goal;
+DROP FUNCTION IF EXISTS goals_goalcounter_insert();
+DROP FUNCTION IF EXISTS goals_goalcounter_update();
+DROP FUNCTION IF EXISTS goals_goalcounter_delete();
+"""
+
+BACKFILL_COUNTERS = """
+INSERT INTO goals_goalcounter (category_id, status, priority, due_date, board_id, count)
+SELECT category_id, status, priority, due_date, max(board_id), count(*)
+FROM goals_goal
+GROUP BY category_id, status, priority, due_date;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0016_sync_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.SmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.SmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('due_date', models.DateField(null=True, verbose_name='Дата выполнения')),
+                ('count', models.IntegerField(default=0, verbose_name='Количество')),
+                ('board', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Счетчик целей',
+                'verbose_name_plural': 'Счетчики целей',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='goalcounter',
+            constraint=models.UniqueConstraint(models.F('category'), models.F('status'), models.F('priority'), django.db.models.functions.comparison.Coalesce('due_date', models.Value(datetime.date(1, 1, 1))), name='goals_goalcounter_key_uniq'),
+        ),
+        migrations.RunSQL(COUNTER_TRIGGERS, DROP_COUNTER_TRIGGERS),
+        migrations.RunSQL(BACKFILL_COUNTERS, migrations.RunSQL.noop),
+    ]
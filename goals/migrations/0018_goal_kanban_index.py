@@ -0,0 +1,22 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0017_goalcounter'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['board', 'status', 'priority', 'id'], name='goals_goal_kanban_idx'),
+        ),
+        # (board, status) - префикс нового индекса
+        migrations.RemoveIndex(
+            model_name='goal',
+            name='goals_goal_board_status_idx',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0018_goal_kanban_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='position',
+            field=models.CharField(db_collation='C', editable=False, max_length=255, null=True, verbose_name='Позиция'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['category', 'status', 'position'], name='goals_goal_position_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0019_goal_position'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedGoal',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created', models.DateTimeField()),
+                ('updated', models.DateTimeField()),
+                ('title', models.CharField(max_length=255, verbose_name='Название')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='Описание')),
+                ('due_date', models.DateField(blank=True, null=True, verbose_name='Дата выполнения')),
+                ('status', models.SmallIntegerField(choices=[(1, 'К выполнению'), (2, 'В процессе'), (3, 'Выполнено'), (4, 'Архив')], verbose_name='Статус')),
+                ('priority', models.SmallIntegerField(choices=[(1, 'Низкий'), (2, 'Средний'), (3, 'Высокий'), (4, 'Критический')], verbose_name='Приоритет')),
+                ('position', models.CharField(db_collation='C', max_length=255, null=True, verbose_name='Позиция')),
+                ('moved', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Перенесена в архив')),
+                ('board', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.goalcategory', verbose_name='Категория')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Архивная цель',
+                'verbose_name_plural': 'Архивные цели',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedGoalComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('created', models.DateTimeField()),
+                ('updated', models.DateTimeField()),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('board', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='goals.board', verbose_name='Доска')),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='goals.archivedgoal', verbose_name='Цель')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+            ],
+            options={
+                'verbose_name': 'Комментарий архивной цели',
+                'verbose_name_plural': 'Комментарии архивных целей',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedgoalcomment',
+            index=models.Index(fields=['board', 'id'], name='goals_archcomment_board_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedgoal',
+            index=models.Index(fields=['board', 'created', 'id'], name='goals_archgoal_board_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.1.13 on 2026-10-18 21:23
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY не выполняется в транзакции и не блокирует запись в таблицы
+    atomic = False
+
+    dependencies = [
+        ('goals', '0020_cold_storage'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['category'], name='goals_goal_live_category_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status', 4), _negated=True), fields=['board', 'created', 'id'], name='goals_goal_live_board_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='goalcategory',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['board'], name='goals_category_live_board_idx'),
+        ),
+    ]
@@ -0,0 +1,137 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from goals.fast_serializers import ValuesSerializer
+from goals.membership import get_membership
+from goals.response_cache import get_cached_response, set_cached_response
+from goals.versions import get_board_versions
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'Объект был изменен, получите актуальную версию'
+    default_code = 'precondition_failed'
+
+
+def set_validators(response, etag: str, last_modified: int | None) -> None:
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+
+
+class ValuesListMixin:
+    """
+    Сериализация списка через values() и values_serializer_class вместо serializer_class.
+    Это не переключатель для клиента: представление, задавшее values_serializer_class, всегда отдает список
+    этим путем, ответ совпадает с serializer_class байт в байт (tests/goals/values_serializer_test.py).
+    Без values_serializer_class работает обычный list. Фильтрация, сортировка и пагинация те же, что у ListAPIView
+    """
+    values_serializer_class: type[ValuesSerializer] | None = None
+
+    def list(self, request, *args, **kwargs) -> Response:
+        if self.values_serializer_class is None:
+            return super().list(request, *args, **kwargs)
+        serializer = self.values_serializer_class()
+        rows = serializer.get_values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(rows))
+
+
+class ConditionalListMixin:
+    """
+    Условный GET для списков по доскам пользователя: ETag и Last-Modified вычисляются
+    из его ролей и версий его досок (кеш), поэтому для неизменившегося списка
+    ответ 304 отдается без основного запроса к базе и сериализации
+    """
+
+    def get_list_validators(self) -> tuple[str, int | None]:
+        """
+        :return: ETag и время последнего изменения в секундах
+        """
+        roles = get_membership(self.request).roles
+        versions = get_board_versions(roles)
+        state = (
+            self.__class__.__name__,
+            self.request.user.id,
+            self.request.get_full_path(),
+            sorted((board_id, role, versions[board_id]) for board_id, role in roles.items()),
+        )
+        last_modified = max(versions.values()) // 10 ** 9 if versions else None
+        return quote_etag(md5(repr(state).encode()).hexdigest()), last_modified
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = self.get_list_response(etag, request, *args, **kwargs)
+        set_validators(response, etag, last_modified)
+        return response
+
+    def get_list_response(self, etag: str, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+
+class CachedListMixin(ConditionalListMixin):
+    """
+    Дополнительно хранит данные ответа в кеше под ключом из ETag: при смене ролей
+    или версии любой доски пользователя ключ меняется, старая запись вытесняется по TTL/LRU
+    """
+
+    def get_list_response(self, etag: str, request, *args, **kwargs) -> Response:
+        data = get_cached_response(etag)
+        if data is not None:
+            return Response(data)
+        response = super().get_list_response(etag, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_response(etag, response.data, settings.LIST_CACHE_TIMEOUT)
+        return response
+
+
+class ConditionalObjectMixin:
+    """
+    ETag и Last-Modified объекта: GET с If-None-Match/If-Modified-Since получает 304,
+    изменение с устаревшими If-Match/If-Unmodified-Since отклоняется с 412
+    """
+
+    def get_object_validators(self, instance) -> tuple[str, int]:
+        """
+        :param instance:
+        :return: ETag и время последнего изменения в секундах
+        """
+        return quote_etag(f'{instance.pk}-{instance.updated.timestamp()}'), int(instance.updated.timestamp())
+
+    def get_object(self):
+        instance = super().get_object()
+        if self.request.method not in SAFE_METHODS:
+            etag, last_modified = self.get_object_validators(instance)
+            if get_conditional_response(self.request, etag=etag, last_modified=last_modified) is not None:
+                raise PreconditionFailed()
+        return instance
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, last_modified = self.get_object_validators(instance)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        set_validators(response, etag, last_modified)
+        return response
+
+    def perform_update(self, serializer) -> None:
+        super().perform_update(serializer)
+        self.updated_instance = serializer.instance
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        set_validators(response, *self.get_object_validators(self.updated_instance))
+        return response
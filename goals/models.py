@@ -1,9 +1,97 @@
+from datetime import date
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField, TrigramSimilarity
 from django.db import models
+from django.db.models import Exists, Lookup, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from core.models import User
 
 
+@models.CharField.register_lookup
+class TrigramIContains(Lookup):
+    """
+    Поиск подстроки без учета регистра через ILIKE.
+    В отличие от icontains (UPPER(title) LIKE UPPER(...)) условие поддерживается триграммным GIN индексом
+    """
+    lookup_name = 'trigram_icontains'
+
+    def get_db_prep_lookup(self, value, connection):
+        return '%s', ['%%%s%%' % connection.ops.prep_for_like_query(value)]
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} ILIKE {rhs}', [*lhs_params, *rhs_params]
+
+
+class ParticipantQuerySet(models.QuerySet):
+    """
+    Фильтр по участию пользователя в доске через коррелированный EXISTS:
+    строки не размножаются по участникам доски, count() остается точным
+    """
+    board_ref = 'board_id'
+
+    def for_participant(self, user_id: int) -> 'ParticipantQuerySet':
+        return self.filter(Exists(
+            BoardParticipant.objects.filter(board_id=OuterRef(self.board_ref), user_id=user_id)
+        ))
+
+    def get_live_condition(self) -> Q:
+        """
+        Условие живых строк (не удалены и не в архиве) для менеджера live
+        :return:
+        """
+        return Q()
+
+
+class BoardQuerySet(ParticipantQuerySet):
+    board_ref = 'pk'
+
+    def get_live_condition(self) -> Q:
+        return Q(is_deleted=False)
+
+
+class GoalCategoryQuerySet(ParticipantQuerySet):
+    def get_live_condition(self) -> Q:
+        return Q(is_deleted=False)
+
+    def search_title(self, text: str) -> 'GoalCategoryQuerySet':
+        """
+        Поиск категорий по названию с учетом опечаток (pg_trgm), сначала самые похожие.
+        Оба условия (ILIKE и %) используют триграммный GIN индекс по title
+        :param text:
+        :return:
+        """
+        return self.annotate(similarity=TrigramSimilarity('title', text)).filter(
+            Q(title__trigram_icontains=text) | Q(title__trigram_similar=text)
+        ).order_by('-similarity', 'title', 'id')
+
+
+class GoalQuerySet(ParticipantQuerySet):
+    def get_live_condition(self) -> Q:
+        return ~Q(status=Goal.Status.archived) & Q(category__is_deleted=False)
+
+
+class GoalCommentQuerySet(ParticipantQuerySet):
+    def get_live_condition(self) -> Q:
+        return ~Q(goal__status=Goal.Status.archived) & Q(goal__category__is_deleted=False)
+
+
+class LiveManager(models.Manager):
+    """
+    Менеджер только живых строк: к каждому запросу добавляется условие get_live_condition набора запросов.
+    Менеджер objects остается полным, его читают лента изменений, архивация, счетчики и админка
+    """
+
+    def get_queryset(self) -> ParticipantQuerySet:
+        queryset = super().get_queryset()
+        return queryset.filter(queryset.get_live_condition())
+
+
 class CreateUpdateDateModel(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
@@ -16,9 +104,15 @@ class Board(CreateUpdateDateModel):
     is_deleted = models.BooleanField(verbose_name=_('Удалена'), default=False)
     title = models.CharField(verbose_name=_('Название'), max_length=255)
 
+    objects = BoardQuerySet.as_manager()
+    live = LiveManager.from_queryset(BoardQuerySet)()
+
     class Meta:
         verbose_name = _('Доска')
         verbose_name_plural = _('Доски')
+        indexes = [
+            models.Index(fields=('updated', 'id'), name='goals_board_updated_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -55,9 +149,18 @@ class GoalCategory(CreateUpdateDateModel):
     is_deleted = models.BooleanField(verbose_name=_('Удалена'), default=False)
     board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.PROTECT, related_name="goal_category")
 
+    objects = GoalCategoryQuerySet.as_manager()
+    live = LiveManager.from_queryset(GoalCategoryQuerySet)()
+
     class Meta:
         verbose_name = _('Категория')
         verbose_name_plural = _('Категории')
+        indexes = [
+            GinIndex(fields=('title',), opclasses=('gin_trgm_ops',), name='goals_category_title_trgm_idx'),
+            models.Index(fields=('board', 'updated', 'id'), name='goals_category_board_upd_idx'),
+            # частичные индексы живых строк по колонкам соединений (migrations/0021_live_indexes.py)
+            models.Index(fields=('board',), condition=Q(is_deleted=False), name='goals_category_live_board_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -84,23 +187,241 @@ class Goal(CreateUpdateDateModel):
     priority = models.SmallIntegerField(choices=Priority.choices, default=Priority.low, verbose_name=_('Приоритет'))
     category = models.ForeignKey(GoalCategory, verbose_name=_('Категория'), on_delete=models.CASCADE,
                                  related_name='goal')
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.PROTECT, related_name='goal',
+                              editable=False)
+    # заполняется триггером в базе из title и description (migrations/0012_goal_search_vector.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # дробный ключ порядка в колонке (категория, статус), сравнивается побайтно; без ключа - в конце колонки.
+    # Меняется только при перемещении (goals/positions.py)
+    position = models.CharField(verbose_name=_('Позиция'), max_length=255, null=True, editable=False,
+                                db_collation='C')
+
+    objects = GoalQuerySet.as_manager()
+    live = LiveManager.from_queryset(GoalQuerySet)()
 
     class Meta:
         verbose_name = _('Цель')
         verbose_name_plural = _('Цели')
+        indexes = [
+            models.Index(fields=('created', 'id'), name='goals_goal_created_id_idx'),
+            # колонки канбан-доски (goals/kanban.py): LATERAL на статус читает обратным просмотром
+            # первые строки в порядке (priority DESC, id DESC) без сортировки всей доски
+            models.Index(fields=('board', 'status', 'priority', 'id'), name='goals_goal_kanban_idx'),
+            models.Index(fields=('board', 'updated', 'id'), name='goals_goal_board_updated_idx'),
+            models.Index(fields=('category', 'status', 'position'), name='goals_goal_position_idx'),
+            # 4 - Status.archived, вложенный Meta не видит атрибутов модели
+            models.Index(fields=('category',), condition=~Q(status=4), name='goals_goal_live_category_idx'),
+            models.Index(fields=('board', 'created', 'id'), condition=~Q(status=4), name='goals_goal_live_board_idx'),
+            GinIndex(fields=('search_vector',), name='goals_goal_search_vector_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_board_id = instance.__dict__.get('board_id')
+        return instance
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Копирует board_id из категории, при переносе цели в категорию другой доски
+        переносит на новую доску и комментарии цели
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'category', 'category_id'} & set(update_fields):
+            self.board_id = self.category.board_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'board'}
+        super().save(*args, **kwargs)
+        loaded_board_id = getattr(self, '_loaded_board_id', None)
+        if loaded_board_id is not None and loaded_board_id != self.board_id:
+            self.goal_comment.update(board_id=self.board_id, updated=timezone.now())
+        self._loaded_board_id = self.board_id
+
 
 class GoalComment(CreateUpdateDateModel):
     user = models.ForeignKey(User, verbose_name=_('Автор'), on_delete=models.PROTECT, related_name='goal_comment')
     text = models.TextField(verbose_name=_('Текст'))
     goal = models.ForeignKey(Goal, verbose_name=_('Цель'), on_delete=models.CASCADE, related_name='goal_comment')
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.PROTECT, related_name='goal_comment',
+                              editable=False)
+
+    objects = GoalCommentQuerySet.as_manager()
+    live = LiveManager.from_queryset(GoalCommentQuerySet)()
 
     class Meta:
         verbose_name = _('Комментарий')
         verbose_name_plural = _('Комментарии')
+        indexes = [
+            models.Index(fields=('goal', 'created', 'id'), name='goals_comment_goal_created_idx'),
+            models.Index(fields=('board', 'updated', 'id'), name='goals_comment_board_upd_idx'),
+        ]
+
+    def __str__(self):
+        return self.text
+
+    def save(self, *args, **kwargs) -> None:
+        """
+        Копирует board_id из цели
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'goal', 'goal_id'} & set(update_fields):
+            self.board_id = self.goal.board_id
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'board'}
+        super().save(*args, **kwargs)
+
+
+class ArchiveTask(CreateUpdateDateModel):
+    """
+    Фоновая архивация целей удаленной доски или категории (goals/archive.py).
+    last_id - id последней обработанной цели, по нему прерванная архивация продолжается
+    """
+    class Status(models.IntegerChoices):
+        pending = 1, 'В очереди'
+        done = 2, 'Завершена'
+
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.PROTECT, related_name='archive_tasks')
+    category = models.ForeignKey(GoalCategory, verbose_name=_('Категория'), on_delete=models.PROTECT,
+                                 related_name='archive_tasks', null=True, blank=True)
+    status = models.SmallIntegerField(choices=Status.choices, default=Status.pending, verbose_name=_('Статус'))
+    last_id = models.BigIntegerField(verbose_name=_('Последняя обработанная цель'), default=0)
+    archived = models.PositiveIntegerField(verbose_name=_('Архивировано целей'), default=0)
+    finished = models.DateTimeField(verbose_name=_('Завершена'), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _('Архивация')
+        verbose_name_plural = _('Архивации')
+        indexes = [
+            # очередь: только задачи в статусе pending
+            models.Index(fields=('id',), condition=Q(status=1), name='goals_archivetask_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.board} / {self.category}' if self.category_id else str(self.board)
+
+
+class Tombstone(models.Model):
+    """
+    Запись об удалении для ленты изменений (goals/sync.py): физически удаленные объекты,
+    цели, перенесенные на другую доску, и потеря доступа к доске (user - бывший участник)
+    """
+    class Kind(models.TextChoices):
+        board = 'board', 'Доска'
+        category = 'category', 'Категория'
+        goal = 'goal', 'Цель'
+        comment = 'comment', 'Комментарий'
+
+    kind = models.CharField(verbose_name=_('Тип'), max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name=_('id объекта'))
+    # доска могла быть удалена из базы вместе с объектом
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name='+')
+    user = models.ForeignKey(User, verbose_name=_('Пользователь'), on_delete=models.CASCADE, null=True, blank=True,
+                             related_name='+')
+    deleted = models.DateTimeField(verbose_name=_('Удален'), default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Удаление')
+        verbose_name_plural = _('Удаления')
+        indexes = [
+            models.Index(fields=('board', 'deleted', 'id'), name='goals_tombstone_board_idx'),
+            models.Index(fields=('user', 'deleted', 'id'), name='goals_tombstone_user_idx'),
+            models.Index(fields=('deleted',), name='goals_tombstone_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
+
+
+class GoalCounter(models.Model):
+    """
+    Число целей категории по статусу, приоритету и сроку выполнения. Поддерживается триггерами
+    на goals_goal (migrations/0017_goalcounter.py) для любых изменений целей, включая пакетные и COPY,
+    пересчитывается командой reconcile_goal_counters
+    """
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name='+')
+    # отдельный индекс не нужен: category - первая колонка уникального ключа
+    category = models.ForeignKey(GoalCategory, verbose_name=_('Категория'), on_delete=models.DO_NOTHING,
+                                 db_constraint=False, db_index=False, related_name='+')
+    status = models.SmallIntegerField(choices=Goal.Status.choices, verbose_name=_('Статус'))
+    priority = models.SmallIntegerField(choices=Goal.Priority.choices, verbose_name=_('Приоритет'))
+    due_date = models.DateField(verbose_name=_('Дата выполнения'), null=True)
+    count = models.IntegerField(verbose_name=_('Количество'), default=0)
+
+    class Meta:
+        verbose_name = _('Счетчик целей')
+        verbose_name_plural = _('Счетчики целей')
+        constraints = [
+            # ключ ON CONFLICT в триггерах, цели без срока считаются в одной строке
+            models.UniqueConstraint(
+                'category', 'status', 'priority', Coalesce('due_date', Value(date.min)),
+                name='goals_goalcounter_key_uniq',
+            ),
+        ]
+
+
+class ArchivedGoal(models.Model):
+    """
+    Холодное хранилище архивных целей: archive_worker переносит их из goals_goal с теми же id
+    через GOAL_COLD_AFTER_DAYS после архивации (goals/archive.py), живые запросы эту таблицу не читают
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+    user = models.ForeignKey(User, verbose_name=_('Автор'), on_delete=models.PROTECT, related_name='+')
+    title = models.CharField(verbose_name=_('Название'), max_length=255)
+    description = models.TextField(verbose_name=_('Описание'), null=True, blank=True)
+    due_date = models.DateField(verbose_name=_('Дата выполнения'), null=True, blank=True)
+    status = models.SmallIntegerField(choices=Goal.Status.choices, verbose_name=_('Статус'))
+    priority = models.SmallIntegerField(choices=Goal.Priority.choices, verbose_name=_('Приоритет'))
+    position = models.CharField(verbose_name=_('Позиция'), max_length=255, null=True, db_collation='C')
+    category = models.ForeignKey(GoalCategory, verbose_name=_('Категория'), on_delete=models.DO_NOTHING,
+                                 db_constraint=False, related_name='+')
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name='+')
+    moved = models.DateTimeField(verbose_name=_('Перенесена в архив'), default=timezone.now)
+
+    class Meta:
+        verbose_name = _('Архивная цель')
+        verbose_name_plural = _('Архивные цели')
+        indexes = [
+            models.Index(fields=('board', 'created', 'id'), name='goals_archgoal_board_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedGoalComment(models.Model):
+    """
+    Комментарии архивных целей, переносятся вместе с целью
+    """
+    id = models.BigIntegerField(primary_key=True)
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+    user = models.ForeignKey(User, verbose_name=_('Автор'), on_delete=models.PROTECT, related_name='+')
+    text = models.TextField(verbose_name=_('Текст'))
+    goal = models.ForeignKey(ArchivedGoal, verbose_name=_('Цель'), on_delete=models.CASCADE,
+                             related_name='comments')
+    board = models.ForeignKey(Board, verbose_name=_('Доска'), on_delete=models.DO_NOTHING, db_constraint=False,
+                              related_name='+')
+
+    class Meta:
+        verbose_name = _('Комментарий архивной цели')
+        verbose_name_plural = _('Комментарии архивных целей')
+        indexes = [
+            models.Index(fields=('board', 'id'), name='goals_archcomment_board_idx'),
+        ]
 
     def __str__(self):
         return self.text
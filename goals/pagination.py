@@ -0,0 +1,198 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, NamedTuple
+
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, LimitOffsetPagination, _positive_int
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class Cursor(NamedTuple):
+    values: list
+    reverse: bool
+
+
+class KeysetPagination(BasePagination):
+    """
+    Пагинация по ключу (keyset): следующая страница выбирается условием
+    `(created, id) < (последнее значение)` вместо OFFSET, поэтому время ответа не зависит от глубины страницы
+    и не выполняется COUNT(*).
+    Сортировка берется из OrderingFilter представления (или его атрибута ordering) и всегда дополняется
+    первичным ключом, чтобы ключ был уникальным. Поля сортировки должны быть NOT NULL.
+    """
+    cursor_query_param = 'cursor'
+    limit_query_param = 'limit'
+    default_limit = 20
+    max_limit = 100
+    ordering = ('-created', '-id')
+    invalid_cursor_message = 'Неверный курсор'
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list:
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor.reverse)
+
+        if reverse:
+            queryset = queryset.order_by(*(self._invert(field) for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(cursor))
+
+        rows = list(queryset[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        self.page = rows[:self.limit]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        return self.page
+
+    def get_paginated_response(self, data: list) -> Response:
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_limit(self, request: Request) -> int:
+        try:
+            return _positive_int(request.query_params[self.limit_query_param], strict=True, cutoff=self.max_limit)
+        except (KeyError, ValueError):
+            return self.default_limit
+
+    def get_ordering(self, request: Request, queryset: QuerySet, view) -> tuple[str, ...]:
+        """
+        Сортировка запроса с уникальным первичным ключом в конце
+        :param request:
+        :param queryset:
+        :param view:
+        :return:
+        """
+        ordering = None
+        if view is not None:
+            if any(issubclass(backend, OrderingFilter) for backend in getattr(view, 'filter_backends', ())):
+                ordering = OrderingFilter().get_ordering(request, queryset, view)
+            else:
+                ordering = getattr(view, 'ordering', None)
+        ordering = [field.replace('pk', 'id', 1) if field.lstrip('-') == 'pk' else field
+                    for field in (ordering or self.ordering)]
+        if all(field.lstrip('-') != 'id' for field in ordering):
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return tuple(ordering)
+
+    def get_keyset_filter(self, cursor: Cursor) -> Q:
+        """
+        Условие "строка после курсора" для составного ключа:
+        (a > x) OR (a = x AND b > y) OR ...
+        :param cursor:
+        :return:
+        """
+        if len(cursor.values) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, cursor.values):
+            lookup = 'lt' if descending != cursor.reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request: Request) -> Cursor | None:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            return Cursor(values=list(data['v']), reverse=bool(data.get('r')))
+        except (BinasciiError, UnicodeError, ValueError, TypeError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor: Cursor) -> str:
+        data = {'v': [self._dump_value(value) for value in cursor.values]}
+        if cursor.reverse:
+            data['r'] = 1
+        encoded = urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(Cursor(values=self._row_key(self.page[-1]), reverse=False))
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(Cursor(values=self._row_key(self.page[0]), reverse=True))
+
+    def _row_key(self, row: Model | dict) -> list:
+        if isinstance(row, dict):
+            return [row[name] for name, _ in self.fields]
+        return [getattr(row, row._meta.get_field(name).attname) for name, _ in self.fields]
+
+    @staticmethod
+    def _invert(field: str) -> str:
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _dump_value(value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+
+class LimitOffsetOrKeysetPagination(LimitOffsetPagination):
+    """
+    По умолчанию limit/offset, как ожидает текущий фронтенд.
+    Если передан параметр `cursor` (для первой страницы пустой: `?cursor=`), используется KeysetPagination.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset: QuerySet, request: Request, view=None) -> list | None:
+        self.keyset = None
+        if self.keyset_pagination_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: list) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return super().get_schema_operation_parameters(view) + [
+            {
+                'name': self.keyset_pagination_class.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Курсор страницы; пустое значение включает пагинацию по ключу',
+                'schema': {'type': 'string'},
+            },
+        ]
@@ -1,6 +1,7 @@
 from rest_framework import permissions
 
-from goals.models import BoardParticipant, Board, GoalCategory, Goal, GoalComment
+from goals.membership import get_membership
+from goals.models import Board, GoalCategory, Goal, GoalComment
 
 
 class BoardPermissions(permissions.BasePermission):
@@ -9,10 +10,18 @@ class BoardPermissions(permissions.BasePermission):
         Return `True` if permission is granted, `False` otherwise.
         """
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user_id=request.user.id, board_id=obj.id).exists()
-        return BoardParticipant.objects.filter(user_id=request.user.id, board_id=obj.id,
-                                               role=BoardParticipant.Role.owner
-                                               ).exists()
+            return get_membership(request).is_participant(obj.id)
+        return get_membership(request).is_owner(obj.id)
+
+
+class BoardWritePermissions(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj: Board) -> bool:
+        """
+        Запись в содержимое доски (не в саму доску): владелец или редактор
+        """
+        if request.method in permissions.SAFE_METHODS:
+            return get_membership(request).is_participant(obj.id)
+        return get_membership(request).can_write(obj.id)
 
 
 class GoalCategoryPermissions(permissions.BasePermission):
@@ -21,11 +30,8 @@ class GoalCategoryPermissions(permissions.BasePermission):
         Return `True` if permission is granted, `False` otherwise.
         """
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user_id=request.user.id, board_id=obj.board.id).exists()
-        return BoardParticipant.objects.filter(
-            user_id=request.user.id, board_id=obj.board.id,
-            role__in=(BoardParticipant.Role.owner, BoardParticipant.Role.writer)
-        ).exists()
+            return get_membership(request).is_participant(obj.board_id)
+        return get_membership(request).can_write(obj.board_id)
 
 
 class GoalPermissions(permissions.BasePermission):
@@ -34,11 +40,8 @@ class GoalPermissions(permissions.BasePermission):
         Return `True` if permission is granted, `False` otherwise.
         """
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user_id=request.user.id, board_id=obj.category.board.id).exists()
-        return BoardParticipant.objects.filter(
-            user_id=request.user.id, board_id=obj.category.board.id,
-            role__in=(BoardParticipant.Role.owner, BoardParticipant.Role.writer)
-        ).exists()
+            return get_membership(request).is_participant(obj.board_id)
+        return get_membership(request).can_write(obj.board_id)
 
 
 class GoalCommentPermissions(permissions.BasePermission):
@@ -47,10 +50,5 @@ class GoalCommentPermissions(permissions.BasePermission):
         Return `True` if permission is granted, `False` otherwise.
         """
         if request.method in permissions.SAFE_METHODS:
-            return BoardParticipant.objects.filter(user_id=request.user.id,
-                                                   board_id=obj.goal.category.board.id
-                                                   ).exists()
-        return BoardParticipant.objects.filter(
-            user_id=request.user.id, board_id=obj.goal.category.board.id,
-            role__in=(BoardParticipant.Role.owner, BoardParticipant.Role.writer)
-        ).exists()
+            return get_membership(request).is_participant(obj.board_id)
+        return get_membership(request).can_write(obj.board_id)
@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from goals.models import Goal
+from goals.versions import bump_board_versions
+
+# цифры ключей в порядке возрастания кодов ASCII: колонка position сравнивается в collation "C"
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+# порядок целей в колонке (категория, статус) списка целей: без ключа (еще не перемещались) - в конце
+# в порядке создания. Канбан-доска делит цели по (доска, статус) и этот порядок не использует
+POSITION_ORDERING = (F('position').asc(nulls_last=True), 'id')
+
+
+def key_between(before: str | None, after: str | None) -> str:
+    """
+    Дробный ключ строго между соседями (None - начало или конец колонки).
+    Ключи не оканчиваются на '0', поэтому между любыми двумя различными ключами есть место
+    :param before:
+    :param after:
+    :return:
+    """
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f'{before!r} >= {after!r}')
+    if before and after is None:
+        # в конец колонки: увеличивается последняя цифра, которую можно увеличить, ключ растет медленно
+        for index in range(len(before) - 1, -1, -1):
+            digit = DIGITS.index(before[index])
+            if digit < len(DIGITS) - 1:
+                return before[:index] + DIGITS[digit + 1]
+        return before + DIGITS[len(DIGITS) // 2]
+    if after and before is None:
+        # в начало колонки: уменьшается первая цифра, которую можно уменьшить, не получив '0' в конце
+        for index, char in enumerate(after):
+            digit = DIGITS.index(char)
+            if digit > 1:
+                return after[:index] + DIGITS[digit - 1]
+    return _midpoint(before or '', after)
+
+
+def _midpoint(before: str, after: str | None) -> str:
+    if after is not None:
+        common = 0
+        while (before[common] if common < len(before) else '0') == after[common]:
+            common += 1
+        if common:
+            return after[:common] + _midpoint(before[common:], after[common:])
+    low = DIGITS.index(before[0]) if before else 0
+    high = DIGITS.index(after[0]) if after is not None else len(DIGITS)
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    if after is not None and len(after) > 1:
+        return after[0]
+    return DIGITS[low] + _midpoint(before[1:], None)
+
+
+def get_column(goal: Goal, status: int) -> QuerySet:
+    """
+    Остальные цели колонки (категория и статус), в которую переносится цель
+    :param goal:
+    :param status:
+    :return:
+    """
+    return Goal.objects.filter(category_id=goal.category_id, status=status).exclude(id=goal.id)
+
+
+def place_after(column: QuerySet, previous: Goal | None) -> str:
+    """
+    Ключ позиции сразу после previous (None - в начало колонки). Меняется только перемещаемая цель,
+    кроме случая, когда у previous и целей перед ней без ключа ключа еще нет: они получают ключи один раз
+    :param column:
+    :param previous:
+    :return:
+    """
+    if previous is None:
+        following = column.filter(position__isnull=False).order_by(*POSITION_ORDERING).first()
+        return key_between(None, following.position if following else None)
+
+    if previous.position is None:
+        last_key = column.filter(position__isnull=False).order_by(F('position').desc()).values_list(
+            'position', flat=True
+        ).first()
+        unplaced = list(column.filter(position__isnull=True, id__lte=previous.id).order_by('id'))
+        now = timezone.now()
+        for goal in unplaced:
+            last_key = goal.position = key_between(last_key, None)
+            goal.updated = now
+        Goal.objects.bulk_update(unplaced, fields=['position', 'updated'])
+        # цели без ключа стоят после всех ключей, поэтому место после previous свободно до конца колонки
+        return key_between(last_key, None)
+
+    following = column.filter(position__gt=previous.position).order_by(*POSITION_ORDERING).first()
+    return key_between(previous.position, following.position if following else None)
+
+
+def rebalance_positions(max_length: int | None = None) -> int:
+    """
+    Переписывает ключи колонок, где есть ключ длиннее max_length, равномерными короткими ключами
+    одинаковой длины (номер цели в колонке) одним UPDATE; порядок целей не меняется
+    :param max_length:
+    :return: число переписанных целей
+    """
+    max_length = max_length or settings.GOAL_POSITION_MAX_LENGTH
+    table = Goal._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"""
+            UPDATE {table} AS goal
+            SET position = lpad(ranked.number::text, length(ranked.total::text), '0') || 'V', updated = %s
+            FROM (
+                SELECT id,
+                       row_number() OVER (PARTITION BY category_id, status ORDER BY position NULLS LAST, id) AS number,
+                       count(*) OVER (PARTITION BY category_id, status) AS total
+                FROM {table}
+                WHERE (category_id, status) IN (
+                    SELECT DISTINCT category_id, status FROM {table} WHERE length(position) > %s
+                )
+            ) AS ranked
+            WHERE goal.id = ranked.id
+            RETURNING goal.board_id
+        """, [timezone.now(), max_length])
+        board_ids = [board_id for board_id, in cursor.fetchall()]
+        bump_board_versions(set(board_ids))
+    return len(board_ids)
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+
+from goals.membership import incr_counter
+
+LIST_CACHE_KEY = 'list_response:{etag}'
+LIST_CACHE_STATS_KEY = 'list_response:stats:{name}'
+
+
+def get_cached_response(etag: str) -> dict | list | None:
+    """
+    Данные ответа списка по ETag. ETag строится из ролей пользователя, версий его досок
+    и строки запроса, поэтому после любого изменения ключ другой и устаревший ответ не отдается
+    :param etag:
+    :return:
+    """
+    data = cache.get(LIST_CACHE_KEY.format(etag=etag.strip('"')))
+    incr_counter(LIST_CACHE_STATS_KEY.format(name='misses' if data is None else 'hits'))
+    return data
+
+
+def set_cached_response(etag: str, data: dict | list, timeout: int) -> None:
+    cache.set(LIST_CACHE_KEY.format(etag=etag.strip('"')), data, timeout)
+
+
+def get_list_cache_stats() -> dict[str, int]:
+    """
+    Счетчики попаданий и промахов кеша ответов
+    :return:
+    """
+    names = ('hits', 'misses')
+    values = cache.get_many([LIST_CACHE_STATS_KEY.format(name=name) for name in names])
+    return {name: int(values.get(LIST_CACHE_STATS_KEY.format(name=name)) or 0) for name in names}
+
+
+def reset_list_cache_stats() -> None:
+    cache.delete_many([LIST_CACHE_STATS_KEY.format(name=name) for name in ('hits', 'misses')])
+
+
+def get_cache_memory() -> dict[str, str | int]:
+    """
+    Расход памяти и вытеснения Redis, для других бэкендов кеша пусто
+    :return:
+    """
+    try:
+        from django_redis import get_redis_connection
+        connection = get_redis_connection('default')
+    except (ImportError, NotImplementedError):
+        return {}
+    info = {**connection.info('memory'), **connection.info('stats')}
+    return {
+        name: info.get(name)
+        for name in ('used_memory_human', 'maxmemory_human', 'maxmemory_policy', 'evicted_keys', 'expired_keys')
+    }
@@ -1,8 +1,17 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.db import transaction
+from django.db.models import OuterRef, Prefetch, Subquery, prefetch_related_objects
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
-from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
+from goals.filters import GoalFilter
+from goals.kanban import ColumnCursor
+from goals.membership import get_membership, invalidate_board_roles
+from goals.models import ArchivedGoal, GoalCategory, Goal, GoalComment, Board, BoardParticipant, Tombstone
+from goals.positions import get_column, place_after
+from goals.sync import Cursor
+from goals.versions import bump_board_versions
 from core.serializers import UserProfileSerializer
 from core.models import User
 
@@ -18,11 +27,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
         """
         if board.is_deleted:
             raise ValidationError('Нельзя создать категорию для доски в архиве')
-        if not BoardParticipant.objects.filter(
-            role__in=(BoardParticipant.Role.owner, BoardParticipant.Role.writer),
-            board_id=board.id,
-            user_id=self.context['request'].user.id
-        ):
+        if not get_membership(self.context['request']).can_write(board.id):
             raise ValidationError('У вас нет доступа для создания категорий в данной доске')
         return board
 
@@ -53,17 +58,13 @@ class GoalCreateSerializer(serializers.ModelSerializer):
         """
         if category.is_deleted:
             raise ValidationError('Нельзя создать цель для категории в архиве')
-        if not BoardParticipant.objects.filter(
-            role__in=(BoardParticipant.Role.owner, BoardParticipant.Role.writer),
-            board_id=category.board_id,
-            user_id=self.context['request'].user.id
-        ):
+        if not get_membership(self.context['request']).can_write(category.board_id):
             raise ValidationError('У вас нет доступа для создания целей в данной категории')
         return category
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('created', 'updated', 'user')
 
 
@@ -72,10 +73,272 @@ class GoalSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Goal
-        fields = '__all__'
+        exclude = ('search_vector',)
         read_only_fields = ('created', 'updated')
 
 
+class ArchivedGoalSerializer(serializers.ModelSerializer):
+    user = UserProfileSerializer(read_only=True)
+
+    class Meta:
+        model = ArchivedGoal
+        fields = '__all__'
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Берет объект из заранее загруженного словаря context[context_key] вместо запроса на каждое значение
+    """
+
+    def __init__(self, context_key: str, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if (obj := self.context[self.context_key].get(pk)) is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class GoalBulkItemSerializer(GoalCreateSerializer):
+    id = serializers.IntegerField(required=False)
+    category = PreloadedPrimaryKeyRelatedField(context_key='categories', queryset=GoalCategory.objects.all())
+
+
+class GoalBulkSerializer(serializers.Serializer):
+    """
+    Пакетное создание (элементы без id) и частичное обновление (элементы с id) целей.
+    Категории и цели загружаются одним запросом на весь пакет, запись идет через
+    bulk_create / bulk_update в одной транзакции. Ошибки отдельных элементов
+    возвращаются в errors и не отменяют остальные элементы.
+    """
+    item_serializer_class = GoalBulkItemSerializer
+    max_items = 1000
+
+    def to_internal_value(self, data: list) -> dict:
+        if not isinstance(data, list):
+            raise ValidationError({'non_field_errors': ['Ожидается список целей']})
+        if not data:
+            raise ValidationError({'non_field_errors': ['Список целей пуст']})
+        if len(data) > self.max_items:
+            raise ValidationError({'non_field_errors': [f'Не более {self.max_items} целей за запрос']})
+
+        membership = get_membership(self.context['request'])
+        items = [item if isinstance(item, dict) else {} for item in data]
+        category_ids = {self._to_int(item.get('category')) for item in items} - {None}
+        goal_ids = {self._to_int(item.get('id')) for item in items} - {None}
+        context = {
+            **self.context,
+            'categories': GoalCategory.objects.in_bulk(category_ids),
+            'goals': Goal.live.select_related('user').for_participant(membership.user_id).in_bulk(goal_ids),
+        }
+
+        to_create, to_update, errors = [], [], []
+        for index, item in enumerate(data):
+            if not isinstance(item, dict):
+                errors.append({'index': index, 'errors': {'non_field_errors': ['Ожидается объект цели']}})
+                continue
+            goal: Goal | None = None
+            if 'id' in item:
+                goal = context['goals'].get(self._to_int(item['id']))
+                if goal is None:
+                    errors.append({'index': index, 'errors': {'id': ['Цель не найдена']}})
+                    continue
+                if not membership.can_write(goal.board_id):
+                    errors.append({'index': index, 'errors': {'id': ['У вас нет доступа для изменения цели']}})
+                    continue
+            serializer = self.item_serializer_class(data=item, partial=goal is not None, context=context)
+            if not serializer.is_valid():
+                errors.append({'index': index, 'errors': serializer.errors})
+            elif goal is None:
+                to_create.append(serializer.validated_data)
+            else:
+                to_update.append((goal, serializer.validated_data))
+        return {'create': to_create, 'update': to_update, 'errors': errors}
+
+    def create(self, validated_data: dict) -> dict:
+        """
+        Записывает пакет: один bulk_create для новых целей и один bulk_update для измененных
+        :param validated_data:
+        :return:
+        """
+        now = timezone.now()
+        created = []
+        for attrs in validated_data['create']:
+            attrs.pop('id', None)
+            created.append(Goal(board_id=attrs['category'].board_id, **attrs))
+
+        updated, update_fields, moved_from = [], {'updated'}, {}
+        changed_board_ids = {goal.board_id for goal in created}
+        for goal, attrs in validated_data['update']:
+            attrs.pop('id', None)
+            attrs.pop('user', None)
+            changed_board_ids.add(goal.board_id)
+            if 'category' in attrs and attrs['category'].board_id != goal.board_id:
+                moved_from[goal.id] = goal.board_id
+                goal.board_id = attrs['category'].board_id
+                update_fields.add('board')
+            for field, value in attrs.items():
+                setattr(goal, field, value)
+                update_fields.add(field)
+            goal.updated = now
+            updated.append(goal)
+
+        with transaction.atomic():
+            if created:
+                Goal.objects.bulk_create(created, batch_size=500)
+            if updated:
+                Goal.objects.bulk_update(updated, fields=sorted(update_fields), batch_size=500)
+            if moved_from:
+                GoalComment.objects.filter(goal_id__in=moved_from).update(
+                    board_id=Subquery(Goal.objects.filter(pk=OuterRef('goal_id')).values('board_id')[:1]),
+                    updated=now,
+                )
+                Tombstone.objects.bulk_create(
+                    Tombstone(kind=Tombstone.Kind.goal, object_id=goal_id, board_id=board_id, deleted=now)
+                    for goal_id, board_id in moved_from.items()
+                )
+            bump_board_versions(changed_board_ids | {goal.board_id for goal in updated})
+        return {'created': created, 'updated': updated, 'errors': validated_data['errors']}
+
+    def to_representation(self, instance: dict) -> dict:
+        return {
+            'created': GoalSerializer(instance['created'], many=True).data,
+            'updated': GoalSerializer(instance['updated'], many=True).data,
+            'errors': instance['errors'],
+        }
+
+    @staticmethod
+    def _to_int(value) -> int | None:
+        if isinstance(value, bool):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+
+
+class GoalMoveSerializer(serializers.Serializer):
+    """
+    Перемещение цели внутри колонки или в другую колонку (статус) своей категории:
+    after - id цели колонки, за которой встает перемещаемая, null - в начало колонки.
+    Записывается только перемещаемая цель, ключ позиции выбирается между соседями
+    """
+    after = serializers.IntegerField(allow_null=True)
+    status = serializers.ChoiceField(choices=[
+        (value, label) for value, label in Goal.Status.choices if value != Goal.Status.archived
+    ], required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        goal: Goal = self.instance
+        attrs.setdefault('status', goal.status)
+        attrs['column'] = get_column(goal, attrs['status'])
+        attrs['previous'] = None
+        if attrs['after'] is not None:
+            attrs['previous'] = attrs['column'].filter(id=attrs['after']).first()
+            if attrs['previous'] is None:
+                raise ValidationError({'after': 'Цель не найдена в колонке'})
+        return attrs
+
+    def update(self, instance: Goal, validated_data: dict) -> Goal:
+        with transaction.atomic():
+            instance.position = place_after(validated_data['column'], validated_data['previous'])
+            instance.status = validated_data['status']
+            instance.save(update_fields=('position', 'status', 'updated'))
+        return instance
+
+    def to_representation(self, instance: Goal) -> dict:
+        return GoalSerializer(instance).data
+
+
+class GoalBulkStatusSerializer(serializers.Serializer):
+    """
+    Массовая смена статуса и/или приоритета целей по списку id или по выражению GoalFilter.
+    Доступ на запись проверяется один раз на доску, изменение выполняется одним UPDATE
+    только в досках, где у пользователя есть права на запись
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False,
+                                max_length=10000)
+    filter = serializers.DictField(required=False, allow_empty=False)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+
+    def validate_filter(self, value: dict) -> dict:
+        """
+        Неизвестный ключ FilterSet молча пропускает, и опечатка изменила бы все доступные цели
+        :param value:
+        :return:
+        """
+        if unknown := sorted(value.keys() - GoalFilter().filters.keys()):
+            raise ValidationError({key: ['Неизвестное поле фильтра'] for key in unknown})
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise ValidationError('Передайте либо ids, либо filter')
+        if 'status' not in attrs and 'priority' not in attrs:
+            raise ValidationError('Передайте status и/или priority')
+        return attrs
+
+    def create(self, validated_data: dict) -> int:
+        """
+        Обновляет цели одним запросом, возвращает количество измененных строк.
+        Версии меняются только у досок, в которых есть подходящие цели
+        :param validated_data:
+        :return:
+        """
+        membership = get_membership(self.context['request'])
+        writable_board_ids = [board_id for board_id in membership.board_ids if membership.can_write(board_id)]
+        queryset = Goal.live.filter(board_id__in=writable_board_ids)
+        if 'ids' in validated_data:
+            queryset = queryset.filter(id__in=validated_data['ids'])
+        else:
+            filterset = GoalFilter(data=validated_data['filter'], queryset=queryset)
+            if not filterset.is_valid():
+                raise ValidationError({'filter': filterset.errors})
+            queryset = filterset.qs
+        board_ids = list(queryset.order_by().values_list('board_id', flat=True).distinct())
+        if not board_ids:
+            return 0
+        values = {field: validated_data[field] for field in ('status', 'priority') if field in validated_data}
+        # цели других досок, подошедшие под условие после выборки досок, не меняются: их версии не сброшены
+        count = queryset.filter(board_id__in=board_ids).update(updated=timezone.now(), **values)
+        if count:
+            bump_board_versions(board_ids)
+        return count
+
+
+class GoalImportRowSerializer(serializers.Serializer):
+    """
+    Строка импорта: цель (категория по названию) или комментарий к цели из того же файла.
+    id цели в файле - внешний ключ, на который ссылается поле goal комментария
+    """
+    type = serializers.ChoiceField(choices=('goal', 'comment'), default='goal')
+    id = serializers.CharField(required=False, max_length=64)
+    category = serializers.CharField(required=False, max_length=255)
+    title = serializers.CharField(required=False, max_length=255)
+    description = serializers.CharField(required=False)
+    due_date = serializers.DateField(required=False)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, default=Goal.Status.to_do)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, default=Goal.Priority.low)
+    goal = serializers.CharField(required=False, max_length=64)
+    text = serializers.CharField(required=False)
+
+    required_fields = {'goal': ('category', 'title'), 'comment': ('goal', 'text')}
+
+    def validate(self, attrs: dict) -> dict:
+        missing = {field: 'Обязательное поле.' for field in self.required_fields[attrs['type']] if field not in attrs}
+        if missing:
+            raise ValidationError(missing)
+        return attrs
+
+
 class GoalCommentCreateSerializer(serializers.ModelSerializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
@@ -87,11 +350,7 @@ class GoalCommentCreateSerializer(serializers.ModelSerializer):
         """
         if goal.category.is_deleted:
             raise ValidationError('Нельзя создать комментарий для категории в архиве')
-        if not BoardParticipant.objects.filter(
-            role__in=(BoardParticipant.Role.owner, BoardParticipant.Role.writer),
-            board_id=goal.category.board_id,
-            user_id=self.context['request'].user.id
-        ):
+        if not get_membership(self.context['request']).can_write(goal.board_id):
             raise ValidationError('У вас нет доступа для создания комментариев для данной цели')
         return goal
 
@@ -123,6 +382,7 @@ class BoardCreateSerializer(serializers.ModelSerializer):
             user = validated_data.pop('user')
             board = Board.objects.create(**validated_data)
             BoardParticipant.objects.create(user_id=user.id, role=BoardParticipant.Role.owner, board_id=board.id)
+            invalidate_board_roles([user.id])
         return board
 
     class Meta:
@@ -131,12 +391,31 @@ class BoardCreateSerializer(serializers.ModelSerializer):
         read_only_fields = ('is_deleted', 'created', 'updated')
 
 
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Берет объект из заранее загруженного словаря context[context_key] {slug: объект},
+    без словаря в контексте ищет в базе как SlugRelatedField
+    """
+
+    def __init__(self, context_key: str, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        preloaded: dict | None = self.context.get(self.context_key)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        if (obj := preloaded.get(data if isinstance(data, str) else str(data))) is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return obj
+
+
 class BoardParticipantSerializer(serializers.ModelSerializer):
     role = serializers.ChoiceField(
         required=True, choices=BoardParticipant.Role.choices[1:]
     )
-    user = serializers.SlugRelatedField(
-        slug_field='username', queryset=User.objects.all()
+    user = PreloadedSlugRelatedField(
+        context_key='participant_users', slug_field='username', queryset=User.objects.all()
     )
 
     class Meta:
@@ -149,6 +428,31 @@ class BoardSerializer(serializers.ModelSerializer):
     participants = BoardParticipantSerializer(many=True)
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
+    def to_internal_value(self, data) -> dict:
+        """
+        Пользователи всех участников загружаются одним запросом до проверки участников
+        :param data:
+        :return:
+        """
+        participants = data.get('participants') if isinstance(data, dict) else None
+        if isinstance(participants, list):
+            usernames = {str(participant['user']) for participant in participants
+                         if isinstance(participant, dict) and participant.get('user') is not None}
+            self.context['participant_users'] = User.objects.in_bulk(usernames, field_name='username')
+        return super().to_internal_value(data)
+
+    def to_representation(self, instance: Board) -> dict:
+        """
+        Участники с пользователями одним запросом, если не загружены заранее (ответ на PUT/PATCH)
+        :param instance:
+        :return:
+        """
+        if 'participants' not in getattr(instance, '_prefetched_objects_cache', {}):
+            prefetch_related_objects(
+                [instance], Prefetch('participants', queryset=BoardParticipant.objects.select_related('user'))
+            )
+        return super().to_representation(instance)
+
     def validate_participants(self, participants: list[dict]) -> list[dict]:
         """
         Валидация участников доски, для исключения изменения владельца доски
@@ -162,41 +466,108 @@ class BoardSerializer(serializers.ModelSerializer):
 
     def update(self, instance: Board, validated_data: dict) -> Board:
         """
-        Обновляет данные доски, перебирает текущих участников у которых есть доступ, если их нет в переданных данных,
-        исключает их, заменяет роли при необходимости и меняет заголовок.
+        Обновляет участников доски, если они переданы, и меняет заголовок.
         :param instance:
         :param validated_data:
         :return:
         """
         owner: User = validated_data.pop('user')
-        participants: list[dict] = validated_data.pop('participants')
-        actual_participants: QuerySet[BoardParticipant] = instance.participants.exclude(user=owner)
-        new_participants_data: dict = {participant['user'].id: participant for participant in participants}
+        participants: list[dict] | None = validated_data.pop('participants', None)
         with transaction.atomic():
-            for participant in actual_participants:
-                participant_id: int = participant.user.id
-                participant_role: str = participant.role
-
-                if participant_id not in new_participants_data:
-                    participant.delete()
-                elif participant_role != new_participants_data[participant_id]['role']:
-                    participant.role = new_participants_data[participant_id]['role']
-                    participant.save()
-                del new_participants_data[participant_id]
-
-            for participant_object in new_participants_data.values():
-                BoardParticipant.objects.create(
-                    board=instance,
-                    user=participant_object['user'],
-                    role=participant_object['role']
-                )
-
+            changed = participants is not None and self._update_participants(instance, owner, participants)
             if title := validated_data.get('title'):
                 instance.title = title
+            if title or changed:
+                # с новым updated доска попадает в ленту изменений новых участников (goals/sync.py)
                 instance.save()
         return instance
 
+    @staticmethod
+    def _update_participants(instance: Board, owner: User, participants: list[dict]) -> bool:
+        """
+        Сравнивает текущих участников (кроме владельца) с переданными и применяет разницу одним удалением,
+        обновлением ролей (запрос на роль) и одним bulk_create: число запросов не зависит от числа участников
+        :param instance:
+        :param owner:
+        :param participants:
+        :return: изменился ли состав или роли участников
+        """
+        new_roles: dict[int, int] = {participant['user'].id: participant['role'] for participant in participants}
+        new_roles.pop(owner.id, None)
+        actual_roles: dict[int, int] = dict(
+            instance.participants.exclude(user_id=owner.id).values_list('user_id', 'role')
+        )
+        removed: set[int] = actual_roles.keys() - new_roles.keys()
+        added: set[int] = new_roles.keys() - actual_roles.keys()
+        changed: dict[int, list[int]] = {}
+        for user_id, role in new_roles.items():
+            if user_id in actual_roles and actual_roles[user_id] != role:
+                changed.setdefault(role, []).append(user_id)
+
+        now = timezone.now()
+        if removed:
+            # одним DELETE без сигналов на каждую строку (goals/signals.py): роли, версия доски
+            # и записи об удалении для ленты изменений обновляются здесь же один раз на все изменение
+            BoardParticipant.objects.filter(board=instance, user_id__in=removed)._raw_delete(
+                using=BoardParticipant.objects.db
+            )
+            Tombstone.objects.bulk_create(
+                Tombstone(kind=Tombstone.Kind.board, object_id=instance.id, board=instance, user_id=user_id,
+                          deleted=now)
+                for user_id in removed
+            )
+        for role, user_ids in changed.items():
+            BoardParticipant.objects.filter(board=instance, user_id__in=user_ids).update(role=role, updated=now)
+        if added:
+            BoardParticipant.objects.bulk_create(
+                BoardParticipant(board=instance, user_id=user_id, role=new_roles[user_id])
+                for user_id in added
+            )
+        changed_user_ids = [*removed, *added, *(user_id for ids in changed.values() for user_id in ids)]
+        if changed_user_ids:
+            invalidate_board_roles(changed_user_ids)
+            bump_board_versions([instance.id])
+        return bool(changed_user_ids)
+
     class Meta:
         model = Board
         fields = '__all__'
         read_only_fields = ('is_deleted', 'created', 'updated')
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    """
+    Параметры ленты изменений: курсор из предыдущего ответа (без него - с начала) и размер страницы
+    """
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_cursor(self, value: str) -> Cursor:
+        try:
+            return Cursor.decode(value)
+        except ValueError:
+            raise ValidationError('Некорректный курсор')
+
+    def validate_limit(self, value: int) -> int:
+        if value > settings.SYNC_MAX_PAGE_SIZE:
+            raise ValidationError(f'Не более {settings.SYNC_MAX_PAGE_SIZE} изменений за запрос')
+        return value
+
+
+class KanbanQuerySerializer(serializers.Serializer):
+    """
+    Параметры канбан-доски: число целей в колонке и курсор продолжения одной колонки
+    """
+    limit = serializers.IntegerField(required=False, min_value=1)
+    cursor = serializers.CharField(required=False)
+
+    def validate_cursor(self, value: str) -> ColumnCursor:
+        try:
+            return ColumnCursor.decode(value)
+        except ValueError:
+            raise ValidationError('Некорректный курсор')
+
+    def validate_limit(self, value: int) -> int:
+        if value > settings.KANBAN_MAX_COLUMN_SIZE:
+            raise ValidationError(f'Не более {settings.KANBAN_MAX_COLUMN_SIZE} целей в колонке')
+        return value
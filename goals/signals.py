@@ -0,0 +1,105 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import User
+from goals.membership import get_board_roles, invalidate_board_roles
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment, Tombstone
+from goals.versions import bump_board_versions
+
+
+@receiver(post_save, sender=Board)
+@receiver(post_delete, sender=Board)
+def board_changed(sender, instance: Board, **kwargs) -> None:
+    bump_board_versions([instance.id])
+
+
+@receiver(post_save, sender=BoardParticipant)
+@receiver(post_delete, sender=BoardParticipant)
+def participant_changed(sender, instance: BoardParticipant, **kwargs) -> None:
+    """
+    Состав участников меняется и в обход сериализаторов (админка, бот), поэтому роли сбрасываются здесь же
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    invalidate_board_roles([instance.user_id])
+    bump_board_versions([instance.board_id])
+
+
+@receiver(post_save, sender=GoalCategory)
+@receiver(post_delete, sender=GoalCategory)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=GoalComment)
+@receiver(post_delete, sender=GoalComment)
+def board_content_changed(sender, instance: GoalCategory | Goal | GoalComment, **kwargs) -> None:
+    bump_board_versions([instance.board_id])
+
+
+@receiver(post_save, sender=Goal)
+def goal_saved(sender, instance: Goal, **kwargs) -> None:
+    """
+    При переносе цели на другую доску меняется и доска, с которой она ушла
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    loaded_board_id: int | None = getattr(instance, '_loaded_board_id', None)
+    bump_board_versions([instance.board_id] if loaded_board_id is None else [instance.board_id, loaded_board_id])
+    if loaded_board_id is not None and loaded_board_id != instance.board_id:
+        Tombstone.objects.create(kind=Tombstone.Kind.goal, object_id=instance.id, board_id=loaded_board_id)
+
+
+@receiver(post_delete, sender=Board)
+@receiver(post_delete, sender=GoalCategory)
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=GoalComment)
+def object_deleted(sender, instance: Board | GoalCategory | Goal | GoalComment, **kwargs) -> None:
+    """
+    Физическое удаление попадает в ленту изменений через запись об удалении.
+    Каскадно удаленные объекты (комментарии удаленной цели) клиент удаляет вместе с родителем
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    origin = kwargs.get('origin')
+    if origin is not None and origin is not instance and getattr(origin, 'model', None) is not sender:
+        return
+    kind = {Board: Tombstone.Kind.board, GoalCategory: Tombstone.Kind.category, Goal: Tombstone.Kind.goal,
+            GoalComment: Tombstone.Kind.comment}[sender]
+    Tombstone.objects.create(
+        kind=kind, object_id=instance.id, board_id=instance.id if sender is Board else instance.board_id
+    )
+
+
+@receiver(post_delete, sender=BoardParticipant)
+def participant_deleted(sender, instance: BoardParticipant, **kwargs) -> None:
+    """
+    Бывший участник получает в ленте удаление доски
+    :param sender:
+    :param instance:
+    :param kwargs:
+    :return:
+    """
+    Tombstone.objects.create(
+        kind=Tombstone.Kind.board, object_id=instance.board_id, board_id=instance.board_id, user_id=instance.user_id
+    )
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance: User, created: bool, update_fields: frozenset | None = None, **kwargs) -> None:
+    """
+    Данные автора выводятся в списках всех его досок. У нового пользователя досок нет,
+    вход в систему (last_login) выводимые данные не меняет
+    :param sender:
+    :param instance:
+    :param created:
+    :param update_fields:
+    :param kwargs:
+    :return:
+    """
+    if created or (update_fields is not None and set(update_fields) == {'last_login'}):
+        return
+    bump_board_versions(get_board_roles(instance.id))
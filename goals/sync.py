@@ -0,0 +1,211 @@
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import connection, models
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from goals.fast_serializers import BoardValuesSerializer, GoalCategoryValuesSerializer, \
+    GoalCommentValuesSerializer, GoalValuesSerializer, ValuesSerializer
+from goals.models import Board, Goal, GoalCategory, GoalComment, Tombstone
+
+
+class CursorExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'Курсор устарел, нужна полная синхронизация'
+    default_code = 'cursor_expired'
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Позиция в ленте: время изменения, номер источника и id последней отданной строки.
+    Клиенту передается непрозрачной строкой
+    """
+    timestamp: datetime
+    source: int
+    id: int
+
+    def encode(self) -> str:
+        raw = f'{self.timestamp.isoformat()}|{self.source}|{self.id}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, value: str) -> 'Cursor':
+        """
+        :param value:
+        :return:
+        :raises ValueError: строка не является курсором
+        """
+        try:
+            raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode()
+            timestamp, source, object_id = raw.split('|')
+            cursor = cls(datetime.fromisoformat(timestamp), int(source), int(object_id))
+        except (binascii.Error, UnicodeDecodeError) as error:
+            raise ValueError(value) from error
+        if timezone.is_naive(cursor.timestamp) or not 0 <= cursor.source < len(SOURCES):
+            raise ValueError(value)
+        return cursor
+
+
+class ChangeSource:
+    """
+    Таблица, изменения которой читаются по индексу (board, updated, id)
+    """
+    kind: str
+    model: type[models.Model]
+    serializer: ValuesSerializer
+    time_field = 'updated'
+
+    def get_queryset(self, board_ids: list[int], user_id: int) -> QuerySet:
+        return self.model.objects.filter(board_id__in=board_ids)
+
+    def get_values(self, queryset: QuerySet) -> QuerySet:
+        return self.serializer.get_values(queryset)
+
+    def is_deleted(self, row: dict) -> bool:
+        return False
+
+    def to_change(self, row: dict) -> dict:
+        deleted = self.is_deleted(row)
+        return {
+            'type': self.kind,
+            'id': row['id'],
+            'board': row['board'],
+            'deleted': deleted,
+            'updated': ValuesSerializer.to_json_value(row[self.time_field]),
+            'data': None if deleted else self.serializer.to_representation(row),
+        }
+
+
+class BoardSource(ChangeSource):
+    kind = Tombstone.Kind.board
+    model = Board
+    serializer = BoardValuesSerializer()
+
+    def get_queryset(self, board_ids: list[int], user_id: int) -> QuerySet:
+        return Board.objects.filter(id__in=board_ids)
+
+    def is_deleted(self, row: dict) -> bool:
+        return row['is_deleted']
+
+    def to_change(self, row: dict) -> dict:
+        return super().to_change({**row, 'board': row['id']})
+
+
+class CategorySource(ChangeSource):
+    kind = Tombstone.Kind.category
+    model = GoalCategory
+    serializer = GoalCategoryValuesSerializer()
+
+    def is_deleted(self, row: dict) -> bool:
+        return row['is_deleted']
+
+
+class GoalSource(ChangeSource):
+    kind = Tombstone.Kind.goal
+    model = Goal
+    serializer = GoalValuesSerializer()
+
+    def is_deleted(self, row: dict) -> bool:
+        return row['status'] == Goal.Status.archived
+
+
+class CommentSource(ChangeSource):
+    kind = Tombstone.Kind.comment
+    model = GoalComment
+    serializer = GoalCommentValuesSerializer()
+
+
+class TombstoneSource(ChangeSource):
+    """
+    Физические удаления, переносы целей на другие доски и потеря доступа к доске
+    """
+    model = Tombstone
+    time_field = 'deleted'
+
+    def get_queryset(self, board_ids: list[int], user_id: int) -> QuerySet:
+        return Tombstone.objects.filter(Q(board_id__in=board_ids, user__isnull=True) | Q(user_id=user_id))
+
+    def get_values(self, queryset: QuerySet) -> QuerySet:
+        return queryset.values('id', 'kind', 'object_id', 'board', 'deleted')
+
+    def to_change(self, row: dict) -> dict:
+        return {
+            'type': row['kind'],
+            'id': row['object_id'],
+            'board': row['board'],
+            'deleted': True,
+            'updated': ValuesSerializer.to_json_value(row['deleted']),
+            'data': None,
+        }
+
+
+SOURCES: tuple[ChangeSource, ...] = (BoardSource(), CategorySource(), GoalSource(), CommentSource(), TombstoneSource())
+
+
+def get_settled_time() -> datetime:
+    """
+    Граница ленты по часам базы: не позже начала самой старой незафиксированной пишущей транзакции.
+    Транзакция (например, импорт целей одной транзакцией) фиксирует строки с updated не раньше своего начала,
+    поэтому курсор не обгоняет их, сколько бы она ни шла. SYNC_SETTLE_SECONDS вычитается из границы
+    и покрывает расхождение часов серверов приложения и базы.
+    Транзакции чужих ролей видны в pg_stat_activity без xact_start, поэтому все процессы приложения
+    должны писать в базу под одной ролью
+    :return:
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT LEAST(statement_timestamp(), min(xact_start)) - make_interval(secs => %s)
+            FROM pg_stat_activity
+            WHERE datname = current_database() AND pid <> pg_backend_pid() AND backend_xid IS NOT NULL
+            """,
+            [settings.SYNC_SETTLE_SECONDS],
+        )
+        return cursor.fetchone()[0]
+
+
+def get_changes(user_id: int, board_ids: list[int], cursor: Cursor | None,
+                limit: int) -> tuple[list[dict], Cursor | None, bool]:
+    """
+    Изменения досок пользователя после курсора в порядке (время, источник, id).
+    Из каждого источника читается не больше limit + 1 строк по индексу, страница собирается слиянием.
+    Изменения после границы get_settled_time откладываются до следующего запроса
+    :param user_id:
+    :param board_ids:
+    :param cursor:
+    :param limit:
+    :return: изменения, курсор для следующего запроса, есть ли еще изменения
+    """
+    if cursor is not None and cursor.timestamp < timezone.now() - timedelta(days=settings.SYNC_RETENTION_DAYS):
+        raise CursorExpired()
+    settled = get_settled_time()
+
+    rows: list[tuple[datetime, int, int, dict]] = []
+    for index, source in enumerate(SOURCES):
+        time_field = source.time_field
+        queryset = source.get_queryset(board_ids, user_id).filter(**{f'{time_field}__lt': settled})
+        if cursor is not None:
+            if index < cursor.source:
+                after = Q(**{f'{time_field}__gt': cursor.timestamp})
+            elif index == cursor.source:
+                after = Q(**{f'{time_field}__gt': cursor.timestamp}) | Q(
+                    **{time_field: cursor.timestamp, 'id__gt': cursor.id}
+                )
+            else:
+                after = Q(**{f'{time_field}__gte': cursor.timestamp})
+            queryset = queryset.filter(after)
+        for row in source.get_values(queryset.order_by(time_field, 'id'))[:limit + 1]:
+            rows.append((row[time_field], index, row['id'], row))
+
+    rows.sort(key=lambda item: item[:3])
+    page = rows[:limit]
+    changes = [SOURCES[index].to_change(row) for _, index, _, row in page]
+    next_cursor = Cursor(*page[-1][:3]) if page else cursor
+    return changes, next_cursor, len(rows) > limit
@@ -1,7 +1,9 @@
 from django.urls import path
 
 from goals.views import CreateGoalsCategoryView, GoalCategoryListView, GoalCategoryView, CreateGoalView, GoalsListView,\
-    GoalView, CreateCommentView, CommentsListView, CommentView, CreateBoardView, BoardsListView, BoardView
+    GoalView, CreateCommentView, CommentsListView, CommentView, CreateBoardView, BoardsListView, BoardView, \
+    GoalBulkView, GoalBulkStatusView, BoardExportView, BoardImportView, BoardSummaryView, \
+    BoardKanbanView, GoalMoveView, ArchivedGoalListView, SyncView
 
 urlpatterns = [
     path('goal_category/create', CreateGoalsCategoryView.as_view(), name='goal_category_create'),
@@ -9,11 +11,20 @@ urlpatterns = [
     path('goal_category/<int:pk>', GoalCategoryView.as_view(), name='goal_category'),
     path('goal/create', CreateGoalView.as_view(), name='goal_create'),
     path('goal/list', GoalsListView.as_view(), name='goals_list'),
+    path('goal/bulk', GoalBulkView.as_view(), name='goal_bulk'),
+    path('goal/bulk_status', GoalBulkStatusView.as_view(), name='goal_bulk_status'),
+    path('goal/archive', ArchivedGoalListView.as_view(), name='goal_archive'),
     path('goal/<pk>', GoalView.as_view(), name='goal'),
+    path('goal/<int:pk>/move', GoalMoveView.as_view(), name='goal_move'),
     path('goal_comment/create', CreateCommentView.as_view(), name='goal_comment_create'),
     path('goal_comment/list', CommentsListView.as_view(), name='goal_comment_list'),
     path('goal_comment/<int:pk>', CommentView.as_view(), name='goal_comment'),
     path('board/create', CreateBoardView.as_view(), name='board_create'),
     path('board/list', BoardsListView.as_view(), name='board_list'),
     path('board/<int:pk>', BoardView.as_view(), name='board'),
+    path('board/<int:pk>/export', BoardExportView.as_view(), name='board_export'),
+    path('board/<int:pk>/import', BoardImportView.as_view(), name='board_import'),
+    path('board/<int:pk>/summary', BoardSummaryView.as_view(), name='board_summary'),
+    path('board/<int:pk>/kanban', BoardKanbanView.as_view(), name='board_kanban'),
+    path('sync', SyncView.as_view(), name='sync'),
 ]
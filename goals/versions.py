@@ -0,0 +1,49 @@
+from time import time_ns
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+
+from goals.events import publish_board_events
+
+BOARD_VERSION_KEY = 'board_version:{board_id}'
+
+
+def bump_board_versions(board_ids: Iterable[int]) -> None:
+    """
+    Меняет версии досок после фиксации транзакции, в которой изменились доска,
+    ее участники, категории, цели или комментарии, и публикует событие изменения
+    :param board_ids:
+    :return:
+    """
+    board_ids = set(board_ids)
+    if board_ids:
+        transaction.on_commit(lambda: _set_versions(board_ids))
+
+
+def _set_versions(board_ids: set[int]) -> None:
+    """
+    Записывает новые версии в кеш и оповещает подписчиков досок (goals/events.py)
+    :param board_ids:
+    :return:
+    """
+    versions = {board_id: time_ns() for board_id in board_ids}
+    cache.set_many({BOARD_VERSION_KEY.format(board_id=board_id): version for board_id, version in versions.items()},
+                   timeout=None)
+    publish_board_events(versions)
+
+
+def get_board_versions(board_ids: Iterable[int]) -> dict[int, int]:
+    """
+    Версии досок {board_id: время последнего изменения в нс} одним обращением к кешу.
+    Отсутствующая в кеше версия (вытеснена или еще не создана) заводится текущим временем,
+    так что клиент в худшем случае перезапросит данные
+    :param board_ids:
+    :return:
+    """
+    keys = {BOARD_VERSION_KEY.format(board_id=board_id): board_id for board_id in board_ids}
+    versions: dict[str, int] = cache.get_many(keys)
+    if missing := {key: time_ns() for key in keys if key not in versions}:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
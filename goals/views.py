@@ -1,32 +1,62 @@
+import codecs
+from hashlib import md5
+
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Prefetch, Q, Sum
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import quote_etag
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import CreateAPIView, GenericAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
-
-from goals.filters import GoalFilter, CommentGoalFilter
-from goals.models import GoalCategory, Goal, GoalComment, Board
-from goals.permissions import BoardPermissions, GoalCategoryPermissions, GoalPermissions, GoalCommentPermissions
-from goals.serializers import GoalCategoryCreateSerializer, GoalCategorySerializer, GoalCreateSerializer, \
-    GoalSerializer, GoalCommentCreateSerializer, GoalCommentSerializer, BoardCreateSerializer, BoardSerializer
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from goals.archive import schedule_archive
+from goals.export import iter_board_rows, iter_chunks, iter_csv, iter_gzip, iter_ndjson
+from goals.fast_serializers import ArchivedGoalValuesSerializer, GoalCategoryValuesSerializer, GoalValuesSerializer, \
+    GoalCommentValuesSerializer
+from goals.filters import ArchivedGoalFilter, GoalFilter, CommentGoalFilter, GoalSearchFilter, TrigramSearchFilter
+from goals.importer import IMPORT_FORMATS, GoalImporter, ImportDataError
+from goals.kanban import get_columns
+from goals.membership import get_membership, invalidate_board_roles
+from goals.mixins import CachedListMixin, ConditionalListMixin, ConditionalObjectMixin, ValuesListMixin
+from goals.models import ArchivedGoal, GoalCategory, Goal, GoalComment, Board, BoardParticipant, GoalCounter
+from goals.pagination import KeysetPagination, LimitOffsetOrKeysetPagination
+from goals.positions import POSITION_ORDERING
+from goals.permissions import BoardPermissions, BoardWritePermissions, GoalCategoryPermissions, GoalPermissions, \
+    GoalCommentPermissions
+from goals.serializers import ArchivedGoalSerializer, GoalCategoryCreateSerializer, GoalCategorySerializer, \
+    GoalCreateSerializer, GoalSerializer, GoalCommentCreateSerializer, GoalCommentSerializer, BoardCreateSerializer, \
+    BoardSerializer, GoalBulkSerializer, GoalBulkStatusSerializer, GoalMoveSerializer, KanbanQuerySerializer, \
+    SyncQuerySerializer
+from goals.sync import get_changes
 
 
 # GoalCategory
 class CreateGoalsCategoryView(CreateAPIView):
     queryset = GoalCategory.objects.all()
     serializer_class = GoalCategoryCreateSerializer
+    query_budget = 5
     permission_classes = (IsAuthenticated, GoalCategoryPermissions)
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(CachedListMixin, ValuesListMixin, ListAPIView):
     queryset = GoalCategory.objects.all()
     serializer_class = GoalCategorySerializer
+    query_budget = 5
+    values_serializer_class = GoalCategoryValuesSerializer
     pagination_class = LimitOffsetPagination
     filter_backends = [
         OrderingFilter,
-        SearchFilter,
+        TrigramSearchFilter,
         DjangoFilterBackend,
     ]
     filterset_fields = ('board',)
@@ -39,15 +69,13 @@ class GoalCategoryListView(ListAPIView):
         Фильтрует категории
         :return:
         """
-        return GoalCategory.objects.prefetch_related('board__participants__user').filter(
-            board__participants__user_id=self.request.user.id,
-            is_deleted=False
-        )
+        return GoalCategory.live.select_related('user').for_participant(self.request.user.id)
 
 
 class GoalCategoryView(RetrieveUpdateDestroyAPIView):
     queryset = GoalCategory.objects.all()
     serializer_class = GoalCategorySerializer
+    query_budget = 6
     permission_classes = (IsAuthenticated, GoalCategoryPermissions)
 
     def get_queryset(self) -> list[GoalCategory]:
@@ -55,21 +83,19 @@ class GoalCategoryView(RetrieveUpdateDestroyAPIView):
         Фильтрует категории
         :return:
         """
-        return GoalCategory.objects.prefetch_related('board__participants__user').filter(
-            board__participants__user_id=self.request.user.id,
-            is_deleted=False
-        )
+        return GoalCategory.live.select_related('user').for_participant(self.request.user.id)
 
     def perform_destroy(self, instance: GoalCategory) -> GoalCategory:
         """
-        При запросе DELETE не удаляет из базы, а ставит флаг is_deleted
+        При запросе DELETE не удаляет из базы, а ставит флаг is_deleted.
+        Цели категории сразу скрыты вместе с ней, в архив их переносит archive_worker порциями
         :param instance:
         :return:
         """
         with transaction.atomic():
             instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            instance.goal.update(status=Goal.Status.archived)
+            instance.save(update_fields=('is_deleted', 'updated'))
+            schedule_archive(instance.board_id, instance.id)
         return instance
 
 
@@ -77,31 +103,76 @@ class GoalCategoryView(RetrieveUpdateDestroyAPIView):
 class CreateGoalView(CreateAPIView):
     queryset = Goal.objects.all()
     serializer_class = GoalCreateSerializer
+    query_budget = 5
     permission_classes = (IsAuthenticated, GoalPermissions)
 
 
-class GoalsListView(ListAPIView):
+class GoalsListView(ConditionalListMixin, ValuesListMixin, ListAPIView):
     queryset = Goal.objects.all()
     serializer_class = GoalSerializer
-    pagination_class = LimitOffsetPagination
+    query_budget = 5
+    values_serializer_class = GoalValuesSerializer
+    pagination_class = LimitOffsetOrKeysetPagination
     filter_backends = [
-        SearchFilter,
+        GoalSearchFilter,
         DjangoFilterBackend,
     ]
     filterset_class = GoalFilter
     search_fields = ('title', 'description')
 
     def get_queryset(self):
-        return Goal.objects.prefetch_related('category').filter(
-            Q(category__board__participants__user_id=self.request.user.id) &
-            ~Q(status=Goal.Status.archived) &
-            Q(category__is_deleted=False)
+        """
+        Цели по колонкам (категория, статус) в ручном порядке, чтобы страницы limit/offset не перемешивались.
+        Поиск и пагинация по ключу задают свою сортировку
+        :return:
+        """
+        return Goal.live.select_related('user').for_participant(self.request.user.id).order_by(
+            'category_id', 'status', *POSITION_ORDERING
         )
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalBulkView(GenericAPIView):
+    serializer_class = GoalBulkSerializer
+    query_budget = 8
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        Пакетное создание и частичное обновление целей
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+
+class GoalBulkStatusView(GenericAPIView):
+    serializer_class = GoalBulkStatusSerializer
+    query_budget = 5
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        """
+        Массовая смена статуса и приоритета целей
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'updated': serializer.save()})
+
+
+class GoalView(ConditionalObjectMixin, RetrieveUpdateDestroyAPIView):
     queryset = Goal.objects.all()
     serializer_class = GoalSerializer
+    # перенос в категорию другой доски: комментарии и запись об удалении со старой доски
+    query_budget = 8
     permission_classes = (IsAuthenticated, GoalPermissions)
 
     def get_queryset(self) -> Goal:
@@ -109,24 +180,58 @@ class GoalView(RetrieveUpdateDestroyAPIView):
         Фильтрует цели
         :return:
         """
-        return Goal.objects.prefetch_related('category').filter(
-            Q(category__board__participants__user_id=self.request.user.id) &
-            ~Q(status=Goal.Status.archived) &
-            Q(category__is_deleted=False)
-        )
+        return Goal.live.select_related('user').for_participant(self.request.user.id)
+
+
+class GoalMoveView(GenericAPIView):
+    """
+    Ручной порядок целей: перемещение цели в колонке (категория, статус) без перенумерации соседей.
+    Порядок действует в списке целей (goal/list), канбан-доска сортирует цели по приоритету
+    """
+    serializer_class = GoalMoveSerializer
+    query_budget = 9
+    permission_classes = (IsAuthenticated, GoalPermissions)
+
+    def get_queryset(self):
+        return Goal.live.select_related('user').for_participant(self.request.user.id)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(self.get_object(), data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+
+class ArchivedGoalListView(ValuesListMixin, ListAPIView):
+    """
+    Просмотр холодного архива целей досок пользователя, постранично по ключу (created, id) без COUNT(*)
+    """
+    serializer_class = ArchivedGoalSerializer
+    query_budget = 5
+    values_serializer_class = ArchivedGoalValuesSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = ArchivedGoalFilter
+    permission_classes = (IsAuthenticated,)
+
+    def get_queryset(self):
+        return ArchivedGoal.objects.filter(board_id__in=get_membership(self.request).board_ids)
 
 
 # Comment
 class CreateCommentView(CreateAPIView):
     queryset = GoalComment.objects.all()
     serializer_class = GoalCommentCreateSerializer
+    query_budget = 5
     permission_classes = (IsAuthenticated, GoalCommentPermissions)
 
 
-class CommentsListView(ListAPIView):
+class CommentsListView(ValuesListMixin, ListAPIView):
     queryset = GoalComment.objects.all()
     serializer_class = GoalCommentSerializer
-    pagination_class = LimitOffsetPagination
+    query_budget = 4
+    values_serializer_class = GoalCommentValuesSerializer
+    pagination_class = LimitOffsetOrKeysetPagination
     filter_backends = [
         OrderingFilter,
         DjangoFilterBackend,
@@ -140,16 +245,13 @@ class CommentsListView(ListAPIView):
         Фильтрует комментарии
         :return:
         """
-        return GoalComment.objects.prefetch_related('goal').filter(
-            Q(goal__category__board__participants__user_id=self.request.user.id)
-            & ~Q(goal__status=Goal.Status.archived)
-            & Q(goal__category__is_deleted=False)
-        )
+        return GoalComment.live.select_related('user').for_participant(self.request.user.id)
 
 
 class CommentView(RetrieveUpdateDestroyAPIView):
     queryset = GoalComment.objects.all()
     serializer_class = GoalCommentSerializer
+    query_budget = 6
     permission_classes = (IsAuthenticated, GoalCommentPermissions)
 
     def get_queryset(self) -> GoalComment:
@@ -157,22 +259,20 @@ class CommentView(RetrieveUpdateDestroyAPIView):
         Фильтрует комментарии
         :return:
         """
-        return GoalComment.objects.prefetch_related('goal').filter(
-            Q(goal__category__board__participants__user_id=self.request.user.id)
-            & ~Q(goal__status=Goal.Status.archived)
-            & Q(goal__category__is_deleted=False)
-        )
+        return GoalComment.live.select_related('user').for_participant(self.request.user.id)
 
 
 # Board
 class CreateBoardView(CreateAPIView):
     queryset = Board.objects.all()
     serializer_class = BoardCreateSerializer
+    query_budget = 4
 
 
-class BoardsListView(ListAPIView):
+class BoardsListView(CachedListMixin, ListAPIView):
     queryset = Board.objects.all()
     serializer_class = BoardSerializer
+    query_budget = 6
     pagination_class = LimitOffsetPagination
     filter_backends = [
         OrderingFilter,
@@ -185,14 +285,16 @@ class BoardsListView(ListAPIView):
         Фильтрует доски
         :return:
         """
-        return Board.objects.prefetch_related('participants').filter(
-            Q(is_deleted=False) & Q(participants__user_id=self.request.user.id)
-        )
+        return Board.live.prefetch_related(
+            Prefetch('participants', queryset=BoardParticipant.objects.select_related('user'))
+        ).for_participant(self.request.user.id)
 
 
-class BoardView(RetrieveUpdateDestroyAPIView):
+class BoardView(ConditionalObjectMixin, RetrieveUpdateDestroyAPIView):
     queryset = Board.objects.all()
     serializer_class = BoardSerializer
+    # PUT/PATCH: разница участников применяется пакетно, не более двух UPDATE (по числу ролей)
+    query_budget = {'GET': 5, 'PUT': 14, 'PATCH': 14, 'DELETE': 9}
     permission_classes = (IsAuthenticated, BoardPermissions)
 
     def get_queryset(self) -> Board:
@@ -200,21 +302,187 @@ class BoardView(RetrieveUpdateDestroyAPIView):
         Фильтрует доски
         :return:
         """
-        return Board.objects.prefetch_related('participants').filter(
-            is_deleted=False
+        return Board.live.prefetch_related(
+            Prefetch('participants', queryset=BoardParticipant.objects.select_related('user'))
         )
 
+    def get_object_validators(self, instance: Board) -> tuple[str, int]:
+        """
+        В представлении доски есть участники, их изменения тоже меняют ETag
+        :param instance:
+        :return:
+        """
+        participants: list[BoardParticipant] = list(instance.participants.all())
+        state = (
+            instance.pk,
+            instance.updated.timestamp(),
+            sorted((participant.user_id, participant.role, participant.updated.timestamp())
+                   for participant in participants),
+        )
+        last_modified = max([instance.updated, *(participant.updated for participant in participants)])
+        return quote_etag(md5(repr(state).encode()).hexdigest()), int(last_modified.timestamp())
+
     def perform_destroy(self, instance: Board) -> Board:
         """
-        При запросе DELETE не удаляет из базы, а ставит флаг is_deleted
+        При запросе DELETE не удаляет из базы, а ставит флаг is_deleted.
+        Категорий в доске немного, они скрываются сразу и скрывают свои цели,
+        в архив цели переносит archive_worker порциями
         :param instance:
         :return:
         """
         with transaction.atomic():
             instance.is_deleted = True
             instance.save()
-            instance.goal_category.update(is_deleted=True)
-            Goal.objects.prefetch_related('category').filter(category__board_id=instance.id).update(
-                status=Goal.Status.archived
-            )
+            instance.goal_category.update(is_deleted=True, updated=timezone.now())
+            schedule_archive(instance.id)
+            invalidate_board_roles(instance.participants.values_list('user_id', flat=True))
         return instance
+
+
+class BoardExportView(GenericAPIView):
+    """
+    Выгрузка всех целей и комментариев доски потоком NDJSON (по умолчанию) или CSV,
+    формат в параметре export_format. При Accept-Encoding: gzip поток сжимается на лету
+    """
+    queryset = Board.live.all()
+    # считаются запросы до начала потока, выгрузка идет после выхода из представления
+    query_budget = 4
+    permission_classes = (IsAuthenticated, BoardPermissions)
+    formats = {
+        'ndjson': ('application/x-ndjson', iter_ndjson),
+        'csv': ('text/csv', iter_csv),
+    }
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        export_format: str = request.query_params.get('export_format', 'ndjson')
+        if export_format not in self.formats:
+            raise ValidationError({'export_format': f'Допустимые форматы: {", ".join(self.formats)}'})
+        board: Board = self.get_object()
+        content_type, render = self.formats[export_format]
+
+        chunks = iter_chunks(render(iter_board_rows(board.id)))
+        gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        response = StreamingHttpResponse(iter_gzip(chunks) if gzip else chunks,
+                                         content_type=f'{content_type}; charset=utf-8')
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response['Content-Disposition'] = f'attachment; filename="board-{board.id}.{export_format}"'
+        return response
+
+
+class BoardImportView(GenericAPIView):
+    """
+    Импорт целей и комментариев в доску из тела запроса (CSV или NDJSON, параметр import_format).
+    Тело читается построчно, без разбора парсерами DRF целиком в память
+    """
+    queryset = Board.live.all()
+    # число запросов растет с количеством порций IMPORT_CHUNK_SIZE, бюджет не задан
+    permission_classes = (IsAuthenticated, BoardWritePermissions)
+
+    def post(self, request, *args, **kwargs) -> Response:
+        import_format: str = request.query_params.get('import_format', 'ndjson')
+        if import_format not in IMPORT_FORMATS:
+            raise ValidationError({'import_format': f'Допустимые форматы: {", ".join(IMPORT_FORMATS)}'})
+        board: Board = self.get_object()
+        try:
+            result = GoalImporter(board, request.user).run(codecs.iterdecode(request.stream or [], 'utf-8'),
+                                                          import_format)
+        except UnicodeDecodeError:
+            raise ValidationError('Файл должен быть в кодировке UTF-8')
+        except ImportDataError as error:
+            return Response({'errors': error.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.to_representation(), status=status.HTTP_201_CREATED)
+
+
+class BoardSummaryView(GenericAPIView):
+    """
+    Сводка доски: число целей по категориям, статусам и приоритетам и число просроченных.
+    Считается одним запросом по счетчикам GoalCounter, без чтения самих целей
+    """
+    queryset = Board.live.all()
+    query_budget = 5
+    permission_classes = (IsAuthenticated, BoardPermissions)
+
+    def get(self, request, *args, **kwargs) -> Response:
+        board: Board = self.get_object()
+        overdue = Q(due_date__lt=timezone.localdate()) & ~Q(status=Goal.Status.done)
+        rows = GoalCounter.objects.filter(
+            board_id=board.id, category__is_deleted=False, count__gt=0
+        ).exclude(status=Goal.Status.archived).values(
+            'category_id', 'category__title', 'status', 'priority'
+        ).annotate(
+            total=Sum('count'), overdue=Coalesce(Sum('count', filter=overdue), 0)
+        ).order_by('category__title', 'category_id', 'status', 'priority')
+
+        categories: dict[int, dict] = {}
+        for row in rows:
+            category = categories.setdefault(row['category_id'], {
+                'id': row['category_id'], 'title': row['category__title'], 'total': 0, 'overdue': 0, 'counts': [],
+            })
+            category['total'] += row['total']
+            category['overdue'] += row['overdue']
+            category['counts'].append({
+                'status': row['status'], 'priority': row['priority'], 'count': row['total'], 'overdue': row['overdue'],
+            })
+        return Response({
+            'board': board.id,
+            'total': sum(category['total'] for category in categories.values()),
+            'overdue': sum(category['overdue'] for category in categories.values()),
+            'categories': list(categories.values()),
+        })
+
+
+class BoardKanbanView(GenericAPIView):
+    """
+    Канбан-доска: первые limit целей каждой колонки-статуса одним запросом, цели в колонке
+    по убыванию приоритета. Ссылка next колонки с курсором возвращает продолжение только этой колонки.
+    Колонка канбана объединяет все категории доски, а ручной порядок (goal/<id>/move) задается внутри
+    категории, поэтому здесь он не применяется: его выводит только список целей
+    """
+    queryset = Board.live.all()
+    query_budget = 5
+    permission_classes = (IsAuthenticated, BoardPermissions)
+    serializer_class = KanbanQuerySerializer
+
+    def get(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        board: Board = self.get_object()
+        columns = get_columns(
+            Goal.live.filter(board_id=board.id),
+            serializer.validated_data.get('limit', settings.KANBAN_COLUMN_SIZE),
+            serializer.validated_data.get('cursor'),
+        )
+        url = request.build_absolute_uri()
+        for column in columns:
+            if column['next'] is not None:
+                column['next'] = replace_query_param(url, 'cursor', column['next'].encode())
+        return Response({'board': board.id, 'columns': columns})
+
+
+class SyncView(GenericAPIView):
+    """
+    Лента изменений досок пользователя после курсора: создания, изменения и удаления (deleted: true)
+    досок, категорий, целей и комментариев. Клиент хранит локальную копию и передает cursor из прошлого ответа,
+    пока has_more. Незнакомую доску (клиента добавили в участники) клиент загружает целиком обычными списками,
+    вместе с удаленной целью или категорией удаляет и ее содержимое
+    """
+    query_budget = 9
+    permission_classes = (IsAuthenticated,)
+    serializer_class = SyncQuerySerializer
+
+    def get(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        changes, cursor, has_more = get_changes(
+            request.user.id,
+            get_membership(request).board_ids,
+            serializer.validated_data.get('cursor'),
+            serializer.validated_data.get('limit', settings.SYNC_PAGE_SIZE),
+        )
+        return Response({
+            'changes': changes,
+            'cursor': cursor.encode() if cursor is not None else None,
+            'has_more': has_more,
+        })
@@ -43,3 +43,34 @@ class BoardParticipantFactory(DjangoModelFactory):
 
     class Meta:
         model = 'goals.BoardParticipant'
+
+
+@register
+class GoalCategoryFactory(DjangoModelFactory):
+    title = Faker('sentence', nb_words=3)
+    user = SubFactory(UserFactory)
+    board = SubFactory(BoardFactory)
+
+    class Meta:
+        model = 'goals.GoalCategory'
+
+
+@register
+class GoalFactory(DjangoModelFactory):
+    title = Faker('sentence', nb_words=4)
+    description = Faker('text')
+    user = SubFactory(UserFactory)
+    category = SubFactory(GoalCategoryFactory)
+
+    class Meta:
+        model = 'goals.Goal'
+
+
+@register
+class GoalCommentFactory(DjangoModelFactory):
+    text = Faker('text')
+    user = SubFactory(UserFactory)
+    goal = SubFactory(GoalFactory)
+
+    class Meta:
+        model = 'goals.GoalComment'
@@ -18,3 +18,30 @@ def current_user(user):
 def login_user(api_client, current_user):
     api_client.force_login(current_user)
     return api_client
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+    from django.core.cache import cache
+    cache.clear()
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def query_budget(settings):
+    """
+    Превышение query_budget представления проваливает тест
+    """
+    settings.QUERY_BUDGET_ENABLED = True
+    settings.QUERY_BUDGET_RAISE = True
+
+
+@pytest.fixture(autouse=True)
+def board_events(settings):
+    """
+    События досок не публикуются в Redis
+    """
+    settings.BOARD_EVENTS_ENABLED = False
@@ -0,0 +1,127 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from goals.archive import archive_batch, move_cold_goals
+from goals.fast_serializers import ArchivedGoalValuesSerializer
+from goals.models import ArchivedGoal, ArchivedGoalComment, ArchiveTask, Goal, GoalCategory, GoalComment
+from goals.serializers import ArchivedGoalSerializer
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+def statuses(goals: list[Goal]) -> set[int]:
+    return set(Goal.objects.filter(id__in=[goal.id for goal in goals]).values_list('status', flat=True))
+
+
+@pytest.mark.django_db
+class TestArchive:
+    def test_delete_board_hides_goals_before_archive(self, login_user, current_user, category, goal_factory):
+        goals = goal_factory.create_batch(3, category=category, user=current_user)
+
+        response = login_user.delete(reverse('board', args=[category.board_id]))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert statuses(goals) == {Goal.Status.to_do}
+        assert GoalCategory.objects.get(id=category.id).is_deleted
+        assert login_user.get(reverse('goals_list')).data == []
+        task = ArchiveTask.objects.get()
+        assert (task.board_id, task.category_id, task.status) == (category.board_id, None, ArchiveTask.Status.pending)
+
+    def test_archive_resumes_in_batches(self, current_user, category, goal_factory, goal_category_factory):
+        goals = goal_factory.create_batch(5, category=category, user=current_user)
+        other = goal_factory.create(category=goal_category_factory.create(board=category.board, user=current_user))
+        task = ArchiveTask.objects.create(board=category.board, category=category)
+
+        assert archive_batch(2) == task
+        task.refresh_from_db()
+        assert (task.last_id, task.archived, task.status) == (goals[1].id, 2, ArchiveTask.Status.pending)
+        assert statuses(goals[:2]) == {Goal.Status.archived}
+        assert statuses(goals[2:]) == {Goal.Status.to_do}
+
+        archive_batch(2)
+        archive_batch(2)
+        task.refresh_from_db()
+        assert (task.archived, task.status) == (5, ArchiveTask.Status.done)
+        assert task.finished is not None
+        assert statuses(goals) == {Goal.Status.archived}
+        assert statuses([other]) == {Goal.Status.to_do}
+        assert archive_batch(2) is None
+
+    def test_worker_once(self, login_user, current_user, category, goal_factory, settings):
+        settings.ARCHIVE_BATCH_SIZE = 2
+        goals = goal_factory.create_batch(3, category=category, user=current_user)
+        login_user.delete(reverse('goal_category', args=[category.id]))
+
+        call_command('archive_worker', '--once')
+
+        assert statuses(goals) == {Goal.Status.archived}
+        assert ArchiveTask.objects.get().status == ArchiveTask.Status.done
+
+
+def archive_long_ago(goals: list[Goal], settings) -> None:
+    Goal.objects.filter(id__in=[goal.id for goal in goals]).update(
+        status=Goal.Status.archived,
+        updated=timezone.now() - timedelta(days=settings.GOAL_COLD_AFTER_DAYS + 1),
+    )
+
+
+@pytest.mark.django_db
+class TestColdStorage:
+    def test_move_cold_goals(self, current_user, category, goal_factory, goal_comment_factory, settings):
+        cold = goal_factory.create_batch(3, category=category, user=current_user)
+        comments = goal_comment_factory.create_batch(2, goal=cold[0], user=current_user)
+        recent = goal_factory.create(category=category, user=current_user, status=Goal.Status.archived)
+        live = goal_factory.create(category=category, user=current_user)
+        archive_long_ago(cold, settings)
+
+        assert move_cold_goals(2) == 2
+        assert move_cold_goals(2) == 1
+        assert move_cold_goals(2) == 0
+
+        assert set(Goal.objects.values_list('id', flat=True)) == {recent.id, live.id}
+        assert not GoalComment.objects.exists()
+        archived = ArchivedGoal.objects.get(id=cold[0].id)
+        assert (archived.title, archived.board_id, archived.status) == (cold[0].title, category.board_id,
+                                                                          Goal.Status.archived)
+        assert set(ArchivedGoalComment.objects.filter(goal=archived).values_list('id', flat=True)) == {
+            comment.id for comment in comments
+        }
+
+    def test_browse_and_export(self, login_user, current_user, category, goal_factory, goal_comment_factory,
+                               settings):
+        cold = goal_factory.create_batch(3, category=category, user=current_user)
+        goal_comment_factory.create(goal=cold[0], user=current_user)
+        foreign = goal_factory.create()
+        archive_long_ago([*cold, foreign], settings)
+        move_cold_goals()
+
+        response = login_user.get(reverse('goal_archive'), {'cursor': '', 'limit': 2})
+        assert response.status_code == status.HTTP_200_OK
+        queryset = ArchivedGoal.objects.filter(id__in=[goal.id for goal in cold]).order_by('-created', '-id')
+        assert JSONRenderer().render(response.data['results']) == JSONRenderer().render(
+            ArchivedGoalSerializer(queryset[:2], many=True).data
+        )
+        values = ArchivedGoalValuesSerializer()
+        assert response.data['results'] == values.many(values.get_values(queryset[:2]))
+        next_page = login_user.get(response.data['next']).data
+        assert [goal['id'] for goal in next_page['results']] == [queryset[2].id]
+
+        response = login_user.get(reverse('goal_archive'), {'board': foreign.board_id})
+        assert response.data['results'] == []
+
+        export = b''.join(login_user.get(reverse('board_export', args=[category.board_id])).streaming_content)
+        rows = [json.loads(line) for line in export.decode().splitlines()]
+        assert sorted(row['id'] for row in rows if row['type'] == 'goal') == sorted(goal.id for goal in cold)
+        assert [row['goal'] for row in rows if row['type'] == 'comment'] == [cold[0].id]
@@ -0,0 +1,107 @@
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import GoalCategory
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def filled_board(current_user, category, board_participant_factory, goal_factory, goal_comment_factory,
+                 goal_category_factory):
+    board_participant_factory.create(board=category.board, role=3)
+    goal_category_factory.create(board=category.board, user=current_user)
+    for goal in goal_factory.create_batch(3, category=category, user=current_user):
+        goal_comment_factory.create(goal=goal, user=current_user)
+    goal_factory.create()
+    return category.board
+
+
+def sort_participants(boards: list[dict]) -> list[dict]:
+    for board in boards:
+        board['participants'].sort(key=lambda participant: participant['id'])
+    return boards
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    @pytest.mark.parametrize('name, params', [
+        ('goal_category_list', {}),
+        ('goal_category_list', {'limit': 1, 'offset': 1}),
+        ('goal_comment_list', {'limit': 2}),
+    ])
+    def test_list_same_as_sync(self, login_user, filled_board, name, params):
+        sync_response = login_user.get(reverse(name), data=params)
+        async_response = login_user.get(reverse(f'async_{name}'), data=params)
+
+        assert async_response.status_code == status.HTTP_200_OK
+        sync_data = sync_response.json()
+        async_data = async_response.json()
+        if 'next' in sync_data:
+            for key in ('next', 'previous'):
+                expected = sync_data.pop(key)
+                assert async_data.pop(key) == (expected and expected.replace('/goals/', '/async/goals/', 1))
+        assert async_data == sync_data
+
+    def test_goal_list(self, login_user, filled_board, category):
+        sync_goals = login_user.get(reverse('goals_list'), data={'category': category.id}).json()
+        async_goals = login_user.get(reverse('async_goals_list'), data={'category': category.id}).json()
+        assert sorted(async_goals, key=lambda goal: goal['id']) == sorted(sync_goals, key=lambda goal: goal['id'])
+
+    def test_board_same_as_sync(self, login_user, filled_board):
+        assert sort_participants(login_user.get(reverse('async_board_list')).json()) == \
+               sort_participants(login_user.get(reverse('board_list')).json())
+        assert sort_participants([login_user.get(reverse('async_board', args=[filled_board.id])).json()]) == \
+               sort_participants([login_user.get(reverse('board', args=[filled_board.id])).json()])
+
+    def test_detail(self, login_user, current_user, category, goal_factory):
+        goal = goal_factory.create(category=category, user=current_user)
+        response = login_user.get(reverse('async_goal', args=[goal.id]))
+        assert response.json() == login_user.get(reverse('goal', args=[goal.id])).json()
+
+    def test_foreign_goal_not_found(self, login_user, goal_factory):
+        response = login_user.get(reverse('async_goal', args=[goal_factory.create().id]))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_filter(self, login_user, category):
+        response = login_user.get(reverse('async_goals_list'), data={'priority': 'x'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    @pytest.mark.parametrize('name, param', [
+        ('async_goal_category_list', 'search'),
+        ('async_goal_category_list', 'ordering'),
+        ('async_goals_list', 'search'),
+        ('async_goal_comment_list', 'cursor'),
+    ])
+    def test_unsupported_param(self, login_user, category, name, param):
+        response = login_user.get(reverse(name), data={param: 'x'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert param in response.json()
+
+    def test_anonymous(self, api_client):
+        response = api_client.get(reverse('async_goals_list'))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_asgi_routes_async_path():
+    from todolist.asgi import application
+
+    async def get(path: str) -> int:
+        communicator = ApplicationCommunicator(application, {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': [],
+        })
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(timeout=5)
+        await communicator.wait(timeout=5)
+        return start['status']
+
+    assert async_to_sync(get)('/async/goals/goal/list') == status.HTTP_403_FORBIDDEN
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
@@ -65,7 +67,8 @@ class TestBoardList:
         assert len(response.json()) == 3
 
     def test_get_list_another_user_boards(self, current_user, board_factory, login_user,
-                                          user_factory, board_participant_factory):
+                                          user_factory, board_participant_factory,
+                                          django_capture_on_commit_callbacks):
         another_user: User = user_factory.create()
         board_another_user = board_factory.create_batch(2, owner=another_user)
 
@@ -74,8 +77,9 @@ class TestBoardList:
         assert isinstance(response.json(), list)
         assert len(response.json()) == 0
 
-        board_factory.create_batch(2, owner=current_user)
-        board_participant_factory.create(user=current_user, board=board_another_user[0])
+        with django_capture_on_commit_callbacks(execute=True):
+            board_factory.create_batch(2, owner=current_user)
+            board_participant_factory.create(user=current_user, board=board_another_user[0])
 
         response = login_user.get(self.url)
 
@@ -108,3 +112,66 @@ class TestBoard:
         response = api_client.get(url)
         assert response.status_code == status.HTTP_403_FORBIDDEN
         assert response.json() == {'detail': 'Authentication credentials were not provided.'}
+
+
+@pytest.mark.django_db
+class TestBoardUpdate:
+    @staticmethod
+    def put(client, board, participants: list[BoardParticipant]):
+        return client.put(reverse('board', args=[board.id]), data={
+            'title': 'Новое название',
+            'participants': [{'user': participant.user.username, 'role': participant.role}
+                             for participant in participants],
+        }, format='json')
+
+    def test_update_participants_diff(self, current_user, board_factory, login_user, user_factory,
+                                      board_participant_factory):
+        board = board_factory.create(owner=current_user)
+        kept, changed, removed = board_participant_factory.create_batch(
+            3, board=board, role=BoardParticipant.Role.reader
+        )
+        changed.role = BoardParticipant.Role.writer
+        added = BoardParticipant(user=user_factory.create(), role=BoardParticipant.Role.writer)
+
+        response = self.put(login_user, board, [kept, changed, added])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {(item['user'], item['role']) for item in response.json()['participants']} == {
+            (current_user.username, BoardParticipant.Role.owner),
+            (kept.user.username, BoardParticipant.Role.reader),
+            (changed.user.username, BoardParticipant.Role.writer),
+            (added.user.username, BoardParticipant.Role.writer),
+        }
+        assert not BoardParticipant.objects.filter(id=removed.id).exists()
+        assert response.json()['title'] == 'Новое название'
+
+    def test_update_unknown_user(self, current_user, board_factory, login_user):
+        board = board_factory.create(owner=current_user)
+        response = login_user.put(reverse('board', args=[board.id]), data={
+            'title': 'Доска', 'participants': [{'user': 'no_such_user', 'role': BoardParticipant.Role.reader}],
+        }, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'participants' in response.json()
+
+    def test_update_queries_do_not_grow(self, current_user, board_factory, login_user,
+                                        django_capture_on_commit_callbacks):
+        def count_queries(size: int) -> tuple[int, int]:
+            with django_capture_on_commit_callbacks(execute=True):
+                board = board_factory.create(owner=current_user)
+            # имена задаются явно: случайные имена фабрики на десятках пользователей совпадают
+            users = User.objects.bulk_create(User(username=f'member_{size}_{number}') for number in range(2 * size))
+            current = BoardParticipant.objects.bulk_create(
+                BoardParticipant(board=board, user=user, role=BoardParticipant.Role.reader) for user in users[:size]
+            )
+            for participant in current[size // 2:]:
+                participant.role = BoardParticipant.Role.writer
+            added = [BoardParticipant(user=user, role=BoardParticipant.Role.reader) for user in users[size:]]
+            # удаляется четверть участников: их число растет вместе с доской
+            kept = current[size // 4:]
+            with CaptureQueriesContext(connection) as context, django_capture_on_commit_callbacks() as callbacks:
+                response = self.put(login_user, board, kept + added)
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.json()['participants']) == len(kept) + size + 1
+            return len(context.captured_queries), len(callbacks)
+
+        assert count_queries(4) == count_queries(40)
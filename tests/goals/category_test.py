@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from core.models import User
+from goals.models import Board, BoardParticipant, GoalCategory
+
+
+@pytest.fixture
+def crowded_board(current_user, board_factory) -> Board:
+    board = board_factory.create(owner=current_user)
+    users = User.objects.bulk_create(User(username=f'member_{board.id}_{number}') for number in range(300))
+    BoardParticipant.objects.bulk_create(
+        BoardParticipant(board=board, user=user, role=BoardParticipant.Role.reader) for user in users
+    )
+    return board
+
+
+@pytest.mark.django_db
+class TestGoalCategoryList:
+    url = reverse('goal_category_list')
+
+    def test_list_uses_exists_without_duplicates(self, login_user, current_user, crowded_board,
+                                                 goal_category_factory, django_assert_num_queries):
+        categories: list[GoalCategory] = goal_category_factory.create_batch(5, board=crowded_board)
+        goal_category_factory.create_batch(2)
+
+        with django_assert_num_queries(5) as captured:
+            response = login_user.get(self.url, data={'limit': 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == len(categories)
+        assert sorted(item['id'] for item in response.json()['results']) == sorted(c.id for c in categories)
+        count_sql, list_sql = (query['sql'] for query in captured.captured_queries[-2:])
+        for sql in (count_sql, list_sql):
+            assert 'EXISTS' in sql
+            assert 'JOIN "goals_boardparticipant"' not in sql
+        assert 'JOIN "core_user"' in list_sql
+
+    def test_goal_list_count_not_inflated(self, login_user, current_user, crowded_board,
+                                          goal_category_factory, goal_factory):
+        category = goal_category_factory.create(board=crowded_board)
+        goal_factory.create_batch(3, category=category)
+
+        response = login_user.get(reverse('goals_list'), data={'limit': 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == 3
+        assert len(response.json()['results']) == 3
+
+    def test_board_list_participants_not_lazy_loaded(self, login_user, crowded_board, django_assert_num_queries):
+        with django_assert_num_queries(6):
+            response = login_user.get(reverse('board_list'), data={'limit': 10})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == 1
+        assert len(response.json()['results'][0]['participants']) == 301
+
+
+@pytest.mark.django_db
+class TestGoalCategorySearch:
+    url = reverse('goal_category_list')
+
+    def test_search_tolerates_typos(self, login_user, current_user, board_factory, goal_category_factory):
+        board = board_factory.create(owner=current_user)
+        exact = goal_category_factory.create(board=board, title='Путешествия')
+        similar = goal_category_factory.create(board=board, title='Путешествия по России')
+        goal_category_factory.create(board=board, title='Работа')
+        goal_category_factory.create(title='Путешествия')
+
+        response = login_user.get(self.url, data={'search': 'Путешестивя'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [category['id'] for category in response.json()] == [exact.id, similar.id]
+
+    def test_search_matches_substring(self, login_user, current_user, board_factory, goal_category_factory):
+        board = board_factory.create(owner=current_user)
+        category = goal_category_factory.create(board=board, title='Домашние дела и покупки')
+
+        response = login_user.get(self.url, data={'search': 'покупки'})
+
+        assert [item['id'] for item in response.json()] == [category.id]
+
+    def test_search_uses_trigram_index(self):
+        with connection.cursor() as cursor:
+            # на пустой таблице планировщик выбрал бы seq scan
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        plan = GoalCategory.objects.search_title('покупки').explain()
+
+        assert 'goals_category_title_trgm_idx' in plan
+        assert 'Seq Scan' not in plan
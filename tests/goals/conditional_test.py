@@ -0,0 +1,78 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import GoalCategory
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+@pytest.mark.django_db
+class TestConditionalList:
+    url = reverse('goals_list')
+
+    def test_not_modified_without_main_query(self, login_user, current_user, category, goal_factory,
+                                             django_assert_num_queries):
+        goal_factory.create_batch(3, category=category, user=current_user)
+        response = login_user.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.has_header('Last-Modified')
+
+        # только сессия и пользователь, роли и версии досок из кеша
+        with django_assert_num_queries(2):
+            response = login_user.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_modified_after_change(self, login_user, current_user, category, goal_factory,
+                                   django_capture_on_commit_callbacks):
+        goal_factory.create(category=category, user=current_user)
+        etag = login_user.get(self.url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            login_user.post(reverse('goal_create'), data={'title': 'new', 'category': category.id})
+
+        response = login_user.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+        assert response['ETag'] != etag
+
+    def test_query_string_in_etag(self, login_user, category):
+        etag = login_user.get(self.url)['ETag']
+        response = login_user.get(self.url, data={'limit': 1}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+class TestConditionalObject:
+    def test_goal_if_match(self, login_user, current_user, category, goal_factory):
+        goal = goal_factory.create(category=category, user=current_user)
+        url = reverse('goal', args=[goal.id])
+        etag = login_user.get(url)['ETag']
+        assert login_user.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+        response = login_user.patch(url, data={'title': 'first'}, HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+        response = login_user.patch(url, data={'title': 'second'}, HTTP_IF_MATCH=etag)
+        assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+        goal.refresh_from_db()
+        assert goal.title == 'first'
+
+    def test_board_etag_tracks_participants(self, login_user, current_user, category, user_factory):
+        url = reverse('board', args=[category.board_id])
+        etag = login_user.get(url)['ETag']
+
+        response = login_user.put(url, data={
+            'title': category.board.title,
+            'participants': [{'user': user_factory.create().username, 'role': 3}],
+        }, format='json', HTTP_IF_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+        assert response['ETag'] == login_user.get(url)['ETag']
@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from rest_framework import status
+
+from goals import events
+from goals.event_stream import BoardEventsApplication
+from goals.events import BoardEventHub
+from goals.models import Board, BoardParticipant
+from goals.versions import bump_board_versions
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels: set[str] = set()
+        self.messages = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self.channels.discard(channel)
+
+    async def get_message(self, timeout: float):
+        try:
+            return await asyncio.wait_for(self.messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class FakeHub(BoardEventHub):
+    def get_pubsub(self) -> FakePubSub:
+        return FakePubSub()
+
+
+@pytest.fixture
+def keep_connection():
+    """
+    Как тестовый клиент Django: сигналы запроса не закрывают соединение тестовой транзакции
+    """
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    yield
+    request_started.connect(close_old_connections)
+    request_finished.connect(close_old_connections)
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def board(current_user, board_factory) -> Board:
+    return board_factory.create(owner=current_user)
+
+
+def sse_scope(path: str, cookies: str = '') -> dict:
+    return {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+            'headers': [(b'cookie', cookies.encode())]}
+
+
+def parse_event(message: dict) -> dict:
+    lines = dict(line.split(': ', 1) for line in message['body'].decode().strip().splitlines())
+    return {'event': lines['event'], 'id': lines['id'], 'data': json.loads(lines['data'])}
+
+
+@pytest.mark.django_db
+class TestBoardEvents:
+    def test_publish_after_commit(self, board, settings, monkeypatch, django_capture_on_commit_callbacks):
+        published = []
+
+        class Pipeline:
+            def publish(self, channel: str, message: str) -> None:
+                published.append((channel, json.loads(message)))
+
+            def execute(self) -> None:
+                pass
+
+        settings.BOARD_EVENTS_ENABLED = True
+        class Redis:
+            def pipeline(self, transaction: bool) -> Pipeline:
+                return Pipeline()
+
+        monkeypatch.setattr(events, 'get_publisher', Redis)
+        with django_capture_on_commit_callbacks(execute=True):
+            bump_board_versions([board.id])
+            assert published == []
+
+        assert [(channel, event['board']) for channel, event in published] == [
+            (f'board_events:{board.id}', board.id)
+        ]
+
+    def test_stream(self, board, login_user, keep_connection):
+        hub = FakeHub()
+        application = BoardEventsApplication(hub)
+        cookies = '; '.join(f'{key}={morsel.value}' for key, morsel in login_user.cookies.items())
+
+        async def stream() -> tuple[dict, list[dict], dict]:
+            communicator = ApplicationCommunicator(application, sse_scope(f'/events/board/{board.id}', cookies))
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(timeout=5)
+            received = [parse_event(await communicator.receive_output(timeout=5))]
+            while not hub.queues:
+                await asyncio.sleep(0.01)
+            await hub.pubsub.messages.put({'type': 'message',
+                                           'data': json.dumps({'board': board.id, 'version': 42})})
+            received.append(parse_event(await communicator.receive_output(timeout=5)))
+            await communicator.send_input({'type': 'http.disconnect'})
+            await communicator.wait(timeout=5)
+            return start, received, dict(hub.queues)
+
+        start, received, queues = async_to_sync(stream)()
+
+        assert start['status'] == status.HTTP_200_OK
+        assert (b'content-type', b'text/event-stream') in start['headers']
+        assert [event['event'] for event in received] == ['board_changed', 'board_changed']
+        assert received[1] == {'event': 'board_changed', 'id': '42', 'data': {'board': board.id, 'version': 42}}
+        assert queues == {}
+
+    def test_stream_closed_after_access_revoked(self, board, login_user, current_user, keep_connection, settings,
+                                                django_capture_on_commit_callbacks):
+        settings.BOARD_EVENTS_HEARTBEAT = 0.05
+        application = BoardEventsApplication(FakeHub())
+        cookies = '; '.join(f'{key}={morsel.value}' for key, morsel in login_user.cookies.items())
+
+        async def stream() -> list[dict]:
+            communicator = ApplicationCommunicator(application, sse_scope(f'/events/board/{board.id}', cookies))
+            await communicator.send_input({'type': 'http.request'})
+            await communicator.receive_output(timeout=5)
+            await communicator.receive_output(timeout=5)
+            messages = [await communicator.receive_output(timeout=5)]
+            await sync_to_async(revoke)()
+            while messages[-1]['more_body']:
+                messages.append(await communicator.receive_output(timeout=5))
+            await communicator.wait(timeout=5)
+            return messages
+
+        def revoke() -> None:
+            with django_capture_on_commit_callbacks(execute=True):
+                BoardParticipant.objects.filter(board=board, user=current_user).delete()
+
+        messages = async_to_sync(stream)()
+
+        assert messages[0]['body'] == b': ping\n\n'
+        assert messages[-1] == {'type': 'http.response.body', 'body': b'', 'more_body': False}
+
+    def test_stream_forbidden(self, board, keep_connection, board_factory):
+        async def connect(path: str) -> int:
+            communicator = ApplicationCommunicator(BoardEventsApplication(FakeHub()), sse_scope(path))
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(timeout=5)
+            await communicator.wait(timeout=5)
+            return start['status']
+
+        assert async_to_sync(connect)(f'/events/board/{board.id}') == status.HTTP_403_FORBIDDEN
+        assert async_to_sync(connect)('/events/unknown') == status.HTTP_404_NOT_FOUND
+
+
+def test_queue_keeps_latest_events(settings):
+    settings.BOARD_EVENTS_QUEUE_SIZE = 2
+    hub = BoardEventHub()
+    queue = asyncio.Queue(maxsize=2)
+    hub.queues[1] = {queue}
+
+    for version in range(3):
+        hub.dispatch({'board': 1, 'version': version})
+
+    assert [queue.get_nowait()['version'] for _ in range(2)] == [1, 2]
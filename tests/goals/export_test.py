@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, GoalCategory
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+def read(response) -> str:
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+class TestBoardExport:
+    def test_export_ndjson(self, login_user, current_user, category, goal_factory, goal_comment_factory,
+                           settings):
+        settings.EXPORT_CHUNK_SIZE = 2
+        goals: list[Goal] = goal_factory.create_batch(3, category=category, user=current_user)
+        goal_comment_factory.create_batch(2, goal=goals[0], user=current_user)
+        goal_factory.create()
+
+        response = login_user.get(reverse('board_export', args=[category.board_id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/x-ndjson; charset=utf-8'
+        rows = [json.loads(line) for line in read(response).splitlines()]
+        assert [row['type'] for row in rows] == ['goal'] * 3 + ['comment'] * 2
+        assert [row['id'] for row in rows[:3]] == [goal.id for goal in goals]
+        assert rows[0]['user']['username'] == current_user.username
+
+    def test_export_csv(self, login_user, current_user, category, goal_factory, goal_comment_factory):
+        goal = goal_factory.create(category=category, user=current_user, title='Цель, с запятой')
+        goal_comment_factory.create(goal=goal, user=current_user, text='комментарий')
+
+        response = login_user.get(reverse('board_export', args=[category.board_id]), data={'export_format': 'csv'})
+
+        rows = list(csv.DictReader(io.StringIO(read(response))))
+        assert [(row['type'], row['title'], row['text']) for row in rows] == [
+            ('goal', 'Цель, с запятой', ''),
+            ('comment', '', 'комментарий'),
+        ]
+        assert rows[1]['goal'] == str(goal.id)
+        assert rows[0]['user'] == current_user.username
+
+    def test_export_gzip(self, login_user, current_user, category, goal_factory):
+        goal_factory.create_batch(2, category=category, user=current_user)
+
+        response = login_user.get(reverse('board_export', args=[category.board_id]), HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response['Content-Encoding'] == 'gzip'
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        assert len(lines) == 2
+
+    def test_export_unknown_format(self, login_user, category):
+        response = login_user.get(reverse('board_export', args=[category.board_id]), data={'export_format': 'xml'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_export_foreign_board(self, login_user, board_factory):
+        response = login_user.get(reverse('board_export', args=[board_factory.create().id]))
+        assert response.status_code == status.HTTP_403_FORBIDDEN
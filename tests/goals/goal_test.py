@@ -0,0 +1,233 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, GoalCategory, BoardParticipant
+from goals.serializers import GoalSerializer
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+@pytest.mark.django_db
+class TestGoalList:
+    url = reverse('goals_list')
+
+    def test_get_goal_list_offset(self, login_user, current_user, category, goal_factory):
+        goal_factory.create_batch(5, category=category, user=current_user)
+        response = login_user.get(self.url, data={'limit': 2, 'offset': 2})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['count'] == 5
+        assert len(response.json()['results']) == 2
+
+    def test_get_goal_list_cursor(self, login_user, current_user, category, goal_factory):
+        goals: list[Goal] = goal_factory.create_batch(7, category=category, user=current_user)
+        expected = GoalSerializer(sorted(goals, key=lambda goal: (goal.created, goal.id), reverse=True), many=True).data
+
+        response = login_user.get(self.url, data={'cursor': '', 'limit': 3})
+        assert response.status_code == status.HTTP_200_OK
+        first_page = response.json()
+        assert 'count' not in first_page
+        assert first_page['previous'] is None
+        assert first_page['results'] == expected[:3]
+
+        second_page = login_user.get(first_page['next']).json()
+        assert second_page['results'] == expected[3:6]
+
+        third_page = login_user.get(second_page['next']).json()
+        assert third_page['results'] == expected[6:]
+        assert third_page['next'] is None
+
+        previous_page = login_user.get(third_page['previous']).json()
+        assert previous_page['results'] == expected[3:6]
+
+    def test_get_goal_list_invalid_cursor(self, login_user):
+        response = login_user.get(self.url, data={'cursor': 'broken'})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestGoalBoard:
+    def test_board_copied_from_category(self, category, goal_factory, goal_comment_factory):
+        goal: Goal = goal_factory.create(category=category)
+        comment = goal_comment_factory.create(goal=goal)
+        assert goal.board_id == category.board_id
+        assert comment.board_id == category.board_id
+
+    def test_board_synced_on_category_move(self, login_user, current_user, category, board_factory,
+                                           goal_category_factory, goal_factory, goal_comment_factory):
+        goal: Goal = goal_factory.create(category=category, user=current_user)
+        goal_comment_factory.create_batch(2, goal=goal)
+        new_board = board_factory.create(owner=current_user)
+        new_category = goal_category_factory.create(board=new_board, user=current_user)
+
+        response = login_user.patch(reverse('goal', args=[goal.id]), data={'category': new_category.id})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['board'] == new_board.id
+        assert set(goal.goal_comment.values_list('board_id', flat=True)) == {new_board.id}
+
+
+@pytest.mark.django_db
+class TestGoalCreate:
+    url = reverse('goal_create')
+
+    def test_goal_create_successfully(self, login_user, current_user, category, django_assert_num_queries):
+        with django_assert_num_queries(5):
+            response = login_user.post(self.url, data={'title': 'Цель', 'category': category.id})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Goal.objects.get(id=response.json()['id']).user_id == current_user.id
+
+    def test_goal_create_reader_denied(self, login_user, current_user, board_factory, goal_category_factory,
+                                       board_participant_factory):
+        board = board_factory.create()
+        board_participant_factory.create(board=board, user=current_user, role=BoardParticipant.Role.reader)
+        category = goal_category_factory.create(board=board)
+        response = login_user.post(self.url, data={'title': 'Цель', 'category': category.id})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json() == {'category': ['У вас нет доступа для создания целей в данной категории']}
+
+
+@pytest.mark.django_db
+class TestGoalSearch:
+    url = reverse('goals_list')
+
+    def test_search_uses_russian_stemming_and_rank(self, login_user, current_user, category, goal_factory):
+        in_description = goal_factory.create(category=category, title='Магазин', description='купить молоко')
+        in_title = goal_factory.create(category=category, title='Купить молоко', description='')
+        goal_factory.create(category=category, title='Позвонить маме', description='')
+        goal_factory.create(title='Купить молоко')
+
+        response = login_user.get(self.url, data={'search': 'молока'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [goal['id'] for goal in response.json()] == [in_title.id, in_description.id]
+
+    def test_search_vector_updated_by_bulk_update(self, login_user, current_user, category, goal_factory):
+        goal = goal_factory.create(category=category, title='Позвонить маме', description='')
+        Goal.objects.filter(id=goal.id).update(title='Записаться к врачу')
+
+        assert login_user.get(self.url, data={'search': 'маме'}).json() == []
+        assert [item['id'] for item in login_user.get(self.url, data={'search': 'врачу'}).json()] == [goal.id]
+
+
+@pytest.mark.django_db
+class TestGoalBulk:
+    url = reverse('goal_bulk')
+
+    def test_bulk_create_and_update(self, login_user, current_user, category, goal_factory,
+                                    goal_category_factory, django_assert_num_queries):
+        goal = goal_factory.create(category=category, user=current_user, title='Старое название')
+        other_category = goal_category_factory.create(board=category.board)
+        items = [{'title': f'Цель {number}', 'category': category.id} for number in range(50)]
+        items.append({'id': goal.id, 'title': 'Новое название', 'category': other_category.id})
+
+        with django_assert_num_queries(9):
+            response = login_user.post(self.url, data=items, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['created']) == 50
+        assert response.json()['errors'] == []
+        assert Goal.objects.filter(category=category, title__startswith='Цель ').count() == 50
+        goal.refresh_from_db()
+        assert goal.title == 'Новое название'
+        assert goal.category_id == other_category.id
+        assert goal.user_id == current_user.id
+
+    def test_bulk_reports_item_errors(self, login_user, current_user, category, board_factory,
+                                      goal_category_factory, goal_factory):
+        foreign_category = goal_category_factory.create()
+        foreign_goal = goal_factory.create()
+        items = [
+            {'title': 'Цель', 'category': category.id},
+            {'title': 'Чужая категория', 'category': foreign_category.id},
+            {'title': 'Нет категории'},
+            {'id': foreign_goal.id, 'title': 'Чужая цель'},
+            {'title': 'Несуществующая категория', 'category': 0},
+        ]
+
+        response = login_user.post(self.url, data=items, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()['created']) == 1
+        assert [error['index'] for error in response.json()['errors']] == [1, 2, 3, 4]
+        assert response.json()['errors'][0]['errors'] == {
+            'category': ['У вас нет доступа для создания целей в данной категории']
+        }
+        assert response.json()['errors'][2]['errors'] == {'id': ['Цель не найдена']}
+
+    def test_bulk_requires_list(self, login_user):
+        response = login_user.post(self.url, data={'title': 'Цель'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestGoalBulkStatus:
+    url = reverse('goal_bulk_status')
+
+    def test_bulk_status_by_ids(self, login_user, current_user, category, board_factory, goal_category_factory,
+                                board_participant_factory, goal_factory, django_assert_num_queries):
+        goals = goal_factory.create_batch(3, category=category)
+        read_only_board = board_factory.create()
+        board_participant_factory.create(board=read_only_board, user=current_user, role=BoardParticipant.Role.reader)
+        read_only_goal = goal_factory.create(category=goal_category_factory.create(board=read_only_board))
+        foreign_goal = goal_factory.create()
+
+        with django_assert_num_queries(5):
+            response = login_user.post(self.url, data={
+                'ids': [goal.id for goal in goals] + [read_only_goal.id, foreign_goal.id],
+                'status': Goal.Status.done,
+            }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'updated': 3}
+        assert set(Goal.objects.filter(status=Goal.Status.done).values_list('id', flat=True)) == {
+            goal.id for goal in goals
+        }
+
+    def test_bulk_priority_by_filter(self, login_user, current_user, category, goal_factory):
+        high = goal_factory.create_batch(2, category=category, priority=Goal.Priority.high)
+        goal_factory.create(category=category, priority=Goal.Priority.low)
+
+        response = login_user.post(self.url, data={
+            'filter': {'priority': Goal.Priority.high},
+            'priority': Goal.Priority.critical,
+        }, format='json')
+
+        assert response.json() == {'updated': 2}
+        assert set(Goal.objects.filter(priority=Goal.Priority.critical).values_list('id', flat=True)) == {
+            goal.id for goal in high
+        }
+
+    def test_bulk_status_rejects_unknown_filter(self, login_user, current_user, category, goal_factory):
+        goal = goal_factory.create(category=category)
+
+        response = login_user.post(self.url, data={
+            'filter': {'categories': category.id}, 'status': Goal.Status.done,
+        }, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'categories' in response.json()['filter']
+        goal.refresh_from_db()
+        assert goal.status != Goal.Status.done
+
+    def test_bulk_status_bumps_affected_boards(self, login_user, current_user, category, board_factory,
+                                               goal_category_factory, goal_factory, monkeypatch):
+        goal = goal_factory.create(category=category)
+        other_category = goal_category_factory.create(board=board_factory.create(owner=current_user))
+        goal_factory.create(category=other_category)
+        bumped = []
+        monkeypatch.setattr('goals.serializers.bump_board_versions', lambda board_ids: bumped.append(board_ids))
+
+        response = login_user.post(self.url, data={'ids': [goal.id], 'status': Goal.Status.done}, format='json')
+
+        assert response.json() == {'updated': 1}
+        assert bumped == [[category.board_id]]
+
+    def test_bulk_status_requires_target(self, login_user):
+        response = login_user.post(self.url, data={'ids': [1]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.importer import GoalImporter
+from goals.models import Board, Goal, GoalComment
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def board(current_user, board_factory) -> Board:
+    return board_factory.create(owner=current_user)
+
+
+def ndjson(*rows: dict) -> str:
+    return ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+
+@pytest.mark.django_db
+class TestBoardImport:
+    def test_import_ndjson(self, login_user, current_user, board, goal_category_factory, settings):
+        settings.IMPORT_CHUNK_SIZE = 2
+        existing = goal_category_factory.create(board=board, title='Работа')
+        body = ndjson(
+            {'id': 'a', 'category': 'Работа', 'title': 'Первая', 'status': 2, 'due_date': '2030-01-01'},
+            {'id': 'b', 'category': 'Дом', 'title': 'Вторая', 'description': 'описание'},
+            {'type': 'comment', 'goal': 'a', 'text': 'к первой'},
+            {'category': 'Дом', 'title': 'Третья'},
+            {'type': 'comment', 'goal': 'b', 'text': 'ко второй'},
+        )
+
+        response = login_user.post(reverse('board_import', args=[board.id]), data=body,
+                                   content_type='application/x-ndjson')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()['goals'] == 3
+        assert response.json()['comments'] == 2
+        assert response.json()['categories'] == 1
+        goals = {goal.title: goal for goal in Goal.objects.filter(board=board)}
+        assert goals['Первая'].category_id == existing.id
+        assert goals['Первая'].status == Goal.Status.in_progress
+        assert goals['Вторая'].category.title == 'Дом'
+        assert goals['Вторая'].description == 'описание'
+        assert goals['Третья'].description is None
+        assert set(GoalComment.objects.filter(board=board).values_list('goal__title', 'text')) == {
+            ('Первая', 'к первой'), ('Вторая', 'ко второй'),
+        }
+        assert Goal.objects.filter(board=board, search_vector__isnull=True).count() == 0
+
+    def test_import_csv(self, login_user, board):
+        body = 'type,id,category,title,goal,text\ngoal,1,Дом,"Цель, с запятой",,\ncomment,,,,1,"в две\nстроки"\n'
+
+        response = login_user.post(reverse('board_import', args=[board.id]) + '?import_format=csv', data=body,
+                                   content_type='text/csv')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        comment = GoalComment.objects.get(board=board)
+        assert comment.goal.title == 'Цель, с запятой'
+        assert comment.text == 'в две\nстроки'
+
+    def test_import_errors_rollback(self, login_user, board):
+        body = ndjson(
+            {'category': 'Дом', 'title': 'Цель'},
+            {'category': 'Дом'},
+            {'type': 'comment', 'goal': 'missing', 'text': 'текст'},
+        ) + 'broken\n'
+
+        response = login_user.post(reverse('board_import', args=[board.id]), data=body,
+                                   content_type='application/x-ndjson')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error['line'] for error in response.json()['errors']] == [2, 3, 4]
+        assert not Goal.objects.filter(board=board).exists()
+        assert not board.goal_category.exists()
+
+    def test_import_reader_forbidden(self, login_user, current_user, board_factory, board_participant_factory,
+                                     user_factory):
+        board = board_factory.create(owner=user_factory.create())
+        board_participant_factory.create(board=board, user=current_user, role=3)
+
+        response = login_user.post(reverse('board_import', args=[board.id]), data=ndjson(),
+                                   content_type='application/x-ndjson')
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_bulk_create_fallback(self, current_user, board):
+        importer = GoalImporter(board, current_user)
+        importer.use_copy = False
+
+        result = importer.run(ndjson(
+            {'id': 'a', 'category': 'Дом', 'title': 'Цель'},
+            {'type': 'comment', 'goal': 'a', 'text': 'текст'},
+        ).splitlines(keepends=True), 'ndjson')
+
+        assert (result.goals, result.comments) == (1, 1)
+        assert GoalComment.objects.get(board=board).goal.title == 'Цель'
+
+    def test_import_command(self, current_user, board, tmp_path, capsys):
+        path = tmp_path / 'goals.csv'
+        path.write_text('category,title\nДом,Первая\nДом,Вторая\n', encoding='utf-8')
+
+        call_command('import_goals', board.id, str(path), '--user', current_user.username)
+
+        assert 'goals=2 comments=0 categories=1' in capsys.readouterr().out
+        assert Goal.objects.filter(board=board).count() == 2
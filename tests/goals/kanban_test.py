@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from goals.fast_serializers import GoalValuesSerializer
+from goals.kanban import get_columns
+from goals.models import Goal, GoalCategory
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+def ids(column: dict) -> list[int]:
+    return [goal['id'] for goal in column['goals']]
+
+
+@pytest.mark.django_db
+class TestBoardKanban:
+    url = 'board_kanban'
+
+    def test_columns(self, login_user, current_user, category, goal_factory):
+        low = goal_factory.create_batch(3, category=category, user=current_user)
+        high = goal_factory.create(category=category, user=current_user, priority=Goal.Priority.high)
+        done = goal_factory.create(category=category, user=current_user, status=Goal.Status.done)
+        goal_factory.create(category=category, user=current_user, status=Goal.Status.archived)
+
+        response = login_user.get(reverse(self.url, args=[category.board_id]), {'limit': 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        columns = response.data['columns']
+        assert [column['status'] for column in columns] == [
+            Goal.Status.to_do, Goal.Status.in_progress, Goal.Status.done,
+        ]
+        assert ids(columns[0]) == [high.id, low[2].id]
+        assert columns[0]['goals'][0] == GoalValuesSerializer().many(
+            GoalValuesSerializer().get_values(Goal.objects.filter(id=high.id))
+        )[0]
+        assert ids(columns[1]) == [] and columns[1]['next'] is None
+        assert ids(columns[2]) == [done.id] and columns[2]['next'] is None
+
+        response = login_user.get(columns[0]['next'])
+
+        assert [column['status'] for column in response.data['columns']] == [Goal.Status.to_do]
+        assert ids(response.data['columns'][0]) == [low[1].id, low[0].id]
+        assert response.data['columns'][0]['next'] is None
+
+    def test_columns_read_bounded_by_index(self, category):
+        plans = []
+
+        def explain(execute, sql, params, many, context):
+            if 'kanban_columns' in sql:
+                execute(f'EXPLAIN {sql}', params, many, context)
+                plans.append('\n'.join(row[0] for row in context['cursor'].fetchall()))
+            return execute(sql, params, many, context)
+
+        with connection.cursor() as cursor:
+            # на пустой таблице планировщик выбрал бы seq scan
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        with connection.execute_wrapper(explain):
+            get_columns(Goal.live.filter(board_id=category.board_id), 20)
+
+        assert 'Index Scan Backward using goals_goal_kanban_idx' in plans[0]
+        assert 'Limit' in plans[0]
+        assert 'Sort' not in plans[0] and 'WindowAgg' not in plans[0]
+
+    def test_invalid_cursor(self, login_user, category):
+        response = login_user.get(reverse(self.url, args=[category.board_id]), {'cursor': 'bad'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_not_participant(self, login_user, board_factory):
+        response = login_user.get(reverse(self.url, args=[board_factory.create().id]))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,31 @@
+import pytest
+
+from goals.models import Board, Goal, GoalCategory, GoalComment
+
+
+@pytest.mark.django_db
+class TestLiveManagers:
+    def test_live_rows(self, board_factory, goal_category_factory, goal_factory, goal_comment_factory):
+        board, deleted_board = board_factory.create(), board_factory.create(is_deleted=True)
+        category = goal_category_factory.create(board=board)
+        deleted_category = goal_category_factory.create(board=board, is_deleted=True)
+        goal = goal_factory.create(category=category)
+        archived = goal_factory.create(category=category, status=Goal.Status.archived)
+        hidden = goal_factory.create(category=deleted_category)
+        comment = goal_comment_factory.create(goal=goal)
+        goal_comment_factory.create(goal=archived)
+        goal_comment_factory.create(goal=hidden)
+
+        assert set(Board.live.values_list('id', flat=True)) == {board.id}
+        assert set(GoalCategory.live.values_list('id', flat=True)) == {category.id}
+        assert set(Goal.live.values_list('id', flat=True)) == {goal.id}
+        assert set(GoalComment.live.values_list('id', flat=True)) == {comment.id}
+        assert Board.objects.filter(id=deleted_board.id).exists()
+        assert Goal.objects.count() == 3 and GoalComment.objects.count() == 3
+
+    def test_live_keeps_queryset_methods(self, current_user, board_factory, goal_category_factory):
+        board = board_factory.create(owner=current_user)
+        category = goal_category_factory.create(board=board, title='Покупки')
+        goal_category_factory.create(board=board, title='Покупки', is_deleted=True)
+
+        assert list(GoalCategory.live.for_participant(current_user.id).search_title('Покупк')) == [category]
@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from goals.membership import get_board_roles, get_board_roles_stats, get_roles_cache_key, invalidate_board_roles, \
+    reset_board_roles_stats
+from goals.models import BoardParticipant
+
+
+@pytest.mark.django_db
+class TestBoardRolesCache:
+    def test_roles_cached(self, current_user, board_factory, django_assert_num_queries):
+        board = board_factory.create(owner=current_user)
+        reset_board_roles_stats()
+        with django_assert_num_queries(1):
+            assert get_board_roles(current_user.id) == {board.id: BoardParticipant.Role.owner}
+        with django_assert_num_queries(0):
+            assert get_board_roles(current_user.id) == {board.id: BoardParticipant.Role.owner}
+        assert get_board_roles_stats() == {'hits': 1, 'misses': 1}
+
+    def test_stats_flushed_periodically(self, current_user, board_factory, locmem_cache, settings):
+        board_factory.create(owner=current_user)
+        reset_board_roles_stats()
+        settings.BOARD_ROLES_STATS_FLUSH_INTERVAL = 3600
+        get_board_roles(current_user.id)
+        assert locmem_cache.get('board_roles:stats:misses') is None
+
+        settings.BOARD_ROLES_STATS_FLUSH_INTERVAL = 0
+        get_board_roles(current_user.id)
+        assert locmem_cache.get_many(['board_roles:stats:hits', 'board_roles:stats:misses']) == {
+            'board_roles:stats:hits': 1, 'board_roles:stats:misses': 1,
+        }
+
+    def test_stale_write_after_invalidation_is_dropped(self, current_user, board_factory, locmem_cache,
+                                                       django_capture_on_commit_callbacks):
+        board = board_factory.create(owner=current_user)
+        # промах начался до фиксации: ключ и роли прочитаны по старому составу участников
+        stale_key = get_roles_cache_key(current_user.id)
+        with django_capture_on_commit_callbacks(execute=True):
+            BoardParticipant.objects.filter(board=board, user=current_user).delete()
+            invalidate_board_roles([current_user.id])
+        locmem_cache.set(stale_key, {board.id: BoardParticipant.Role.owner})
+
+        assert get_board_roles(current_user.id) == {}
+
+    def test_board_create_invalidates(self, login_user, current_user, locmem_cache,
+                                      django_capture_on_commit_callbacks):
+        assert get_board_roles(current_user.id) == {}
+        with django_capture_on_commit_callbacks(execute=True):
+            response = login_user.post(reverse('board_create'), data={'title': 'Доска'})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert locmem_cache.get(get_roles_cache_key(current_user.id)) is None
+        assert get_board_roles(current_user.id) == {response.json()['id']: BoardParticipant.Role.owner}
+
+    def test_board_update_invalidates_changed_participants(self, login_user, current_user, board_factory,
+                                                           user_factory, board_participant_factory, locmem_cache,
+                                                           django_capture_on_commit_callbacks):
+        board = board_factory.create(owner=current_user)
+        removed, unchanged = user_factory.create_batch(2)
+        added = user_factory.create()
+        board_participant_factory.create(board=board, user=removed, role=BoardParticipant.Role.writer)
+        board_participant_factory.create(board=board, user=unchanged, role=BoardParticipant.Role.reader)
+        for user in (current_user, removed, unchanged, added):
+            get_board_roles(user.id)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = login_user.put(reverse('board', args=[board.id]), data={
+                'title': board.title,
+                'participants': [
+                    {'user': unchanged.username, 'role': BoardParticipant.Role.reader},
+                    {'user': added.username, 'role': BoardParticipant.Role.writer},
+                ],
+            }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert locmem_cache.get(get_roles_cache_key(removed.id)) is None
+        assert locmem_cache.get(get_roles_cache_key(added.id)) is None
+        assert locmem_cache.get(get_roles_cache_key(unchanged.id)) is not None
+        assert get_board_roles(removed.id) == {}
+        assert get_board_roles(added.id) == {board.id: BoardParticipant.Role.writer}
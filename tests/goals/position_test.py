@@ -0,0 +1,94 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal, GoalCategory
+from goals.positions import key_between
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+def column_ids(login_user, goal_status: int = Goal.Status.to_do) -> list[int]:
+    return [goal['id'] for goal in login_user.get(reverse('goals_list')).json() if goal['status'] == goal_status]
+
+
+def test_key_between():
+    keys = [key_between(None, None)]
+    for _ in range(200):
+        keys.append(key_between(keys[-1], None))
+        keys.insert(0, key_between(None, keys[0]))
+        keys.insert(len(keys) // 2, key_between(keys[len(keys) // 2 - 1], keys[len(keys) // 2]))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert not any(key.endswith('0') for key in keys)
+    with pytest.raises(ValueError):
+        key_between('b', 'a')
+
+
+@pytest.mark.django_db
+class TestGoalMove:
+    def test_move_writes_only_moved_goal(self, login_user, current_user, category, goal_factory):
+        goals = goal_factory.create_batch(4, category=category, user=current_user)
+        assert column_ids(login_user) == [goal.id for goal in goals]
+
+        response = login_user.post(reverse('goal_move', args=[goals[3].id]), data={'after': None}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['position'] is not None
+        assert column_ids(login_user) == [goals[3].id, goals[0].id, goals[1].id, goals[2].id]
+
+        login_user.post(reverse('goal_move', args=[goals[0].id]), data={'after': goals[3].id}, format='json')
+        top = Goal.objects.get(id=goals[3].id).position
+        login_user.post(reverse('goal_move', args=[goals[2].id]), data={'after': goals[3].id}, format='json')
+
+        assert column_ids(login_user) == [goals[3].id, goals[2].id, goals[0].id, goals[1].id]
+        assert Goal.objects.get(id=goals[3].id).position == top
+        assert Goal.objects.get(id=goals[1].id).position is None
+
+    def test_move_after_unplaced_goal(self, login_user, current_user, category, goal_factory):
+        goals = goal_factory.create_batch(4, category=category, user=current_user)
+
+        login_user.post(reverse('goal_move', args=[goals[0].id]), data={'after': goals[2].id}, format='json')
+
+        assert column_ids(login_user) == [goals[1].id, goals[2].id, goals[0].id, goals[3].id]
+        assert Goal.objects.get(id=goals[3].id).position is None
+
+    def test_move_to_other_status(self, login_user, current_user, category, goal_factory):
+        goal, done = goal_factory.create(category=category, user=current_user), goal_factory.create(
+            category=category, user=current_user, status=Goal.Status.done
+        )
+
+        response = login_user.post(reverse('goal_move', args=[goal.id]), data={
+            'after': done.id, 'status': Goal.Status.done,
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert column_ids(login_user, Goal.Status.done) == [done.id, goal.id]
+
+    def test_after_not_in_column(self, login_user, current_user, category, goal_factory):
+        goal, done = goal_factory.create(category=category, user=current_user), goal_factory.create(
+            category=category, user=current_user, status=Goal.Status.done
+        )
+
+        response = login_user.post(reverse('goal_move', args=[goal.id]), data={'after': done.id}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_rebalance(current_user, category, goal_factory, goal_category_factory):
+    goals = goal_factory.create_batch(3, category=category, user=current_user)
+    for goal, position in zip(goals, ('V' * 30, 'VV', 'W' * 30)):
+        Goal.objects.filter(id=goal.id).update(position=position)
+    other = goal_factory.create(category=goal_category_factory.create(board=category.board, user=current_user))
+    Goal.objects.filter(id=other.id).update(position='a' * 10)
+
+    call_command('rebalance_goal_positions', '--max-length', 20)
+
+    positions = dict(Goal.objects.values_list('id', 'position'))
+    assert [positions[goal.id] for goal in goals] == ['2V', '1V', '3V']
+    assert positions[other.id] == 'a' * 10
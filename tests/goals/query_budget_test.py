@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Goal
+from goals.views import GoalsListView
+from todolist.middleware import QueryBudgetExceeded, QueryTracker, get_model_label
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    url = reverse('goals_list')
+
+    def test_budget_respected(self, login_user):
+        response = login_user.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_budget_exceeded(self, login_user, monkeypatch):
+        monkeypatch.setattr(GoalsListView, 'query_budget', 1)
+        with pytest.raises(QueryBudgetExceeded, match='budget is 1'):
+            login_user.get(self.url)
+
+    def test_budget_not_enforced(self, login_user, monkeypatch, settings):
+        settings.QUERY_BUDGET_RAISE = False
+        monkeypatch.setattr(GoalsListView, 'query_budget', 1)
+        response = login_user.get(self.url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_lazy_load_detected(self, current_user, board_factory, goal_category_factory, goal_factory):
+        board = board_factory.create(owner=current_user)
+        for category in goal_category_factory.create_batch(3, board=board):
+            goal_factory.create(category=category)
+        tracker = QueryTracker()
+
+        with connection.execute_wrapper(tracker):
+            titles = [goal.category.title for goal in Goal.objects.filter(board=board)]
+
+        assert len(titles) == tracker.count - 1 == 3
+        [(sql, times, stack)] = tracker.repeated(3)
+        assert times == 3
+        assert get_model_label(sql) == 'goals.GoalCategory'
+        assert any('query_budget_test.py' in frame for frame in stack)
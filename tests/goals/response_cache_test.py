@@ -0,0 +1,71 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from goals.models import Board
+from goals.membership import get_board_roles_stats
+from goals.response_cache import get_list_cache_stats
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def board(current_user, board_factory) -> Board:
+    return board_factory.create(owner=current_user)
+
+
+@pytest.mark.django_db
+class TestListResponseCache:
+    url = reverse('goal_category_list')
+
+    def test_cached_response_without_main_query(self, login_user, current_user, board, goal_category_factory,
+                                                django_assert_num_queries):
+        goal_category_factory.create_batch(3, board=board, user=current_user)
+        first = login_user.get(self.url, data={'limit': 2})
+
+        with django_assert_num_queries(2):
+            second = login_user.get(self.url, data={'limit': 2})
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+        assert get_list_cache_stats() == {'hits': 1, 'misses': 1}
+
+    def test_query_params_in_key(self, login_user, current_user, board, goal_category_factory):
+        goal_category_factory.create_batch(3, board=board, user=current_user)
+        login_user.get(self.url, data={'limit': 2})
+
+        response = login_user.get(self.url, data={'limit': 2, 'offset': 2})
+
+        assert len(response.json()['results']) == 1
+        assert get_list_cache_stats()['hits'] == 0
+
+    def test_stale_response_not_served(self, login_user, current_user, board, goal_category_factory,
+                                       django_capture_on_commit_callbacks):
+        category = goal_category_factory.create(board=board, user=current_user)
+        login_user.get(self.url)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = login_user.patch(reverse('goal_category', args=[category.id]), data={'title': 'renamed'})
+        assert response.status_code == status.HTTP_200_OK
+
+        assert login_user.get(self.url).json()[0]['title'] == 'renamed'
+
+    def test_board_list_after_board_created(self, login_user, board, django_capture_on_commit_callbacks):
+        assert len(login_user.get(reverse('board_list')).json()) == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            login_user.post(reverse('board_create'), data={'title': 'second'})
+
+        assert len(login_user.get(reverse('board_list')).json()) == 2
+
+    def test_cache_stats_command(self, login_user, board, capsys):
+        login_user.get(self.url)
+        login_user.get(self.url)
+
+        call_command('cache_stats', '--reset')
+
+        out = capsys.readouterr().out
+        assert 'board roles: hits=' in out
+        assert 'list responses: hits=1 misses=1 hit_ratio=50.00%' in out
+        assert get_list_cache_stats() == {'hits': 0, 'misses': 0}
+        assert get_board_roles_stats() == {'hits': 0, 'misses': 0}
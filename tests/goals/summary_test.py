@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.archive import archive_batch
+from goals.models import Goal, GoalCategory, GoalCounter
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user, title='Работа')
+
+
+def counters(board_id: int) -> dict[tuple, int]:
+    return {
+        (row.category_id, row.status, row.priority, row.due_date): row.count
+        for row in GoalCounter.objects.filter(board_id=board_id, count__gt=0)
+    }
+
+
+@pytest.mark.django_db
+class TestBoardSummary:
+    def test_summary(self, login_user, current_user, category, goal_factory, goal_category_factory):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        goal_factory.create_batch(2, category=category, user=current_user, priority=Goal.Priority.high)
+        goal_factory.create(category=category, user=current_user, due_date=yesterday)
+        goal_factory.create(category=category, user=current_user, due_date=yesterday, status=Goal.Status.done)
+        goal_factory.create(category=category, user=current_user, status=Goal.Status.archived)
+        deleted = goal_category_factory.create(board=category.board, user=current_user, is_deleted=True)
+        goal_factory.create(category=deleted, user=current_user)
+
+        response = login_user.get(reverse('board_summary', args=[category.board_id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {
+            'board': category.board_id,
+            'total': 4,
+            'overdue': 1,
+            'categories': [{
+                'id': category.id,
+                'title': 'Работа',
+                'total': 4,
+                'overdue': 1,
+                'counts': [
+                    {'status': Goal.Status.to_do, 'priority': Goal.Priority.low, 'count': 1, 'overdue': 1},
+                    {'status': Goal.Status.to_do, 'priority': Goal.Priority.high, 'count': 2, 'overdue': 0},
+                    {'status': Goal.Status.done, 'priority': Goal.Priority.low, 'count': 1, 'overdue': 0},
+                ],
+            }],
+        }
+
+    def test_not_participant(self, login_user, board_factory):
+        response = login_user.get(reverse('board_summary', args=[board_factory.create().id]))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+class TestGoalCounters:
+    def test_goal_changes(self, login_user, current_user, category, goal_factory, goal_category_factory):
+        goal = goal_factory.create(category=category, user=current_user)
+        other = goal_category_factory.create(board=category.board, user=current_user)
+        key = (Goal.Priority.low, None)
+
+        login_user.patch(reverse('goal', args=[goal.id]), data={'status': Goal.Status.in_progress})
+        assert counters(category.board_id) == {(category.id, Goal.Status.in_progress, *key): 1}
+
+        login_user.patch(reverse('goal', args=[goal.id]), data={'category': other.id})
+        assert counters(category.board_id) == {(other.id, Goal.Status.in_progress, *key): 1}
+
+        login_user.delete(reverse('goal', args=[goal.id]))
+        assert counters(category.board_id) == {}
+
+    def test_bulk_status_and_archive(self, login_user, current_user, category, goal_factory):
+        goals = goal_factory.create_batch(3, category=category, user=current_user)
+        key = (category.id, Goal.Status.done, Goal.Priority.low, None)
+
+        login_user.post(reverse('goal_bulk_status'), data={
+            'ids': [goal.id for goal in goals[:2]], 'status': Goal.Status.done,
+        }, format='json')
+        assert counters(category.board_id) == {key: 2, (category.id, Goal.Status.to_do, *key[2:]): 1}
+
+        login_user.delete(reverse('board', args=[category.board_id]))
+        archive_batch()
+        assert counters(category.board_id) == {(category.id, Goal.Status.archived, *key[2:]): 3}
+
+    def test_reconcile(self, current_user, category, goal_factory):
+        goal_factory.create_batch(2, category=category, user=current_user)
+        expected = counters(category.board_id)
+        GoalCounter.objects.update(count=100)
+        GoalCounter.objects.create(board=category.board, category=category, status=Goal.Status.done,
+                                   priority=Goal.Priority.high, count=5)
+
+        call_command('reconcile_goal_counters', '--board', category.board_id)
+
+        assert counters(category.board_id) == expected == {
+            (category.id, Goal.Status.to_do, Goal.Priority.low, None): 2,
+        }
@@ -0,0 +1,141 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from goals.models import BoardParticipant, Goal, GoalCategory, Tombstone
+from goals.sync import Cursor
+
+
+@pytest.fixture(autouse=True)
+def no_settle(settings):
+    settings.SYNC_SETTLE_SECONDS = 0
+
+
+@pytest.fixture
+@pytest.mark.django_db
+def category(current_user, board_factory, goal_category_factory) -> GoalCategory:
+    board = board_factory.create(owner=current_user)
+    return goal_category_factory.create(board=board, user=current_user)
+
+
+def sync(client, **params) -> dict:
+    response = client.get(reverse('sync'), data=params)
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def changed(data: dict) -> list[tuple[str, int, bool]]:
+    return [(change['type'], change['id'], change['deleted']) for change in data['changes']]
+
+
+@pytest.mark.django_db
+class TestSync:
+    def test_initial_sync_in_pages(self, login_user, current_user, category, goal_factory, goal_comment_factory,
+                                   board_factory):
+        goal = goal_factory.create(category=category, user=current_user)
+        comment = goal_comment_factory.create(goal=goal, user=current_user)
+        board_factory.create()
+
+        first = sync(login_user, limit=2)
+        second = sync(login_user, limit=2, cursor=first['cursor'])
+
+        assert changed(first) == [('board', category.board_id, False), ('category', category.id, False)]
+        assert first['has_more']
+        assert changed(second) == [('goal', goal.id, False), ('comment', comment.id, False)]
+        assert not second['has_more']
+        assert second['changes'][0]['data']['title'] == goal.title
+
+    def test_changes_since_cursor(self, login_user, current_user, category, goal_factory):
+        goals = goal_factory.create_batch(2, category=category, user=current_user)
+        cursor = sync(login_user)['cursor']
+        assert changed(sync(login_user, cursor=cursor)) == []
+
+        goals[0].title = 'Новое название'
+        goals[0].save()
+        goals[1].status = Goal.Status.archived
+        goals[1].save()
+        data = sync(login_user, cursor=cursor)
+
+        assert changed(data) == [('goal', goals[0].id, False), ('goal', goals[1].id, True)]
+        assert data['changes'][0]['data']['title'] == 'Новое название'
+        assert data['changes'][1]['data'] is None
+
+    def test_tombstones(self, login_user, current_user, category, goal_factory, goal_comment_factory,
+                        board_factory, board_participant_factory):
+        goal = goal_factory.create(category=category, user=current_user)
+        comment = goal_comment_factory.create(goal=goal, user=current_user)
+        other_board = board_factory.create()
+        participant = board_participant_factory.create(board=other_board, user=current_user)
+        cursor = sync(login_user)['cursor']
+
+        login_user.delete(reverse('goal_comment', args=[comment.id]))
+        login_user.delete(reverse('goal_category', args=[category.id]))
+        participant.delete()
+        data = sync(login_user, cursor=cursor)
+
+        assert changed(data) == [
+            ('comment', comment.id, True),
+            ('category', category.id, True),
+            ('board', other_board.id, True),
+        ]
+
+    def test_foreign_board_hidden(self, login_user, goal_factory):
+        goal_factory.create()
+        assert sync(login_user)['changes'] == []
+
+    def test_settle_delay(self, login_user, category, settings):
+        settings.SYNC_SETTLE_SECONDS = 60
+        data = sync(login_user)
+        assert data == {'changes': [], 'cursor': None, 'has_more': False}
+
+    def test_open_write_transaction_holds_cursor(self, login_user, current_user, category, goal_factory):
+        other = connection.get_new_connection(connection.get_connection_params())
+        try:
+            with other.cursor() as cursor:
+                # пишущая транзакция, начатая раньше изменения и еще не зафиксированная
+                cursor.execute('SELECT pg_current_xact_id()')
+            goal = goal_factory.create(category=category, user=current_user)
+
+            assert ('goal', goal.id, False) not in changed(sync(login_user))
+            other.rollback()
+            with connection.cursor() as cursor:
+                # тест идет одной транзакцией, а pg_stat_activity читается из снимка транзакции
+                cursor.execute('SELECT pg_stat_clear_snapshot()')
+            assert ('goal', goal.id, False) in changed(sync(login_user))
+        finally:
+            other.close()
+
+    def test_invalid_cursor(self, login_user):
+        response = login_user.get(reverse('sync'), data={'cursor': 'not-a-cursor'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'cursor' in response.json()
+
+    def test_expired_cursor(self, login_user, settings):
+        cursor = Cursor(timezone.now() - timedelta(days=settings.SYNC_RETENTION_DAYS + 1), 0, 1).encode()
+        response = login_user.get(reverse('sync'), data={'cursor': cursor})
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_removed_participant_gets_board_tombstone(self, category, board_participant_factory, login_user):
+        reader = board_participant_factory.create(board=category.board, role=BoardParticipant.Role.reader)
+
+        response = login_user.put(reverse('board', args=[category.board_id]), data={
+            'title': category.board.title, 'participants': [],
+        }, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Tombstone.objects.filter(kind=Tombstone.Kind.board, object_id=category.board_id,
+                                        user=reader.user).exists()
+
+    def test_cascade_deleted_comments_without_tombstones(self, login_user, current_user, category, goal_factory,
+                                                         goal_comment_factory):
+        goal = goal_factory.create(category=category, user=current_user)
+        goal_comment_factory.create_batch(3, goal=goal, user=current_user)
+
+        response = login_user.delete(reverse('goal', args=[goal.id]))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert list(Tombstone.objects.values_list('kind', 'object_id')) == [(Tombstone.Kind.goal, goal.id)]
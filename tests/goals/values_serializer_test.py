@@ -0,0 +1,34 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from goals.fast_serializers import GoalCategoryValuesSerializer, GoalCommentValuesSerializer, GoalValuesSerializer
+from goals.models import Goal, GoalCategory, GoalComment
+from goals.serializers import GoalCategorySerializer, GoalCommentSerializer, GoalSerializer
+
+
+def render_both(values_serializer_class, serializer_class, queryset) -> tuple[bytes, bytes]:
+    values_serializer = values_serializer_class()
+    fast = values_serializer.many(values_serializer.get_values(queryset))
+    return JSONRenderer().render(fast), JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+@pytest.mark.django_db
+class TestValuesSerializers:
+    def test_goal_json_identical(self, goal_factory, faker):
+        goal_factory.create(description=None, due_date=faker.date_object())
+        goal_factory.create_batch(3)
+        fast, expected = render_both(GoalValuesSerializer, GoalSerializer, Goal.objects.order_by('id'))
+        assert fast == expected
+
+    def test_goal_comment_json_identical(self, goal_comment_factory):
+        goal_comment_factory.create_batch(3)
+        fast, expected = render_both(GoalCommentValuesSerializer, GoalCommentSerializer,
+                                     GoalComment.objects.order_by('id'))
+        assert fast == expected
+
+    def test_goal_category_json_identical(self, goal_category_factory):
+        goal_category_factory.create_batch(3)
+        goal_category_factory.create(is_deleted=True)
+        fast, expected = render_both(GoalCategoryValuesSerializer, GoalCategorySerializer,
+                                     GoalCategory.objects.order_by('id'))
+        assert fast == expected
@@ -13,4 +13,23 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todolist.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from goals.event_stream import BoardEventsApplication  # noqa: E402 импорт после django.setup()
+from todolist.async_handler import AsyncAPIHandler  # noqa: E402
+
+async_api_application = AsyncAPIHandler()
+board_events_application = BoardEventsApplication()
+
+
+async def application(scope, receive, send):
+    """
+    Асинхронные представления (/async/) обслуживаются без общей цепочки middleware,
+    потоки событий досок (/events/) - отдельным ASGI приложением,
+    остальные запросы - стандартным обработчиком Django
+    """
+    if scope['type'] == 'http' and scope['path'].startswith('/async/'):
+        return await async_api_application(scope, receive, send)
+    if scope['type'] == 'http' and scope['path'].startswith('/events/'):
+        return await board_events_application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,46 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.exception import convert_exception_to_response
+from django.http import HttpRequest
+from django.utils.module_loading import import_string
+
+
+def load_session_user(request: HttpRequest) -> AbstractBaseUser | AnonymousUser:
+    """
+    Сессия и пользователь запроса без SessionMiddleware и AuthenticationMiddleware (синхронно)
+    :param request:
+    :return:
+    """
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    )
+    request.user = get_user(request)
+    return request.user
+
+
+class AsyncAPIHandler(ASGIHandler):
+    """
+    ASGI обработчик асинхронных представлений (/async/...). Вместо settings.MIDDLEWARE
+    использует короткий список ASYNC_MIDDLEWARE только из асинхронных middleware:
+    синхронные middleware выполнялись бы через sync_to_async в отдельном потоке на каждом запросе.
+    Сессию и пользователя асинхронные представления получают сами
+    """
+
+    def load_middleware(self, is_async=False) -> None:
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+
+        handler = convert_exception_to_response(self._get_response_async)
+        for middleware_path in reversed(settings.ASYNC_MIDDLEWARE):
+            middleware = import_string(middleware_path)
+            if not getattr(middleware, 'async_capable', False):
+                raise ImproperlyConfigured(f'{middleware_path} is not async capable')
+            handler = convert_exception_to_response(middleware(handler))
+        self._middleware_chain = handler
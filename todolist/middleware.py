@@ -0,0 +1,109 @@
+import logging
+import re
+import traceback
+from collections import defaultdict
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+TABLE_RE = re.compile(r'\bFROM\s+"?(\w+)"?', re.IGNORECASE)
+TRANSACTION_CONTROL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryTracker:
+    """
+    Обертка выполнения запросов (connection.execute_wrapper): считает запросы
+    и запоминает стек вызова для каждого шаблона SQL
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.sites: dict[str, list[list[str]]] = defaultdict(list)
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_CONTROL):
+            self.count += 1
+            self.sites[sql].append(self._call_stack())
+        return execute(sql, params, many, context)
+
+    @staticmethod
+    def _call_stack() -> list[str]:
+        """
+        Кадры стека из кода проекта, без библиотек и самого трекера
+        :return:
+        """
+        base_dir = str(settings.BASE_DIR)
+        return [
+            f'{Path(frame.filename).relative_to(base_dir)}:{frame.lineno} in {frame.name}'
+            for frame in traceback.extract_stack()[:-2]
+            if frame.filename.startswith(base_dir) and 'site-packages' not in frame.filename
+        ]
+
+    def repeated(self, threshold: int) -> list[tuple[str, int, list[str]]]:
+        """
+        Шаблоны SQL, выполненные не менее threshold раз: признак N+1 (ленивая загрузка в цикле)
+        :param threshold:
+        :return:
+        """
+        return [(sql, len(stacks), stacks[0]) for sql, stacks in self.sites.items() if len(stacks) >= threshold]
+
+
+def get_model_label(sql: str) -> str:
+    if match := TABLE_RE.search(sql):
+        for model in apps.get_models():
+            if model._meta.db_table == match.group(1):
+                return model._meta.label
+        return match.group(1)
+    return '?'
+
+
+class QueryBudgetMiddleware:
+    """
+    В режиме отладки и в тестах считает запросы к базе на один HTTP запрос,
+    сообщает о повторяющихся запросах (N+1) с моделью и стеком вызова и проверяет
+    бюджет, объявленный атрибутом query_budget у представления: число для всех методов
+    или словарь {метод: число}, методы без бюджета не проверяются.
+    При QUERY_BUDGET_RAISE превышение бюджета вызывает QueryBudgetExceeded
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        tracker = QueryTracker()
+        with connection.execute_wrapper(tracker):
+            response = self.get_response(request)
+        self.report(request, tracker)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs) -> None:
+        view_class = getattr(view_func, 'view_class', None)
+        budget: int | dict[str, int] | None = getattr(view_class, 'query_budget', None)
+        if isinstance(budget, dict):
+            budget = budget.get(request.method)
+        request.query_budget = budget
+
+    @staticmethod
+    def report(request, tracker: QueryTracker) -> None:
+        endpoint = f'{request.method} {request.path}'
+        for sql, times, stack in tracker.repeated(settings.QUERY_BUDGET_N_PLUS_ONE_THRESHOLD):
+            logger.warning('N+1 in %s: %s loaded %s times by the same query\n%s\n  %s',
+                           endpoint, get_model_label(sql), times, sql, '\n  '.join(stack))
+
+        budget: int | None = getattr(request, 'query_budget', None)
+        if budget is None or tracker.count <= budget:
+            return
+        message = f'{endpoint} made {tracker.count} queries, budget is {budget}'
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'core.apps.CoreConfig',
     'goals.apps.GoalsConfig',
@@ -60,8 +61,12 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'social_django.middleware.SocialAuthExceptionMiddleware',
+    'todolist.middleware.QueryBudgetMiddleware',
 ]
 
+# middleware асинхронных представлений /async/ (todolist/asgi.py), только async_capable
+ASYNC_MIDDLEWARE = []
+
 PHONENUMBER_DEFAULT_REGION = 'RU'
 
 ROOT_URLCONF = 'todolist.urls'
@@ -99,6 +104,68 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/1'),
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # при недоступности Redis кеш работает как промах, запросы идут в базу
+            'IGNORE_EXCEPTIONS': True,
+        },
+    }
+}
+DJANGO_REDIS_LOG_IGNORED_EXCEPTIONS = True
+
+# время жизни закешированных ролей пользователя в досках, сек
+BOARD_ROLES_CACHE_TIMEOUT = int(os.environ.get('BOARD_ROLES_CACHE_TIMEOUT', 600))
+# как часто процесс переносит свои счетчики попаданий и промахов кеша ролей в общий кеш, сек
+BOARD_ROLES_STATS_FLUSH_INTERVAL = float(os.environ.get('BOARD_ROLES_STATS_FLUSH_INTERVAL', 10))
+
+# время жизни закешированных ответов списков досок и категорий, сек
+LIST_CACHE_TIMEOUT = int(os.environ.get('LIST_CACHE_TIMEOUT', 300))
+
+# строк, читаемых из базы за раз при потоковой выгрузке доски
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 2000))
+# строк, проверяемых и загружаемых за раз при импорте в доску
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 5000))
+# целей, архивируемых одной транзакцией после удаления доски или категории (archive_worker)
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 1000))
+
+# лента изменений goals/sync: изменений на странице по умолчанию и максимум
+SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 500))
+SYNC_MAX_PAGE_SIZE = int(os.environ.get('SYNC_MAX_PAGE_SIZE', 2000))
+# запас в секундах к границе ленты (начало самой старой пишущей транзакции, по часам базы):
+# должен быть больше расхождения часов серверов приложения и базы
+SYNC_SETTLE_SECONDS = float(os.environ.get('SYNC_SETTLE_SECONDS', 2))
+# сколько дней хранятся записи об удалении, более старый курсор требует полной синхронизации
+SYNC_RETENTION_DAYS = int(os.environ.get('SYNC_RETENTION_DAYS', 30))
+# через сколько дней после архивации цели переносятся в холодные таблицы (archive_worker),
+# не меньше SYNC_RETENTION_DAYS: клиенты ленты изменений к этому времени уже получили архивацию
+GOAL_COLD_AFTER_DAYS = max(int(os.environ.get('GOAL_COLD_AFTER_DAYS', 90)), SYNC_RETENTION_DAYS)
+
+# колонки канбан-доски goals/board/<id>/kanban: целей в колонке по умолчанию и максимум
+KANBAN_COLUMN_SIZE = int(os.environ.get('KANBAN_COLUMN_SIZE', 20))
+KANBAN_MAX_COLUMN_SIZE = int(os.environ.get('KANBAN_MAX_COLUMN_SIZE', 100))
+
+# ключи порядка целей длиннее этого числа символов переписывает rebalance_goal_positions
+GOAL_POSITION_MAX_LENGTH = int(os.environ.get('GOAL_POSITION_MAX_LENGTH', 24))
+
+# события изменения досок: публикуются в Redis после фиксации транзакции, отдаются клиентам по SSE
+BOARD_EVENTS_ENABLED = os.getenv('BOARD_EVENTS_ENABLED', 'True') == 'True'
+BOARD_EVENTS_REDIS_URL = os.environ.get('BOARD_EVENTS_REDIS_URL', CACHES['default']['LOCATION'])
+# таймаут публикации события, сек: публикация идет в ответе на запрос записи и ждать Redis долго не должна
+BOARD_EVENTS_PUBLISH_TIMEOUT = float(os.environ.get('BOARD_EVENTS_PUBLISH_TIMEOUT', 0.05))
+# интервал комментария-пинга и повторной проверки доступа в открытом потоке, сек: соединение не закрывают прокси
+BOARD_EVENTS_HEARTBEAT = float(os.environ.get('BOARD_EVENTS_HEARTBEAT', 15))
+# событий в очереди одного клиента, при переполнении старые отбрасываются
+BOARD_EVENTS_QUEUE_SIZE = int(os.environ.get('BOARD_EVENTS_QUEUE_SIZE', 16))
+
+# Подсчет запросов к базе на HTTP запрос и бюджет query_budget представлений (отладка и тесты)
+QUERY_BUDGET_ENABLED = os.getenv('QUERY_BUDGET_ENABLED', str(DEBUG)) == 'True'
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', False) == 'True'
+QUERY_BUDGET_N_PLUS_ONE_THRESHOLD = int(os.environ.get('QUERY_BUDGET_N_PLUS_ONE_THRESHOLD', 3))
+
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PERMISSION_CLASSES': (
@@ -27,6 +27,7 @@ urlpatterns = [
     path('core/', include('core.urls'), name='core'),
     path('oauth/', include('social_django.urls', namespace='social')),
     path('goals/', include('goals.urls'), name='goals'),
+    path('async/goals/', include('goals.async_urls')),
     path('bot/', include('bot.urls'), name='bot'),
 ]
 